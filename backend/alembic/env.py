@@ -5,8 +5,11 @@ from sqlalchemy import engine_from_config, pool
 
 from app.core.config import get_settings
 from app.models.base import Base
+from app.models.blob import Blob  # noqa: F401
 from app.models.document import Document  # noqa: F401
+from app.models.import_progress import ImportProgress  # noqa: F401
 from app.models.notification import Notification  # noqa: F401
+from app.models.outbox_event import OutboxEvent  # noqa: F401
 from app.models.permission_request import PermissionRequest  # noqa: F401
 from app.models.user import User  # noqa: F401
 
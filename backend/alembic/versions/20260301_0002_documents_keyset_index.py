@@ -0,0 +1,23 @@
+"""documents keyset pagination index
+
+Revision ID: 20260301_0002
+Revises: 20260220_0001
+Create Date: 2026-03-01 09:00:00
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20260301_0002"
+down_revision = "20260220_0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_documents_created_at_id", "documents", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_documents_created_at_id", table_name="documents")
@@ -0,0 +1,38 @@
+"""documents full text search
+
+Revision ID: 20260305_0003
+Revises: 20260301_0002
+Create Date: 2026-03-05 09:00:00
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20260305_0003"
+down_revision = "20260301_0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # 'simple' is DOCUMENT_SEARCH_CONFIG in app/models/document.py, which the
+    # search query uses too. The two must match for the GIN index to be
+    # used, so changing the constant needs a migration regenerating this column.
+    op.execute(
+        "ALTER TABLE documents ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+        ") STORED"
+    )
+    op.execute("CREATE INDEX ix_documents_search_vector ON documents USING gin (search_vector)")
+    op.execute("CREATE INDEX ix_documents_title_trgm ON documents USING gin (title gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_documents_description_trgm ON documents USING gin (description gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_documents_description_trgm", table_name="documents")
+    op.drop_index("ix_documents_title_trgm", table_name="documents")
+    op.drop_index("ix_documents_search_vector", table_name="documents")
+    op.drop_column("documents", "search_vector")
@@ -0,0 +1,26 @@
+"""documents file size and checksum
+
+Revision ID: 20260310_0004
+Revises: 20260305_0003
+Create Date: 2026-03-10 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20260310_0004"
+down_revision = "20260305_0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("documents", sa.Column("file_size", sa.BigInteger(), nullable=True))
+    op.add_column("documents", sa.Column("file_sha256", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("documents", "file_sha256")
+    op.drop_column("documents", "file_size")
@@ -0,0 +1,38 @@
+"""content addressed blobs
+
+Revision ID: 20260315_0005
+Revises: 20260310_0004
+Create Date: 2026-03-15 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20260315_0005"
+down_revision = "20260310_0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "blobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("relative_path", sa.String(length=500), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_blobs_id", "blobs", ["id"])
+    op.create_index("ix_blobs_relative_path", "blobs", ["relative_path"], unique=True)
+    op.create_index("ix_blobs_sha256", "blobs", ["sha256"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_blobs_sha256", table_name="blobs")
+    op.drop_index("ix_blobs_relative_path", table_name="blobs")
+    op.drop_index("ix_blobs_id", table_name="blobs")
+    op.drop_table("blobs")
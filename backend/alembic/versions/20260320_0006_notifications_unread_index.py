@@ -0,0 +1,30 @@
+"""notifications partial unread index
+
+Revision ID: 20260320_0006
+Revises: 20260315_0005
+Create Date: 2026-03-20 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20260320_0006"
+down_revision = "20260315_0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_notifications_user_id_unread",
+        "notifications",
+        ["user_id"],
+        postgresql_where=sa.text("is_read = false"),
+        sqlite_where=sa.text("is_read = 0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notifications_user_id_unread", table_name="notifications")
@@ -0,0 +1,43 @@
+"""transactional outbox
+
+Revision ID: 20260325_0007
+Revises: 20260320_0006
+Create Date: 2026-03-25 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20260325_0007"
+down_revision = "20260320_0006"
+branch_labels = None
+depends_on = None
+
+
+outbox_status = sa.Enum("PENDING", "DONE", "FAILED", name="outbox_status")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("topic", sa.String(length=100), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", outbox_status, nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("available_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_outbox_events_id", "outbox_events", ["id"])
+    op.create_index("ix_outbox_events_status_available_at", "outbox_events", ["status", "available_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_events_status_available_at", table_name="outbox_events")
+    op.drop_index("ix_outbox_events_id", table_name="outbox_events")
+    op.drop_table("outbox_events")
+    outbox_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,72 @@
+"""composite indexes for filtered list queries
+
+Revision ID: 20260330_0008
+Revises: 20260325_0007
+Create Date: 2026-03-30 09:00:00
+"""
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20260330_0008"
+down_revision = "20260325_0007"
+branch_labels = None
+depends_on = None
+
+
+# Each composite index starts with the column the one it replaces covered,
+# so the old single-column indexes only cost writes.
+NEW_INDEXES = [
+    ("ix_documents_status_created_at_id", "documents", ["status", "created_at", "id"]),
+    ("ix_documents_lower_document_type_created_at_id", "documents", [sa.text("lower(document_type)"), "created_at", "id"]),
+    ("ix_notifications_user_id_created_at", "notifications", ["user_id", "created_at"]),
+    ("ix_permission_requests_status_requested_at", "permission_requests", ["status", "requested_at"]),
+    # The admin queue without a status filter only orders by requested_at.
+    ("ix_permission_requests_requested_at", "permission_requests", ["requested_at"]),
+]
+REPLACED_INDEXES = [
+    ("ix_documents_status", "documents", ["status"]),
+    ("ix_documents_document_type", "documents", ["document_type"]),
+    ("ix_notifications_user_id", "notifications", ["user_id"]),
+    ("ix_permission_requests_status", "permission_requests", ["status"]),
+]
+
+
+def drop_invalid_indexes(indexes: list[tuple]) -> None:
+    # A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind,
+    # which IF NOT EXISTS would then keep; those are dropped and rebuilt.
+    if context.is_offline_mode():
+        return
+    tables = {name: table for name, table, _ in indexes}
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE NOT i.indisvalid AND c.relname = ANY(:names)"
+        ),
+        {"names": list(tables)},
+    )
+    for name in invalid.scalars():
+        op.drop_index(name, table_name=tables[name], postgresql_concurrently=True)
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps the tables writable while large ones are indexed; it
+    # cannot run inside a transaction. IF [NOT] EXISTS lets a run that failed
+    # halfway be repeated.
+    with op.get_context().autocommit_block():
+        drop_invalid_indexes(NEW_INDEXES)
+        for name, table, columns in NEW_INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _ in REPLACED_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        drop_invalid_indexes(REPLACED_INDEXES)
+        for name, table, columns in REPLACED_INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _ in NEW_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
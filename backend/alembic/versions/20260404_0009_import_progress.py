@@ -0,0 +1,36 @@
+"""bulk import progress
+
+Revision ID: 20260404_0009
+Revises: 20260330_0008
+Create Date: 2026-04-04 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20260404_0009"
+down_revision = "20260330_0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "import_progress",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("source", sa.String(length=1000), nullable=False),
+        sa.Column("next_index", sa.Integer(), nullable=False),
+        sa.Column("imported", sa.Integer(), nullable=False),
+        sa.Column("failed", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_import_progress_id", "import_progress", ["id"])
+    op.create_index("ix_import_progress_source", "import_progress", ["source"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_import_progress_source", table_name="import_progress")
+    op.drop_index("ix_import_progress_id", table_name="import_progress")
+    op.drop_table("import_progress")
@@ -1,32 +1,45 @@
-from fastapi import APIRouter, Depends, File, Form, Query, UploadFile
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-
-from app.core.database import get_db
-from app.core.dependencies import get_current_user
-from app.core.enums import DocumentStatus
+import mimetypes
+from datetime import UTC, datetime
+from pathlib import PurePosixPath
+
+from fastapi import APIRouter, Depends, File, Form, Query, Request, UploadFile
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.core.database import SessionRunner, get_session_runner
+from app.core.dependencies import get_current_user, get_read_only_user
+from app.core.enums import DocumentStatus, TotalMode
 from app.core.exceptions import AppException
-from app.core.responses import success_response
+from app.core.responses import FastJSONResponse, fast_success_response, success_response
 from app.models.user import User
 from app.schemas.document import DeleteRequestPayload
-from app.services.document_service import DocumentService
+from app.services.document_service import AsyncDocumentService
+from app.utils.archive import ARCHIVE_MEDIA_TYPES, ArchiveFormat, export_entry, iter_archive
 from app.utils.file_storage import file_storage
-from app.utils.serializers import serialize_document, serialize_permission_request
+from app.utils.http_cache import DocumentFileResponse, document_etag, http_date, is_not_modified
+from app.utils.serializers import (
+    DOCUMENT_FIELDS,
+    serialize_document,
+    serialize_list,
+    serialize_permission_request,
+)
 
 router = APIRouter()
+settings = get_settings()
 
 
 @router.post("/upload")
-def upload_document(
+async def upload_document(
     title: str = Form(..., min_length=1, max_length=255),
     description: str = Form(..., min_length=1, max_length=5000),
     document_type: str = Form(..., min_length=1, max_length=100),
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: SessionRunner = Depends(get_session_runner),
     current_user: User = Depends(get_current_user),
 ) -> dict:
-    service = DocumentService(db)
-    document = service.upload_document(
+    service = AsyncDocumentService(db)
+    document = await service.upload_document(
         current_user=current_user,
         title=title,
         description=description,
@@ -36,70 +49,154 @@ def upload_document(
     return success_response(data=serialize_document(document), message="Document uploaded")
 
 
+@router.post("/upload-batch")
+async def upload_documents(
+    description: str = Form(..., min_length=1, max_length=5000),
+    document_type: str = Form(..., min_length=1, max_length=100),
+    files: list[UploadFile] = File(...),
+    titles: list[str] | None = Form(default=None),
+    db: SessionRunner = Depends(get_session_runner),
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    service = AsyncDocumentService(db)
+    data = await service.upload_documents(
+        current_user=current_user,
+        description=description,
+        document_type=document_type,
+        files=files,
+        titles=titles,
+    )
+    for result in data["results"]:
+        if result["success"]:
+            result["document"] = serialize_document(result["document"])
+    return success_response(data=data, message="Documents uploaded")
+
+
 @router.get("")
-def list_documents(
+async def list_documents(
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=10, ge=1, le=100),
     search: str | None = Query(default=None, min_length=1, max_length=200),
     status: DocumentStatus | None = Query(default=None),
     document_type: str | None = Query(default=None, min_length=1, max_length=100),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-) -> dict:
-    service = DocumentService(db)
-    data = service.list_documents(
+    cursor: str | None = Query(default=None, min_length=1, max_length=500),
+    total_mode: TotalMode = Query(default=TotalMode.EXACT),
+    db: SessionRunner = Depends(get_session_runner),
+    current_user: User = Depends(get_read_only_user),
+) -> FastJSONResponse:
+    service = AsyncDocumentService(db)
+    data = await service.list_documents(
         page=page,
         page_size=page_size,
         search=search,
         status=status,
         document_type=document_type,
+        cursor=cursor,
+        total_mode=total_mode,
     )
-    data["items"] = [serialize_document(item) for item in data["items"]]
+    data["items"] = serialize_list(data["items"], DOCUMENT_FIELDS)
     data["meta"] = data["meta"].model_dump()
-    return success_response(data=data, message="Documents fetched")
+    return fast_success_response(data=data, message="Documents fetched")
+
+
+@router.get("/export")
+async def export_documents(
+    archive_format: ArchiveFormat = Query(default="zip", alias="format"),
+    search: str | None = Query(default=None, min_length=1, max_length=200),
+    status: DocumentStatus | None = Query(default=None),
+    document_type: str | None = Query(default=None, min_length=1, max_length=100),
+    ids: list[int] | None = Query(default=None),
+    db: SessionRunner = Depends(get_session_runner),
+    current_user: User = Depends(get_read_only_user),
+) -> StreamingResponse:
+    service = AsyncDocumentService(db)
+    documents, skipped = await service.list_export_documents(
+        current_user=current_user,
+        search=search,
+        status=status,
+        document_type=document_type,
+        document_ids=ids,
+    )
+    # Permissions are settled before the first byte is sent; documents the
+    # caller cannot read, and files missing from storage, are listed in the
+    # archive's manifest.json instead of failing a half-sent response.
+    entries = [export_entry(document) for document in documents]
+    filename = f"documents-{datetime.now(UTC):%Y%m%d-%H%M%S}.{archive_format}"
+    return StreamingResponse(
+        iter_archive(archive_format, entries, skipped),
+        media_type=ARCHIVE_MEDIA_TYPES[archive_format],
+        headers={"content-disposition": f'attachment; filename="{filename}"', "cache-control": "no-store"},
+    )
 
 
 @router.get("/{document_id}")
-def get_document(
+async def get_document(
     document_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: SessionRunner = Depends(get_session_runner),
+    current_user: User = Depends(get_read_only_user),
 ) -> dict:
-    service = DocumentService(db)
-    document = service.get_document(document_id=document_id, _=current_user)
+    service = AsyncDocumentService(db)
+    document = await service.get_document(document_id=document_id, _=current_user)
     return success_response(data=serialize_document(document), message="Document fetched")
 
 
 @router.get("/{document_id}/download")
-def download_document(
+async def download_document(
     document_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    db: SessionRunner = Depends(get_session_runner),
+    current_user: User = Depends(get_read_only_user),
 ):
-    service = DocumentService(db)
-    document = service.get_document(document_id=document_id, _=current_user)
+    # Read uncached: a cached row could still point at a file the outbox has
+    # since removed.
+    service = AsyncDocumentService(db)
+    document = await service.get_document(document_id=document_id, _=current_user, cached=False)
 
     if current_user.role.value != "ADMIN" and current_user.id != document.created_by:
         raise AppException(status_code=403, code="FORBIDDEN", message="Not allowed to download this file")
 
-    file_path = file_storage.absolute_path(document.file_url)
-    if not file_path.exists() or not file_path.is_file():
+    cache_headers = {
+        "etag": document_etag(document),
+        "last-modified": http_date(document.updated_at),
+        "cache-control": "private, no-cache",
+    }
+    if is_not_modified(request.headers, cache_headers["etag"], document.updated_at):
+        return Response(status_code=304, headers=cache_headers)
+
+    filename = PurePosixPath(document.file_url).name
+    if settings.storage_presign_downloads:
+        presigned_url = await run_in_threadpool(file_storage.presign_download, document.file_url, filename)
+        if presigned_url:
+            return RedirectResponse(presigned_url, status_code=307, headers={"cache-control": "no-store"})
+
+    if not await run_in_threadpool(file_storage.exists, document.file_url):
         raise AppException(status_code=404, code="FILE_NOT_FOUND", message="Stored file not found")
 
-    return FileResponse(path=file_path, filename=file_path.name)
+    file_path = file_storage.local_path(document.file_url)
+    if file_path is None:
+        media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        return StreamingResponse(
+            file_storage.iter_file(document.file_url),
+            media_type=media_type,
+            headers={**cache_headers, "content-disposition": f'attachment; filename="{filename}"'},
+        )
+
+    # Byte ranges (single and multipart) and If-Range are evaluated against the
+    # ETag set here.
+    return DocumentFileResponse(path=file_path, filename=filename, headers=cache_headers)
 
 
 @router.post("/{document_id}/replace-request")
-def replace_request(
+async def replace_request(
     document_id: int,
     expected_version: int = Form(..., gt=0),
     note: str | None = Form(default=None, max_length=1000),
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: SessionRunner = Depends(get_session_runner),
     current_user: User = Depends(get_current_user),
 ) -> dict:
-    service = DocumentService(db)
-    data = service.request_replace(
+    service = AsyncDocumentService(db)
+    data = await service.request_replace(
         document_id=document_id,
         current_user=current_user,
         expected_version=expected_version,
@@ -114,14 +211,14 @@ def replace_request(
 
 
 @router.post("/{document_id}/delete-request")
-def delete_request(
+async def delete_request(
     document_id: int,
     payload: DeleteRequestPayload,
-    db: Session = Depends(get_db),
+    db: SessionRunner = Depends(get_session_runner),
     current_user: User = Depends(get_current_user),
 ) -> dict:
-    service = DocumentService(db)
-    data = service.request_delete(
+    service = AsyncDocumentService(db)
+    data = await service.request_delete(
         document_id=document_id,
         current_user=current_user,
         expected_version=payload.expected_version,
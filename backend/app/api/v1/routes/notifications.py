@@ -1,46 +1,107 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+import asyncio
+import json
+from datetime import timedelta
 
-from app.core.database import get_db
-from app.core.dependencies import get_current_user
-from app.core.responses import success_response
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config import get_settings
+from app.core.database import SessionRunner, get_session_runner
+from app.core.dependencies import STREAM_TOKEN_SCOPE, get_current_user, get_read_only_user, get_stream_user
+from app.core.enums import TotalMode
+from app.core.notification_events import notification_broker
+from app.core.responses import FastJSONResponse, fast_success_response, success_response
+from app.core.security import create_access_token
 from app.models.user import User
-from app.services.notification_service import NotificationService
-from app.utils.serializers import serialize_notification
+from app.services.notification_service import AsyncNotificationService
+from app.utils.serializers import NOTIFICATION_FIELDS, serialize_list
 
 router = APIRouter()
+settings = get_settings()
 
 
 @router.get("")
-def list_notifications(
+async def list_notifications(
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=10, ge=1, le=100),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-) -> dict:
-    service = NotificationService(db)
-    data = service.list_notifications(current_user=current_user, page=page, page_size=page_size)
-    data["items"] = [serialize_notification(item) for item in data["items"]]
+    total_mode: TotalMode = Query(default=TotalMode.EXACT),
+    db: SessionRunner = Depends(get_session_runner),
+    current_user: User = Depends(get_read_only_user),
+) -> FastJSONResponse:
+    service = AsyncNotificationService(db)
+    data = await service.list_notifications(
+        current_user=current_user,
+        page=page,
+        page_size=page_size,
+        total_mode=total_mode,
+    )
+    data["items"] = serialize_list(data["items"], NOTIFICATION_FIELDS)
     data["meta"] = data["meta"].model_dump()
-    return success_response(data=data, message="Notifications fetched")
+    return fast_success_response(data=data, message="Notifications fetched")
+
+
+@router.get("/unread-count")
+async def get_unread_notification_count(
+    db: SessionRunner = Depends(get_session_runner),
+    current_user: User = Depends(get_read_only_user),
+) -> dict:
+    service = AsyncNotificationService(db)
+    count = await service.count_unread(current_user=current_user)
+    return success_response(data={"unread": count}, message="Unread notifications counted")
+
+
+@router.post("/stream-token")
+async def create_stream_token(current_user: User = Depends(get_current_user)) -> dict:
+    token = create_access_token(
+        subject=str(current_user.id),
+        expires_delta=timedelta(seconds=settings.stream_token_expire_seconds),
+        claims={"scope": STREAM_TOKEN_SCOPE},
+    )
+    return success_response(
+        data={"token": token, "expires_in": settings.stream_token_expire_seconds},
+        message="Stream token issued",
+    )
+
+
+@router.get("/stream")
+async def stream_notifications(request: Request, current_user: User = Depends(get_stream_user)) -> StreamingResponse:
+    async def event_stream():
+        async with notification_broker.subscribe(current_user.id) as queue:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    notification = await asyncio.wait_for(
+                        queue.get(),
+                        timeout=settings.notification_stream_heartbeat_seconds,
+                    )
+                except TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {notification['id']}\nevent: notification\ndata: {json.dumps(notification)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"cache-control": "no-store", "x-accel-buffering": "no"},
+    )
 
 
 @router.patch("/{notification_id}/read")
-def mark_notification_read(
+async def mark_notification_read(
     notification_id: int,
-    db: Session = Depends(get_db),
+    db: SessionRunner = Depends(get_session_runner),
     current_user: User = Depends(get_current_user),
 ) -> dict:
-    service = NotificationService(db)
-    service.mark_read(current_user=current_user, notification_id=notification_id)
+    service = AsyncNotificationService(db)
+    await service.mark_read(current_user=current_user, notification_id=notification_id)
     return success_response(data=None, message="Notification marked as read")
 
 
 @router.patch("/read-all")
-def mark_all_notifications_read(
-    db: Session = Depends(get_db),
+async def mark_all_notifications_read(
+    db: SessionRunner = Depends(get_session_runner),
     current_user: User = Depends(get_current_user),
 ) -> dict:
-    service = NotificationService(db)
-    count = service.mark_all_read(current_user=current_user)
+    service = AsyncNotificationService(db)
+    count = await service.mark_all_read(current_user=current_user)
     return success_response(data={"updated": count}, message="All notifications marked as read")
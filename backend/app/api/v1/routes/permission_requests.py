@@ -1,42 +1,60 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import SessionRunner, get_session_runner
 from app.core.dependencies import get_current_user, require_role
-from app.core.enums import PermissionRequestStatus, UserRole
-from app.core.responses import success_response
+from app.core.enums import PermissionRequestStatus, TotalMode, UserRole
+from app.core.responses import FastJSONResponse, fast_success_response, success_response
 from app.models.user import User
-from app.schemas.permission_request import ReviewPermissionRequest
-from app.services.permission_service import PermissionService
-from app.utils.serializers import serialize_permission_request
+from app.schemas.permission_request import BatchReviewPermissionRequests, ReviewPermissionRequest
+from app.services.permission_service import AsyncPermissionService
+from app.utils.serializers import PERMISSION_REQUEST_FIELDS, serialize_list, serialize_permission_request
 
 router = APIRouter()
 
 
 @router.get("")
-def list_permission_requests(
+async def list_permission_requests(
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=10, ge=1, le=100),
     status: PermissionRequestStatus | None = Query(default=PermissionRequestStatus.PENDING),
-    db: Session = Depends(get_db),
+    total_mode: TotalMode = Query(default=TotalMode.EXACT),
+    db: SessionRunner = Depends(get_session_runner),
     _: User = Depends(require_role(UserRole.ADMIN)),
-) -> dict:
-    service = PermissionService(db)
-    data = service.list_requests(page=page, page_size=page_size, status=status)
-    data["items"] = [serialize_permission_request(item) for item in data["items"]]
+) -> FastJSONResponse:
+    service = AsyncPermissionService(db)
+    data = await service.list_requests(page=page, page_size=page_size, status=status, total_mode=total_mode)
+    data["items"] = serialize_list(data["items"], PERMISSION_REQUEST_FIELDS)
     data["meta"] = data["meta"].model_dump()
-    return success_response(data=data, message="Permission requests fetched")
+    return fast_success_response(data=data, message="Permission requests fetched")
+
+
+@router.post("/review-batch")
+async def review_permission_requests(
+    payload: BatchReviewPermissionRequests,
+    db: SessionRunner = Depends(get_session_runner),
+    current_user: User = Depends(require_role(UserRole.ADMIN)),
+) -> dict:
+    service = AsyncPermissionService(db)
+    data = await service.review_requests(
+        admin_user=current_user,
+        items=[item.model_dump() for item in payload.items],
+        chunk_size=payload.chunk_size,
+    )
+    for result in data["results"]:
+        if result["success"]:
+            result["request"] = serialize_permission_request(result["request"])
+    return success_response(data=data, message="Requests reviewed")
 
 
 @router.post("/{request_id}/review")
-def review_permission_request(
+async def review_permission_request(
     request_id: int,
     payload: ReviewPermissionRequest,
-    db: Session = Depends(get_db),
+    db: SessionRunner = Depends(get_session_runner),
     current_user: User = Depends(require_role(UserRole.ADMIN)),
 ) -> dict:
-    service = PermissionService(db)
-    data = service.review_request(
+    service = AsyncPermissionService(db)
+    data = await service.review_request(
         request_id=request_id,
         admin_user=current_user,
         decision=payload.decision,
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+
+from app.core.database import async_engine, engine
+from app.core.dependencies import require_role
+from app.core.document_cache import document_cache_stats
+from app.core.enums import UserRole
+from app.core.pool import pool_status
+from app.core.responses import success_response
+from app.models.user import User
+
+router = APIRouter()
+
+
+@router.get("/pool")
+async def get_pool_status(_: User = Depends(require_role(UserRole.ADMIN))) -> dict:
+    data = {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine if async_engine is not None else None),
+    }
+    return success_response(data=data, message="Connection pool status")
+
+
+@router.get("/cache")
+async def get_cache_stats(_: User = Depends(require_role(UserRole.ADMIN))) -> dict:
+    return success_response(data={"documents": document_cache_stats.snapshot()}, message="Cache statistics")
@@ -0,0 +1,19 @@
+import logging
+import re
+
+# Stream tokens travel in the query string; their values are kept out of
+# the access log.
+_TOKEN_QUERY = re.compile(r"([?&]access_token=)[^&\s]*")
+
+
+class RedactTokenFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.args, tuple):
+            record.args = tuple(
+                _TOKEN_QUERY.sub(r"\1[redacted]", arg) if isinstance(arg, str) else arg for arg in record.args
+            )
+        return True
+
+
+def redact_access_log() -> None:
+    logging.getLogger("uvicorn.access").addFilter(RedactTokenFilter())
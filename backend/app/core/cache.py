@@ -0,0 +1,115 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, Protocol
+
+
+class Cache(Protocol):
+    def get(self, key: Hashable) -> Any | None: ...
+
+    def set(self, key: Hashable, value: Any) -> None: ...
+
+    def delete(self, key: Hashable) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class TTLCache:
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    # Shared across workers, so values must be JSON serializable.
+    def __init__(self, url: str, ttl_seconds: float, prefix: str, client: Any | None = None) -> None:
+        if client is None:
+            try:
+                import redis
+            except ImportError as exc:
+                raise RuntimeError("A Redis cache URL requires the redis package") from exc
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.prefix}{key}"
+
+    def get(self, key: Hashable) -> Any | None:
+        raw = self.client.get(self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.client.set(self._key(key), json.dumps(value), px=max(int(self.ttl_seconds * 1000), 1))
+
+    def delete(self, key: Hashable) -> None:
+        self.client.delete(self._key(key))
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+class CacheStats:
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {"hits": hits, "misses": misses, "hit_ratio": round(hits / lookups, 4) if lookups else None}
+
+
+def build_cache(ttl_seconds: float, max_entries: int, redis_url: str | None = None, prefix: str = "") -> Cache:
+    if redis_url:
+        return RedisCache(redis_url, ttl_seconds=ttl_seconds, prefix=prefix)
+    return TTLCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
@@ -1,13 +1,55 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Callable, Generator
+from typing import Protocol, TypeVar
 
+from fastapi import Depends
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.util import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import get_settings
+from app.core.pool import build_engine_options, install_statement_timeout
+
+T = TypeVar("T")
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
 
 settings = get_settings()
-engine = create_engine(settings.database_url, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(settings.database_url, **build_engine_options(settings, settings.database_url))
+install_statement_timeout(engine, settings)
+# Runners close the session after each unit of work, so loaded objects have to
+# stay readable once detached.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+
+def to_async_database_url(database_url: str) -> str:
+    url = make_url(database_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername)).render_as_string(hide_password=False)
+
+
+def build_async_engine(database_url: str) -> AsyncEngine:
+    async_engine = create_async_engine(
+        to_async_database_url(database_url),
+        **build_engine_options(settings, database_url, is_async=True),
+    )
+    install_statement_timeout(async_engine.sync_engine, settings)
+    return async_engine
+
+
+def build_async_sessionmaker(async_engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+async_engine = build_async_engine(settings.database_url) if settings.database_async else None
+AsyncSessionLocal = build_async_sessionmaker(async_engine) if async_engine is not None else None
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -16,3 +58,55 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+# The connection goes back to the pool as soon as a unit of work returns, so
+# it is never held across awaits, response serialization or file streaming.
+class SessionRunner(Protocol):
+    async def run(self, fn: Callable[[Session], T]) -> T: ...
+
+
+# AsyncSessionRunner callbacks run on the event loop inside run_sync, so
+# storage I/O they make under a row lock is handed to the threadpool while the
+# transaction stays open. Sync callbacks already run on a worker thread.
+def run_blocking(fn: Callable[..., T], *args) -> T:
+    if in_greenlet():
+        return await_only(run_in_threadpool(fn, *args))
+    return fn(*args)
+
+
+class SyncSessionRunner:
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def run(self, fn: Callable[[Session], T]) -> T:
+        return await run_in_threadpool(self._run_and_release, fn)
+
+    def _run_and_release(self, fn: Callable[[Session], T]) -> T:
+        try:
+            return fn(self.session)
+        finally:
+            self.session.close()
+
+
+class AsyncSessionRunner:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def run(self, fn: Callable[[Session], T]) -> T:
+        try:
+            return await self.session.run_sync(fn)
+        finally:
+            await self.session.close()
+
+
+async def get_sync_session_runner(db: Session = Depends(get_db)) -> SessionRunner:
+    return SyncSessionRunner(db)
+
+
+async def get_async_session_runner() -> AsyncGenerator[SessionRunner, None]:
+    async with AsyncSessionLocal() as session:
+        yield AsyncSessionRunner(session)
+
+
+get_session_runner = get_async_session_runner if settings.database_async else get_sync_session_runner
@@ -1,45 +1,110 @@
 from collections.abc import Callable
+from typing import TypeVar
 
-from fastapi import Depends
+from fastapi import Depends, Query
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.database import get_db
+from app.core.config import get_settings
+from app.core.database import SessionRunner, get_session_runner
 from app.core.enums import UserRole
 from app.core.exceptions import AppException
 from app.core.security import decode_access_token
+from app.core.user_cache import cache_user, get_cached_user
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
+settings = get_settings()
+T = TypeVar("T")
 
+STREAM_TOKEN_SCOPE = "notifications:stream"
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
+
+def _decode_token(token: str, scope: str | None = None) -> tuple[dict, int]:
     try:
         payload = decode_access_token(token)
     except ValueError as exc:
         raise AppException(status_code=401, code="INVALID_TOKEN", message="Invalid token") from exc
 
+    # Scoped tokens only open the endpoint they were issued for, and access
+    # tokens are not accepted where a scoped one is expected.
+    if payload.get("scope") != scope:
+        raise AppException(status_code=401, code="INVALID_TOKEN", message="Token not valid for this endpoint")
+
     user_id = payload.get("sub")
     if not user_id:
         raise AppException(status_code=401, code="INVALID_TOKEN", message="Token payload missing subject")
 
     try:
-        user_id_int = int(user_id)
+        return payload, int(user_id)
     except (TypeError, ValueError) as exc:
         raise AppException(status_code=401, code="INVALID_TOKEN", message="Invalid token subject") from exc
 
-    user = db.get(User, user_id_int)
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: SessionRunner = Depends(get_session_runner),
+) -> User:
+    _, user_id = _decode_token(token)
+    return await _load_user(user_id, db)
+
+
+async def _load_user(user_id: int, db: SessionRunner) -> User:
+    user = await _call_user_cache(get_cached_user, user_id)
+    if user is not None:
+        return user
+
+    user = await db.run(lambda session: session.get(User, user_id))
     if not user:
         raise AppException(status_code=401, code="USER_NOT_FOUND", message="Token user no longer exists")
 
+    await _call_user_cache(cache_user, user)
     return user
 
 
+async def _call_user_cache(fn: Callable[..., T], *args) -> T:
+    # The Redis backend is a network round trip, so it runs off the event
+    # loop; the in-process backend is a dict lookup.
+    if settings.user_cache_redis_url:
+        return await run_in_threadpool(fn, *args)
+    return fn(*args)
+
+
+async def get_read_only_user(
+    token: str = Depends(oauth2_scheme),
+    db: SessionRunner = Depends(get_session_runner),
+) -> User:
+    # Read-only routes may accept the role and email signed into the token.
+    # A role change then only takes effect there once the token expires.
+    if settings.auth_trust_token_claims:
+        payload, user_id = _decode_token(token)
+        email, role = payload.get("email"), payload.get("role")
+        if email and role in UserRole._value2member_map_:
+            return User(id=user_id, email=email, role=UserRole(role))
+
+    return await get_current_user(token=token, db=db)
+
+
+async def get_stream_user(
+    header_token: str | None = Depends(optional_oauth2_scheme),
+    access_token: str | None = Query(default=None),
+    db: SessionRunner = Depends(get_session_runner),
+) -> User:
+    # Browsers cannot set headers on an EventSource, so streams also accept a
+    # token as a query parameter. URLs end up in access logs and browser
+    # history, so that has to be a short-lived stream token from
+    # POST /notifications/stream-token, never the access token itself.
+    if header_token:
+        return await get_read_only_user(token=header_token, db=db)
+    if not access_token:
+        raise AppException(status_code=401, code="INVALID_TOKEN", message="Not authenticated")
+    _, user_id = _decode_token(access_token, scope=STREAM_TOKEN_SCOPE)
+    return await _load_user(user_id, db)
+
+
 def require_role(*roles: UserRole) -> Callable:
-    def role_dependency(current_user: User = Depends(get_current_user)) -> User:
+    async def role_dependency(current_user: User = Depends(get_current_user)) -> User:
         if current_user.role not in roles:
             raise AppException(status_code=403, code="FORBIDDEN", message="Not enough permissions")
         return current_user
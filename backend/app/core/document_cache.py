@@ -0,0 +1,132 @@
+import json
+import logging
+from collections.abc import Iterable
+from datetime import datetime
+from uuid import uuid4
+
+from sqlalchemy import Row, event
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheStats, build_cache
+from app.core.config import get_settings
+from app.core.enums import DocumentStatus
+from app.models.document import Document
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# An in-process cache never hears about changes made through another worker,
+# so with several workers it is only enabled on top of Redis.
+_cache_enabled = bool(settings.document_cache_redis_url) or settings.web_concurrency <= 1
+if not _cache_enabled:
+    logger.warning("Document cache disabled: WEB_CONCURRENCY > 1 requires DOCUMENT_CACHE_REDIS_URL")
+
+document_cache = build_cache(
+    ttl_seconds=settings.document_cache_ttl_seconds if _cache_enabled else 0,
+    max_entries=settings.document_cache_max_entries if _cache_enabled else 0,
+    redis_url=settings.document_cache_redis_url,
+    prefix="mini-dms:document:",
+)
+document_cache_stats = CacheStats()
+
+_CHANGED_DOCUMENT_IDS = "changed_document_ids"
+_LIST_GENERATION_KEY = "list-generation"
+_DATETIME_FIELDS = ("created_at", "updated_at")
+
+
+def document_key(document_id: int) -> str:
+    # Versioned like list keys: taken before the row is read, so a read that
+    # races a change is stored under the generation it saw.
+    return f"id:{document_id}:{_generation(f'generation:{document_id}')}"
+
+
+def get_cached_document(key: str) -> Document | None:
+    snapshot = document_cache.get(key)
+    document_cache_stats.record(snapshot is not None)
+    return _from_snapshot(snapshot) if snapshot is not None else None
+
+
+def cache_document(key: str, document: Document) -> None:
+    document_cache.set(key, _snapshot(document))
+
+
+def document_list_key(**params) -> str:
+    # Every change starts a new list generation instead of hunting down the
+    # pages it affects. The key is taken before the query runs, so a page read
+    # while a change commits is stored under the generation it saw and is
+    # never served afterwards.
+    return f"list:{_generation(_LIST_GENERATION_KEY)}:{json.dumps(params, sort_keys=True, default=str)}"
+
+
+def get_cached_list(key: str) -> tuple[list[Document], dict] | None:
+    cached = document_cache.get(key)
+    document_cache_stats.record(cached is not None)
+    if cached is None:
+        return None
+    return [_from_snapshot(item) for item in cached["items"]], cached["meta"]
+
+
+def cache_list(key: str, items: list[Row], meta: dict) -> None:
+    document_cache.set(key, {"items": [_snapshot(item) for item in items], "meta": meta})
+
+
+def invalidate_documents(session: Session, document_ids: Iterable[int]) -> None:
+    document_ids = set(document_ids)
+    _drop(document_ids)
+    session.info.setdefault(_CHANGED_DOCUMENT_IDS, set()).update(document_ids)
+
+
+def clear_document_cache() -> None:
+    document_cache.clear()
+    document_cache_stats.reset()
+
+
+def _generation(key: str) -> str:
+    generation = document_cache.get(key)
+    if generation is None:
+        generation = uuid4().hex
+        document_cache.set(key, generation)
+    return generation
+
+
+def _drop(document_ids: set[int]) -> None:
+    for document_id in document_ids:
+        document_cache.set(f"generation:{document_id}", uuid4().hex)
+    document_cache.set(_LIST_GENERATION_KEY, uuid4().hex)
+
+
+def _snapshot(item: Document | Row) -> dict:
+    if isinstance(item, Row):
+        snapshot = item._asdict()
+    else:
+        snapshot = {column.key: getattr(item, column.key) for column in Document.__table__.columns}
+    snapshot["status"] = snapshot["status"].value
+    for field in _DATETIME_FIELDS:
+        if field in snapshot:
+            snapshot[field] = snapshot[field].isoformat()
+    return snapshot
+
+
+def _from_snapshot(snapshot: dict) -> Document:
+    # Like cached users, this is a transient instance that cannot be flushed
+    # back; writes always reload the row with a lock.
+    values = dict(snapshot)
+    values["status"] = DocumentStatus(values["status"])
+    for field in _DATETIME_FIELDS:
+        if field in values:
+            values[field] = datetime.fromisoformat(values[field])
+    return Document(**values)
+
+
+# Same reasoning as for users: a request that read the old row before this
+# commit may cache it after the flush-time invalidation.
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    document_ids = session.info.pop(_CHANGED_DOCUMENT_IDS, None)
+    if document_ids is not None:
+        _drop(document_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_DOCUMENT_IDS, None)
@@ -21,3 +21,21 @@ class PermissionRequestStatus(str, Enum):
     PENDING = "PENDING"
     APPROVED = "APPROVED"
     REJECTED = "REJECTED"
+
+
+class TotalMode(str, Enum):
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    CACHED = "cached"
+    NONE = "none"
+
+
+class OutboxStatus(str, Enum):
+    PENDING = "PENDING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+class OutboxTopic(str, Enum):
+    DELETE_FILE = "storage.delete_file"
+    NOTIFY_ADMINS = "notifications.notify_admins"
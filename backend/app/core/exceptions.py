@@ -10,11 +10,13 @@ class AppException(Exception):
         code: str,
         message: str,
         details: dict | list | None = None,
+        headers: dict[str, str] | None = None,
     ) -> None:
         self.status_code = status_code
         self.code = code
         self.message = message
         self.details = details
+        self.headers = headers
 
 
 async def app_exception_handler(_, exc: AppException) -> JSONResponse:
@@ -28,6 +30,7 @@ async def app_exception_handler(_, exc: AppException) -> JSONResponse:
                 "details": exc.details,
             },
         },
+        headers=exc.headers,
     )
 
 
@@ -0,0 +1,228 @@
+import os
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+_FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+_QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+_STATEMENT_KINDS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+REQUESTS = Counter("http_requests_total", "HTTP requests served", ["method", "route", "status"])
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency", ["method", "route"])
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being served",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database statements executed per request",
+    ["method", "route"],
+    buckets=_QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Database time per request",
+    ["method", "route"],
+    buckets=_FAST_BUCKETS,
+)
+REQUEST_STORAGE_SECONDS = Histogram(
+    "http_request_storage_seconds",
+    "Storage time per request",
+    ["method", "route"],
+    buckets=_FAST_BUCKETS,
+)
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "Database statement latency", ["statement"], buckets=_FAST_BUCKETS)
+STORAGE_SECONDS = Histogram(
+    "storage_operation_duration_seconds",
+    "Storage backend operation latency",
+    ["backend", "operation"],
+    buckets=_FAST_BUCKETS,
+)
+
+
+@dataclass
+class RequestStats:
+    statements: list[str] = field(default_factory=list)
+    db_seconds: float = 0.0
+    storage_seconds: float = 0.0
+
+    @property
+    def queries(self) -> int:
+        return len(self.statements)
+
+
+# Collectors that read this process's state at scrape time. They write no
+# multiprocess files, so a multiprocess scrape registers them again and they
+# report the worker that serves the scrape.
+_status_collectors: list = []
+
+# Set per request by request_stats(). The threadpool and run_sync copy the
+# context, so DB and storage work done on behalf of a request lands here.
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> RequestStats | None:
+    return _request_stats.get()
+
+
+@contextmanager
+def request_stats() -> Iterator[RequestStats]:
+    # Joins the stats of an enclosing request, so every middleware reads the
+    # same count; starts them when MetricsMiddleware is not installed.
+    stats = _request_stats.get()
+    if stats is not None:
+        yield stats
+        return
+    stats = RequestStats()
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+@contextmanager
+def storage_timer(backend: str, operation: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STORAGE_SECONDS.labels(backend, operation).observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.storage_seconds += elapsed
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+    kind = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    DB_QUERY_SECONDS.labels(kind if kind in _STATEMENT_KINDS else "OTHER").observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statements.append(statement)
+        stats.db_seconds += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_query_timer(context) -> None:
+    started = context.connection.info.get("query_started_at") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def _route_template(scope: Scope) -> str:
+    # Labels use the route template, never the raw path, to keep the series
+    # count bounded.
+    partial = None
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = _route_template(scope)
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        started = time.perf_counter()
+        with request_stats() as stats:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                elapsed = time.perf_counter() - started
+                in_progress.dec()
+                REQUESTS.labels(method, route, str(status_code)).inc()
+                REQUEST_LATENCY.labels(method, route).observe(elapsed)
+                REQUEST_DB_QUERIES.labels(method, route).observe(stats.queries)
+                REQUEST_DB_SECONDS.labels(method, route).observe(stats.db_seconds)
+                REQUEST_STORAGE_SECONDS.labels(method, route).observe(stats.storage_seconds)
+
+
+class StatusCollector:
+    # Reads connection pool and cache state at scrape time instead of
+    # tracking it on every checkout and lookup.
+    def __init__(self, pool_statuses: Callable[[], dict], cache_stats: Callable[[], dict]) -> None:
+        self.pool_statuses = pool_statuses
+        self.cache_stats = cache_stats
+
+    def collect(self):
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections checked out", labels=["engine"])
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Overflow connections open", labels=["engine"])
+        checkouts = CounterMetricFamily("db_pool_checkouts", "Pool checkouts", labels=["engine"])
+        timeouts = CounterMetricFamily("db_pool_checkout_timeouts", "Pool checkouts that timed out", labels=["engine"])
+        for engine_name, status in self.pool_statuses().items():
+            if not status or "size" not in status:
+                continue
+            checked_out.add_metric([engine_name], status["checked_out"])
+            size.add_metric([engine_name], status["size"])
+            overflow.add_metric([engine_name], status["overflow"])
+            if "wait" in status:
+                checkouts.add_metric([engine_name], status["wait"]["checkouts"])
+                timeouts.add_metric([engine_name], status["wait"]["timeouts"])
+        yield from (checked_out, size, overflow, checkouts, timeouts)
+
+        hits = CounterMetricFamily("cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache misses", labels=["cache"])
+        for cache_name, stats in self.cache_stats().items():
+            hits.add_metric([cache_name], stats["hits"])
+            misses.add_metric([cache_name], stats["misses"])
+        yield from (hits, misses)
+
+
+def register_status_collector(collector: StatusCollector) -> None:
+    REGISTRY.register(collector)
+    _status_collectors.append(collector)
+
+
+def render_metrics() -> bytes:
+    # Under a multi-worker server each process writes its samples to
+    # PROMETHEUS_MULTIPROC_DIR and a scrape aggregates all of them.
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        for collector in _status_collectors:
+            registry.register(collector)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
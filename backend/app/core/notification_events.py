@@ -0,0 +1,168 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+NOTIFICATION_CHANNEL = "notifications"
+_PENDING_EVENTS = "pending_notification_events"
+
+
+def notification_event(notification_id: int, row: dict) -> dict:
+    created_at = row.get("created_at")
+    return {
+        "id": notification_id,
+        "user_id": row["user_id"],
+        "type": row["type"],
+        "message": row["message"],
+        "related_entity_id": row.get("related_entity_id"),
+        "is_read": bool(row.get("is_read", False)),
+        "created_at": created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+    }
+
+
+class NotificationBroker:
+    def __init__(self) -> None:
+        self._subscribers: dict[int, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.notification_stream_queue_size)
+        subscription = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        try:
+            yield queue
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(user_id, set())
+                subscribers.discard(subscription)
+                if not subscribers:
+                    self._subscribers.pop(user_id, None)
+
+    def publish(self, notification: dict) -> None:
+        # Called from request threads and the LISTEN thread, so delivery is
+        # handed to the loop that owns each queue.
+        with self._lock:
+            subscriptions = list(self._subscribers.get(notification["user_id"], ()))
+        for loop, queue in subscriptions:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, notification)
+            except RuntimeError:
+                continue
+
+
+def _offer(queue: asyncio.Queue, notification: dict) -> None:
+    # A client that stops reading loses live events rather than growing the
+    # queue without bound; it can catch up through GET /notifications.
+    try:
+        queue.put_nowait(notification)
+    except asyncio.QueueFull:
+        logger.warning("Dropping notification %s for a slow stream consumer", notification["id"])
+
+
+notification_broker = NotificationBroker()
+
+
+def announce_notifications(session: Session, notifications: list[dict]) -> None:
+    if not notifications:
+        return
+
+    if session.get_bind().dialect.name == "postgresql":
+        # NOTIFY is transactional: PostgreSQL delivers it to every listening
+        # API node only if this transaction commits.
+        session.execute(
+            text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {
+                "channel": NOTIFICATION_CHANNEL,
+                "payloads": [json.dumps(notification) for notification in notifications],
+            },
+        )
+        return
+
+    session.info.setdefault(_PENDING_EVENTS, []).extend(notifications)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    for notification in session.info.pop(_PENDING_EVENTS, ()):
+        notification_broker.publish(notification)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_EVENTS, None)
+
+
+class PostgresNotificationListener(threading.Thread):
+    def __init__(self, database_url: str, poll_seconds: float = 5.0) -> None:
+        super().__init__(name="notification-listener", daemon=True)
+        # LISTEN needs a session-level connection, so it bypasses the pool (and
+        # must not go through PgBouncer in transaction mode).
+        url = make_url(database_url).set(drivername="postgresql+psycopg2")
+        self.engine = create_engine(url, poolclass=NullPool)
+        self.poll_seconds = poll_seconds
+        self.stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Notification listener lost its connection, reconnecting")
+                self.stop_event.wait(self.poll_seconds)
+
+    def _listen(self) -> None:
+        connection = self.engine.raw_connection()
+        try:
+            dbapi_connection = connection.dbapi_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFICATION_CHANNEL}")
+
+            while not self.stop_event.is_set():
+                readable, _, _ = select.select([dbapi_connection], [], [], self.poll_seconds)
+                if not readable:
+                    continue
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    notify = dbapi_connection.notifies.pop(0)
+                    notification_broker.publish(json.loads(notify.payload))
+        finally:
+            connection.close()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+
+_listener: PostgresNotificationListener | None = None
+
+
+def start_notification_listener() -> None:
+    global _listener
+    listen_url = settings.notification_listen_url or settings.database_url
+    if _listener is not None or make_url(listen_url).get_backend_name() != "postgresql":
+        return
+    _listener = PostgresNotificationListener(listen_url)
+    _listener.start()
+
+
+def stop_notification_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,90 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.config import get_settings
+from app.core.exceptions import AppException
+from app.core.security import get_password_hash, verify_and_update_password
+
+settings = get_settings()
+
+
+class PasswordHasher:
+    # bcrypt is CPU bound and holds the GIL for its whole run, so it goes to
+    # worker processes. At most max_workers + queue_size calls are in flight;
+    # anything beyond that is rejected instead of piling up behind a burst.
+    def __init__(self, max_workers: int, queue_size: int) -> None:
+        self.max_workers = max_workers
+        self.capacity = max_workers + queue_size
+        self.in_flight = 0
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            # The server already runs threads (the threadpool, the outbox
+            # worker, pool housekeeping), and forking it can leave children
+            # stuck on locks held at fork time, so workers come from a
+            # forkserver (spawn where there is none) instead.
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(method),
+            )
+        return self._executor
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(get_password_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return await self._submit(verify_and_update_password, password, hashed_password)
+
+    async def _submit(self, fn, *args):
+        if self.in_flight >= self.capacity:
+            raise AppException(
+                status_code=429,
+                code="TOO_MANY_REQUESTS",
+                message="Too many concurrent sign-ins, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        executor = self.executor
+        try:
+            return await self._run(executor, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (OOM kill, segfault) and the pool refuses all
+            # further work, so it is replaced and the call retried once.
+            self._discard(executor)
+            return await self._run(self.executor, fn, *args)
+
+    async def _run(self, executor: Executor, fn, *args):
+        future = executor.submit(fn, *args)
+        with self._lock:
+            self.in_flight += 1
+        # Capacity is freed when the work ends, not when the caller stops
+        # waiting: a cancelled request leaves its bcrypt call running.
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _discard(self, executor: Executor) -> None:
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.password_hash_workers,
+    queue_size=settings.password_hash_queue_size,
+)
@@ -0,0 +1,139 @@
+import threading
+import time
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.core.config import Settings, get_settings
+
+
+class PoolWaitStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, wait_seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_seconds / attempts * 1000, 3) if attempts else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+class _TimedCheckoutMixin:
+    # Times the whole checkout, which includes blocking on a saturated pool
+    # and opening overflow connections.
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except sa_exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def build_engine_options(settings: Settings, database_url: str, is_async: bool = False) -> dict:
+    options: dict[str, Any] = {"pool_pre_ping": settings.database_pool_pre_ping}
+    if settings.database_pgbouncer:
+        # PgBouncer already pools server connections; a second pool in the app
+        # would only pin bouncer clients.
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout=settings.database_pool_timeout_seconds,
+            pool_recycle=settings.database_pool_recycle_seconds,
+        )
+
+    if make_url(database_url).get_backend_name() != "postgresql":
+        return options
+
+    connect_args: dict[str, Any] = {}
+    if is_async and settings.database_pgbouncer:
+        # Named prepared statements do not survive transaction pooling, where
+        # consecutive transactions may land on different server connections.
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid4().hex}__",
+        )
+    if settings.database_statement_timeout_ms and not settings.database_pgbouncer:
+        timeout = str(settings.database_statement_timeout_ms)
+        if is_async:
+            connect_args["server_settings"] = {"statement_timeout": timeout}
+        else:
+            connect_args["options"] = f"-c statement_timeout={timeout}"
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+def install_statement_timeout(engine: Engine, settings: Settings) -> None:
+    # PgBouncer rejects startup options, so behind it the timeout is set per
+    # transaction instead.
+    if not (settings.database_pgbouncer and settings.database_statement_timeout_ms):
+        return
+    if engine.dialect.name != "postgresql":
+        return
+
+    timeout = int(settings.database_statement_timeout_ms)
+
+    @event.listens_for(engine, "begin")
+    def set_statement_timeout(connection) -> None:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout}")
+
+
+def pool_status(engine: Engine | None) -> dict | None:
+    if engine is None:
+        return None
+
+    pool = engine.pool
+    status: dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            # Configured value; QueuePool only keeps it privately.
+            max_overflow=get_settings().database_max_overflow,
+        )
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        status["wait"] = wait_stats.snapshot()
+    return status
@@ -0,0 +1,111 @@
+import json
+import logging
+from collections import Counter
+from typing import Literal
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import request_stats
+
+logger = logging.getLogger(__name__)
+
+
+def repeated_statements(statements: list[str], threshold: int = 2) -> dict[str, int]:
+    # Parameters are bound, so an N+1 shows up as the same SQL text over and
+    # over.
+    return {statement: count for statement, count in Counter(statements).most_common() if count >= threshold}
+
+
+class QueryCounter:
+    # Counts statements from every engine and thread while active, which
+    # includes the TestClient's app thread.
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+        self._listener = self._record
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(Engine, "before_cursor_execute", self._listener)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(Engine, "before_cursor_execute", self._listener)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int = 2) -> dict[str, int]:
+        return repeated_statements(self.statements, threshold)
+
+
+class QueryBudgetMiddleware:
+    # A development aid: "raise" swaps the response for a 500 before it is
+    # sent, but by then the request's transaction has already committed.
+    def __init__(self, app: ASGIApp, budget: int, action: Literal["log", "raise"] = "log") -> None:
+        self.app = app
+        self.budget = budget
+        self.action = action
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with request_stats() as stats:
+            statements = stats.statements
+            reported = False
+            replaced = False
+
+            async def send_within_budget(message: Message) -> None:
+                nonlocal reported, replaced
+                if replaced:
+                    return
+                if message["type"] == "http.response.start" and len(statements) > self.budget:
+                    reported = True
+                    self._report(scope, statements)
+                    if self.action == "raise":
+                        replaced = True
+                        await self._send_error(send, statements)
+                        return
+                await send(message)
+
+            await self.app(scope, receive, send_within_budget)
+            # Streaming responses can keep querying after the headers went out.
+            if not reported and len(statements) > self.budget:
+                self._report(scope, statements)
+
+    def _report(self, scope: Scope, statements: list[str]) -> None:
+        repeated = repeated_statements(statements)
+        logger.warning(
+            "%s %s ran %d queries (budget %d); repeated: %s",
+            scope["method"],
+            scope["path"],
+            len(statements),
+            self.budget,
+            json.dumps(repeated) if repeated else "none",
+        )
+
+    async def _send_error(self, send: Send, statements: list[str]) -> None:
+        body = json.dumps(
+            {
+                "success": False,
+                "error": {
+                    "code": "QUERY_BUDGET_EXCEEDED",
+                    "message": f"Request ran {len(statements)} queries, over the budget of {self.budget}",
+                    "details": {"repeated": repeated_statements(statements)},
+                },
+            }
+        ).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 500,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -1,2 +1,23 @@
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    # Routes that return this directly skip FastAPI's validation and
+    # jsonable_encoder passes; orjson encodes datetimes and enums itself.
+    # Routes annotated "-> dict" are serialized through that pydantic return
+    # type, which writes UTC as "Z" rather than isoformat()'s "+00:00";
+    # OPT_UTC_Z makes list pages match those detail responses.
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
 def success_response(data: dict | list | str | int | float | bool | None = None, message: str = "OK") -> dict:
     return {"success": True, "message": message, "data": data}
+
+
+def fast_success_response(
+    data: dict | list | str | int | float | bool | None = None,
+    message: str = "OK",
+) -> FastJSONResponse:
+    return FastJSONResponse(success_response(data=data, message=message))
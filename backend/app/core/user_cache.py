@@ -0,0 +1,86 @@
+import logging
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import build_cache
+from app.core.config import get_settings
+from app.core.enums import UserRole
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Role changes and deletions are only invalidated in the worker that made
+# them, so with several workers the cache needs Redis, as the document cache does.
+_cache_enabled = bool(settings.user_cache_redis_url) or settings.web_concurrency <= 1
+if not _cache_enabled:
+    logger.warning("User cache disabled: WEB_CONCURRENCY > 1 requires USER_CACHE_REDIS_URL")
+
+user_cache = build_cache(
+    ttl_seconds=settings.user_cache_ttl_seconds if _cache_enabled else 0,
+    max_entries=settings.user_cache_max_entries if _cache_enabled else 0,
+    redis_url=settings.user_cache_redis_url,
+    prefix="mini-dms:user:",
+)
+
+_INVALIDATED_USER_IDS = "invalidated_user_ids"
+
+
+def get_cached_user(user_id: int) -> User | None:
+    snapshot = user_cache.get(user_id)
+    if snapshot is None:
+        return None
+    # A transient instance without the password hash, which is never cached.
+    # It is not attached to a session, so it cannot be flushed back.
+    return User(
+        id=snapshot["id"],
+        email=snapshot["email"],
+        full_name=snapshot["full_name"],
+        role=UserRole(snapshot["role"]),
+        created_at=datetime.fromisoformat(snapshot["created_at"]),
+    )
+
+
+def cache_user(user: User) -> None:
+    user_cache.set(
+        user.id,
+        {
+            "id": user.id,
+            "email": user.email,
+            "full_name": user.full_name,
+            "role": user.role.value,
+            "created_at": user.created_at.isoformat(),
+        },
+    )
+
+
+def invalidate_user(user_id: int) -> None:
+    user_cache.delete(user_id)
+
+
+def clear_user_cache() -> None:
+    user_cache.clear()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_flush(mapper, connection, target: User) -> None:
+    invalidate_user(target.id)
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(_INVALIDATED_USER_IDS, set()).add(target.id)
+
+
+# A concurrent request may re-cache the old row between the flush and the
+# commit, so changed users are dropped again once the change is visible.
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    for user_id in session.info.pop(_INVALIDATED_USER_IDS, ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session) -> None:
+    session.info.pop(_INVALIDATED_USER_IDS, None)
@@ -1,15 +1,32 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.router import api_router
+from app.core.access_log import redact_access_log
 from app.core.config import get_settings
+from app.core.database import SessionLocal, async_engine, engine
+from app.core.document_cache import document_cache_stats
 from app.core.exceptions import register_exception_handlers
+from app.core.metrics import (
+    METRICS_CONTENT_TYPE,
+    MetricsMiddleware,
+    StatusCollector,
+    register_status_collector,
+    render_metrics,
+)
+from app.core.notification_events import start_notification_listener, stop_notification_listener
+from app.core.password_hashing import password_hasher
+from app.core.pool import pool_status
+from app.core.query_budget import QueryBudgetMiddleware
 from app.utils.file_storage import ensure_storage_directories
+from app.workers.outbox_worker import OutboxWorker
 
 settings = get_settings()
+outbox_worker = OutboxWorker(SessionLocal, poll_seconds=settings.outbox_poll_seconds)
 
 app = FastAPI(title=settings.app_name)
 register_exception_handlers(app)
+redact_access_log()
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,10 +36,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.query_budget is not None:
+    app.add_middleware(QueryBudgetMiddleware, budget=settings.query_budget, action=settings.query_budget_action)
+
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+    register_status_collector(
+        StatusCollector(
+            pool_statuses=lambda: {
+                "sync": pool_status(engine),
+                "async": pool_status(async_engine.sync_engine if async_engine is not None else None),
+            },
+            cache_stats=lambda: {"documents": document_cache_stats.snapshot()},
+        )
+    )
+
 
 @app.on_event("startup")
-def on_startup() -> None:
+async def on_startup() -> None:
     ensure_storage_directories()
+    start_notification_listener()
+    if settings.outbox_worker_enabled:
+        outbox_worker.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await outbox_worker.stop()
+    password_hasher.shutdown()
+    stop_notification_listener()
 
 
 @app.get("/health")
@@ -30,4 +72,11 @@ def health_check() -> dict:
     return {"success": True, "message": "Healthy", "data": {"status": "ok"}}
 
 
+if settings.metrics_enabled:
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics() -> Response:
+        return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
 app.include_router(api_router, prefix="/api/v1")
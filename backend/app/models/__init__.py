@@ -1,6 +1,9 @@
+from app.models.blob import Blob
 from app.models.document import Document
+from app.models.import_progress import ImportProgress
 from app.models.notification import Notification
+from app.models.outbox_event import OutboxEvent
 from app.models.permission_request import PermissionRequest
 from app.models.user import User
 
-__all__ = ["User", "Document", "PermissionRequest", "Notification"]
+__all__ = ["User", "Document", "PermissionRequest", "Notification", "Blob", "OutboxEvent", "ImportProgress"]
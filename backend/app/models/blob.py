@@ -0,0 +1,17 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import BigInteger, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class Blob(Base):
+    __tablename__ = "blobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    relative_path: Mapped[str] = mapped_column(String(500), unique=True, nullable=False, index=True)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False)
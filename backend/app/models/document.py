@@ -1,26 +1,32 @@
 from datetime import UTC, datetime
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import DDL, BigInteger, DateTime, Enum, ForeignKey, Index, Integer, String, Text, event, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.enums import DocumentStatus
 from app.models.base import Base
 
+# Also hardcoded in migration 20260305_0003; changing it needs a migration
+# that regenerates documents.search_vector with the new config.
+DOCUMENT_SEARCH_CONFIG = "simple"
+
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (Index("ix_documents_created_at_id", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=False)
-    document_type: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    document_type: Mapped[str] = mapped_column(String(100), nullable=False)
     file_url: Mapped[str] = mapped_column(String(500), nullable=False)
+    file_size: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    file_sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
     version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
     status: Mapped[DocumentStatus] = mapped_column(
         Enum(DocumentStatus, name="document_status"),
         nullable=False,
         default=DocumentStatus.ACTIVE,
-        index=True,
     )
     created_by: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="RESTRICT"), nullable=False, index=True)
     locked_by_request_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
@@ -33,3 +39,54 @@ class Document(Base):
     )
 
     creator = relationship("User", back_populates="documents")
+
+
+# List filters always sort by (created_at, id), so the filter column leads and
+# the sort key follows; document_type is matched case-insensitively.
+Index("ix_documents_status_created_at_id", Document.status, Document.created_at, Document.id)
+Index(
+    "ix_documents_lower_document_type_created_at_id",
+    func.lower(Document.document_type),
+    Document.created_at,
+    Document.id,
+)
+
+
+# Search structures live outside the mapped columns so the ORM model stays
+# portable: PostgreSQL gets a generated tsvector plus trigram indexes, SQLite
+# gets an FTS5 index kept in sync by triggers.
+_POSTGRES_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE documents ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    f"setweight(to_tsvector('{DOCUMENT_SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{DOCUMENT_SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX ix_documents_search_vector ON documents USING gin (search_vector)",
+    "CREATE INDEX ix_documents_title_trgm ON documents USING gin (title gin_trgm_ops)",
+    "CREATE INDEX ix_documents_description_trgm ON documents USING gin (description gin_trgm_ops)",
+]
+
+_SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5("
+    "title, description, content='documents', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER documents_fts_ai AFTER INSERT ON documents BEGIN "
+    "INSERT INTO documents_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER documents_fts_ad AFTER DELETE ON documents BEGIN "
+    "INSERT INTO documents_fts(documents_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER documents_fts_au AFTER UPDATE OF title, description ON documents BEGIN "
+    "INSERT INTO documents_fts(documents_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO documents_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+]
+
+for _statement in _POSTGRES_SEARCH_DDL:
+    event.listen(Document.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in _SQLITE_SEARCH_DDL:
+    event.listen(Document.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(
+    Document.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS documents_fts").execute_if(dialect="sqlite"),
+)
@@ -0,0 +1,136 @@
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.blob import Blob
+from app.utils.file_storage import StoredFile
+
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class BlobRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_by_path_for_update(self, relative_path: str) -> Blob | None:
+        stmt = (
+            select(Blob)
+            .where(Blob.relative_path == relative_path)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        return self.db.scalar(stmt)
+
+    def lock_paths(self, relative_paths: list[str]) -> None:
+        if not relative_paths:
+            return
+        stmt = (
+            select(Blob.id)
+            .where(Blob.relative_path.in_(relative_paths))
+            .order_by(Blob.relative_path)
+            .with_for_update()
+        )
+        self.db.execute(stmt)
+
+    def retain(self, stored_file: StoredFile) -> None:
+        insert = _UPSERT_INSERTS.get(self.db.get_bind().dialect.name)
+        if insert is not None:
+            stmt = insert(Blob).values(
+                relative_path=stored_file.relative_path,
+                sha256=stored_file.sha256,
+                size=stored_file.size,
+                ref_count=1,
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Blob.relative_path],
+                set_={"ref_count": Blob.ref_count + 1},
+            )
+            self.db.execute(stmt)
+            return
+
+        blob = self.get_by_path_for_update(stored_file.relative_path)
+        if blob:
+            blob.ref_count += 1
+        else:
+            self.db.add(
+                Blob(
+                    relative_path=stored_file.relative_path,
+                    sha256=stored_file.sha256,
+                    size=stored_file.size,
+                    ref_count=1,
+                )
+            )
+        self.db.flush()
+
+    def retain_many(self, stored_files: list[StoredFile]) -> None:
+        # One upsert for the whole batch; duplicate uploads inside the batch
+        # are folded into a single row so PostgreSQL never updates a row twice
+        # in one statement.
+        references: dict[str, tuple[StoredFile, int]] = {}
+        for stored_file in stored_files:
+            _, count = references.get(stored_file.relative_path, (stored_file, 0))
+            references[stored_file.relative_path] = (stored_file, count + 1)
+
+        insert = _UPSERT_INSERTS.get(self.db.get_bind().dialect.name)
+        if insert is None:
+            for stored_file in stored_files:
+                self.retain(stored_file)
+            return
+        if not references:
+            return
+
+        stmt = insert(Blob).values(
+            [
+                {
+                    "relative_path": relative_path,
+                    "sha256": stored_file.sha256,
+                    "size": stored_file.size,
+                    "ref_count": count,
+                }
+                for relative_path, (stored_file, count) in sorted(references.items())
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Blob.relative_path],
+            set_={"ref_count": Blob.ref_count + stmt.excluded.ref_count},
+        )
+        self.db.execute(stmt)
+
+    def release(self, relative_path: str | None) -> bool:
+        # Returns True once nothing references the file any more. Paths without
+        # a blob row predate content addressing and have a single owner.
+        if not relative_path:
+            return False
+        blob = self.get_by_path_for_update(relative_path)
+        if not blob:
+            return True
+        blob.ref_count -= 1
+        if blob.ref_count <= 0:
+            self.db.delete(blob)
+            self.db.flush()
+            return True
+        self.db.flush()
+        return False
+
+    def lock_unreferenced(self, relative_path: str) -> bool:
+        # Returns True when the file may be unlinked. A zero-reference row is
+        # upserted and held locked until the caller commits, so an upload of
+        # the same content waits in retain and then places its copy again;
+        # the upsert also waits on a reference that is not committed yet,
+        # which a plain SELECT ... FOR UPDATE would not see.
+        insert = _UPSERT_INSERTS.get(self.db.get_bind().dialect.name)
+        if insert is not None:
+            stmt = insert(Blob).values(relative_path=relative_path, sha256="", size=0, ref_count=0)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Blob.relative_path],
+                set_={"ref_count": Blob.ref_count},
+            )
+            self.db.execute(stmt)
+        blob = self.get_by_path_for_update(relative_path)
+        if not blob:
+            return True
+        if blob.ref_count > 0:
+            return False
+        self.db.delete(blob)
+        self.db.flush()
+        return True
@@ -0,0 +1,74 @@
+import json
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.enums import TotalMode
+
+settings = get_settings()
+
+_count_cache = TTLCache(ttl_seconds=settings.count_cache_ttl_seconds, max_entries=settings.count_cache_max_entries)
+
+
+def count_rows(db: Session, stmt: Select, total_mode: TotalMode) -> tuple[int | None, TotalMode]:
+    if total_mode == TotalMode.NONE:
+        return None, TotalMode.NONE
+
+    if total_mode == TotalMode.ESTIMATE:
+        if db.get_bind().dialect.name == "postgresql":
+            return _estimate_rows(db, stmt), TotalMode.ESTIMATE
+        total_mode = TotalMode.CACHED
+
+    if total_mode == TotalMode.CACHED:
+        return _cached_count(db, stmt), TotalMode.CACHED
+
+    return _exact_count(db, stmt), TotalMode.EXACT
+
+
+def clear_count_cache() -> None:
+    _count_cache.clear()
+
+
+def _exact_count(db: Session, stmt: Select) -> int:
+    count_stmt = select(func.count()).select_from(stmt.subquery())
+    return int(db.scalar(count_stmt) or 0)
+
+
+class ExplainJSON(Executable, ClauseElement):
+    # Wraps a statement so SQLAlchemy compiles it for the active driver: bind
+    # parameters keep their type processing and the driver's paramstyle.
+    inherit_cache = False
+
+    def __init__(self, stmt: Select) -> None:
+        self.stmt = stmt
+
+
+@compiles(ExplainJSON)
+def _compile_explain(element: ExplainJSON, compiler, **kw) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.stmt, **kw)}"
+
+
+def _estimate_rows(db: Session, stmt: Select) -> int:
+    # The planner row estimate is derived from pg_class.reltuples and column
+    # statistics, so it costs a plan instead of a scan.
+    plan = db.execute(ExplainJSON(stmt)).scalar()
+    # psycopg2 decodes json columns, asyncpg hands back the text.
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return max(0, int(plan[0]["Plan"]["Plan Rows"]))
+
+
+def _cached_count(db: Session, stmt: Select) -> int:
+    compiled = stmt.compile(dialect=db.get_bind().dialect)
+    key = (str(compiled), tuple(sorted((name, repr(value)) for name, value in compiled.params.items())))
+
+    total = _count_cache.get(key)
+    if total is None:
+        total = _exact_count(db, stmt)
+        _count_cache.set(key, total)
+    return total
@@ -1,8 +1,17 @@
-from sqlalchemy import Select, func, or_, select
+import re
+from datetime import datetime
+
+from sqlalchemy import ColumnElement, Row, Select, func, insert, literal_column, or_, select, text, tuple_
 from sqlalchemy.orm import Session
 
-from app.core.enums import DocumentStatus
-from app.models.document import Document
+from app.core.enums import DocumentStatus, TotalMode
+from app.models.document import DOCUMENT_SEARCH_CONFIG, Document
+from app.repositories.counting import count_rows
+from app.utils.serializers import DOCUMENT_FIELDS
+
+# List pages load plain rows with the fields serialize_document returns,
+# skipping ORM instance construction and the identity map.
+LIST_COLUMNS = tuple(getattr(Document, field) for field in DOCUMENT_FIELDS)
 
 
 class DocumentRepository:
@@ -15,6 +24,12 @@ class DocumentRepository:
         self.db.flush()
         return document
 
+    def create_many(self, rows: list[dict]) -> list[Document]:
+        if not rows:
+            return []
+        stmt = insert(Document).returning(Document, sort_by_parameter_order=True)
+        return list(self.db.scalars(stmt, rows).all())
+
     def get_by_id(self, document_id: int) -> Document | None:
         return self.db.get(Document, document_id)
 
@@ -22,6 +37,10 @@ class DocumentRepository:
         stmt = select(Document).where(Document.id == document_id).with_for_update()
         return self.db.scalar(stmt)
 
+    def get_many_for_update(self, document_ids: list[int]) -> list[Document]:
+        stmt = select(Document).where(Document.id.in_(document_ids)).order_by(Document.id).with_for_update()
+        return list(self.db.scalars(stmt).all())
+
     def list_paginated(
         self,
         page: int,
@@ -29,26 +48,102 @@ class DocumentRepository:
         search: str | None,
         status: DocumentStatus | None,
         document_type: str | None,
-    ) -> tuple[list[Document], int]:
+        cursor: tuple[datetime, int] | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[list[Row], int | None, TotalMode, tuple[datetime, int] | None]:
+        stmt, rank = self._filtered(search=search, status=status, document_type=document_type)
+
+        total, total_mode = count_rows(self.db, stmt, total_mode)
+
+        # Relevance ordering only applies to offset pages; keyset pages must keep
+        # the (created_at, id) order the cursor encodes.
+        keyset_ordered = cursor is not None or rank is None
+        if cursor:
+            items_stmt = stmt.where(tuple_(Document.created_at, Document.id) < cursor)
+        else:
+            items_stmt = stmt.offset((page - 1) * page_size)
+            if rank is not None:
+                items_stmt = items_stmt.order_by(rank.desc())
+        items_stmt = items_stmt.order_by(Document.created_at.desc(), Document.id.desc())
+
+        items = list(self.db.execute(items_stmt.with_only_columns(*LIST_COLUMNS).limit(page_size + 1)).all())
+        next_key = None
+        if len(items) > page_size and keyset_ordered:
+            next_key = (items[page_size - 1].created_at, items[page_size - 1].id)
+        return items[:page_size], total, total_mode, next_key
+
+    def list_for_export(
+        self,
+        search: str | None,
+        status: DocumentStatus | None,
+        document_type: str | None,
+        created_by: int | None,
+        limit: int,
+    ) -> list[Document]:
+        stmt, _ = self._filtered(search=search, status=status, document_type=document_type)
+        if created_by is not None:
+            stmt = stmt.where(Document.created_by == created_by)
+        return list(self.db.scalars(stmt.order_by(Document.id).limit(limit)).all())
+
+    def get_many(self, document_ids: list[int]) -> list[Document]:
+        stmt = select(Document).where(Document.id.in_(document_ids)).order_by(Document.id)
+        return list(self.db.scalars(stmt).all())
+
+    def _filtered(
+        self,
+        search: str | None,
+        status: DocumentStatus | None,
+        document_type: str | None,
+    ) -> tuple[Select[tuple[Document]], ColumnElement | None]:
         stmt: Select[tuple[Document]] = select(Document)
 
+        rank = None
         if search:
-            search_pattern = f"%{search}%"
-            stmt = stmt.where(
-                or_(
-                    Document.title.ilike(search_pattern),
-                    Document.description.ilike(search_pattern),
-                )
-            )
+            stmt, rank = self._apply_search(stmt, search)
         if status:
             stmt = stmt.where(Document.status == status)
         if document_type:
-            stmt = stmt.where(Document.document_type.ilike(document_type))
+            # Equality on lower() rather than ILIKE, so the functional index
+            # applies and "_" or "%" in the filter are not wildcards.
+            stmt = stmt.where(func.lower(Document.document_type) == func.lower(document_type))
+        return stmt, rank
+
+    def _apply_search(self, stmt: Select, search: str) -> tuple[Select, ColumnElement | None]:
+        search_pattern = f"%{search}%"
+        substring_match = or_(
+            Document.title.ilike(search_pattern),
+            Document.description.ilike(search_pattern),
+        )
+        terms = re.findall(r"\w+", search.lower())
+        dialect = self.db.get_bind().dialect.name
 
-        count_stmt = select(func.count()).select_from(stmt.subquery())
-        total = int(self.db.scalar(count_stmt) or 0)
+        if dialect == "postgresql" and terms:
+            ts_query = func.websearch_to_tsquery(DOCUMENT_SEARCH_CONFIG, search)
+            search_vector = literal_column("documents.search_vector")
+            condition = search_vector.op("@@")(ts_query)
+            # ILIKE is served by the pg_trgm GIN indexes, so substring matches
+            # cover partial words the tsquery misses. pg_trgm cannot narrow a
+            # pattern without a three-character term, and the OR would then
+            # scan the whole table.
+            if max(len(term) for term in terms) >= 3:
+                condition = or_(condition, substring_match)
+            return stmt.where(condition), func.ts_rank_cd(search_vector, ts_query)
+
+        if dialect == "sqlite" and terms:
+            match_query = " ".join(f'"{term}"*' for term in terms)
+            fts_matches = (
+                select(
+                    literal_column("documents_fts.rowid").label("document_id"),
+                    literal_column("bm25(documents_fts, 10.0, 1.0)").label("score"),
+                )
+                .select_from(text("documents_fts"))
+                .where(text("documents_fts MATCH :fts_query").bindparams(fts_query=match_query))
+                .subquery()
+            )
+            # Only FTS matches qualify: an ILIKE alongside would scan every
+            # row. Terms match whole words or word prefixes.
+            stmt = stmt.join(fts_matches, fts_matches.c.document_id == Document.id)
+            # bm25() scores better matches with more negative numbers.
+            return stmt, -fts_matches.c.score
 
-        offset = (page - 1) * page_size
-        items_stmt = stmt.order_by(Document.created_at.desc()).offset(offset).limit(page_size)
-        items = list(self.db.scalars(items_stmt).all())
-        return items, total
+        return stmt.where(substring_match), None
@@ -0,0 +1,21 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.import_progress import ImportProgress
+
+
+class ImportProgressRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, source: str) -> ImportProgress | None:
+        return self.db.scalar(select(ImportProgress).where(ImportProgress.source == source))
+
+    def save(self, source: str, next_index: int, imported: int, failed: int) -> None:
+        progress = self.get(source)
+        if progress is None:
+            progress = ImportProgress(source=source)
+            self.db.add(progress)
+        progress.next_index = next_index
+        progress.imported = imported
+        progress.failed = failed
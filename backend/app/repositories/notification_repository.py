@@ -1,7 +1,19 @@
-from sqlalchemy import Select, func, select
+import io
+from datetime import UTC, datetime
+
+from sqlalchemy import Row, Select, false, func, insert, select, text, update
 from sqlalchemy.orm import Session
 
+from app.core.enums import TotalMode
+from app.core.notification_events import announce_notifications, notification_event
 from app.models.notification import Notification
+from app.repositories.counting import count_rows
+from app.utils.serializers import NOTIFICATION_FIELDS
+
+# Above this many rows PostgreSQL fan-outs are streamed with COPY instead of
+# multi-row INSERT statements.
+COPY_THRESHOLD = 1000
+LIST_COLUMNS = tuple(getattr(Notification, field) for field in NOTIFICATION_FIELDS)
 
 
 class NotificationRepository:
@@ -12,32 +24,93 @@ class NotificationRepository:
         notification = Notification(**kwargs)
         self.db.add(notification)
         self.db.flush()
+        row = {column: getattr(notification, column) for column in NOTIFICATION_FIELDS}
+        announce_notifications(self.db, [notification_event(notification.id, row)])
         return notification
 
-    def create_many(self, payloads: list[dict]) -> list[Notification]:
-        records: list[Notification] = []
-        for payload in payloads:
-            records.append(self.create(**payload))
-        return records
+    def create_many(self, payloads: list[dict]) -> list[int]:
+        if not payloads:
+            return []
+
+        created_at = datetime.now(UTC)
+        rows = [{"related_entity_id": None, "is_read": False, "created_at": created_at, **payload} for payload in payloads]
+        ids = None
+        if len(rows) >= COPY_THRESHOLD and self.db.get_bind().dialect.name == "postgresql":
+            ids = self._copy_many(rows)
+        if ids is None:
+            stmt = insert(Notification).returning(Notification.id, sort_by_parameter_order=True)
+            ids = list(self.db.scalars(stmt, rows).all())
+
+        announce_notifications(
+            self.db,
+            [notification_event(notification_id, row) for notification_id, row in zip(ids, rows, strict=True)],
+        )
+        return ids
+
+    def _copy_many(self, rows: list[dict]) -> list[int] | None:
+        connection = self.db.connection()
+        if connection.dialect.driver != "psycopg2":
+            return None
 
-    def list_paginated(self, user_id: int, page: int, page_size: int) -> tuple[list[Notification], int]:
+        # COPY cannot return generated keys, so the ids are drawn from the
+        # sequence up front and written explicitly.
+        ids = list(
+            connection.execute(
+                text("SELECT nextval(pg_get_serial_sequence('notifications', 'id')) FROM generate_series(1, :count)"),
+                {"count": len(rows)},
+            ).scalars()
+        )
+        buffer = io.StringIO()
+        for notification_id, row in zip(ids, rows, strict=True):
+            values = {**row, "id": notification_id}
+            buffer.write("\t".join(_copy_value(values[column]) for column in NOTIFICATION_FIELDS))
+            buffer.write("\n")
+        buffer.seek(0)
+        with connection.connection.dbapi_connection.cursor() as cursor:
+            cursor.copy_expert(f"COPY notifications ({', '.join(NOTIFICATION_FIELDS)}) FROM STDIN", buffer)
+        return ids
+
+    def list_paginated(
+        self,
+        user_id: int,
+        page: int,
+        page_size: int,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[list[Row], int | None, TotalMode]:
         stmt: Select[tuple[Notification]] = select(Notification).where(Notification.user_id == user_id)
 
-        count_stmt = select(func.count()).select_from(stmt.subquery())
-        total = int(self.db.scalar(count_stmt) or 0)
+        total, total_mode = count_rows(self.db, stmt, total_mode)
 
         offset = (page - 1) * page_size
-        items_stmt = stmt.order_by(Notification.created_at.desc()).offset(offset).limit(page_size)
-        items = list(self.db.scalars(items_stmt).all())
-        return items, total
+        items_stmt = stmt.with_only_columns(*LIST_COLUMNS).order_by(Notification.created_at.desc())
+        items = list(self.db.execute(items_stmt.offset(offset).limit(page_size)).all())
+        return items, total, total_mode
 
     def get_for_user(self, notification_id: int, user_id: int) -> Notification | None:
         stmt = select(Notification).where(Notification.id == notification_id, Notification.user_id == user_id)
         return self.db.scalar(stmt)
 
     def mark_all_read(self, user_id: int) -> int:
-        stmt = select(Notification).where(Notification.user_id == user_id, Notification.is_read.is_(False))
-        notifications = list(self.db.scalars(stmt).all())
-        for notification in notifications:
-            notification.is_read = True
-        return len(notifications)
+        stmt = (
+            update(Notification)
+            .where(Notification.user_id == user_id, Notification.is_read == false())
+            .values(is_read=True)
+            .execution_options(synchronize_session=False)
+        )
+        return self.db.execute(stmt).rowcount
+
+    def count_unread(self, user_id: int) -> int:
+        # "= false" rather than "IS false", so planners can match the predicate
+        # of the partial ix_notifications_user_id_unread index.
+        stmt = select(func.count()).where(Notification.user_id == user_id, Notification.is_read == false())
+        return int(self.db.scalar(stmt) or 0)
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
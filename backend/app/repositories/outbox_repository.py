@@ -0,0 +1,54 @@
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.enums import OutboxStatus, OutboxTopic
+from app.models.outbox_event import OutboxEvent
+
+
+class OutboxRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def add(self, topic: OutboxTopic, payload: dict) -> OutboxEvent:
+        event = OutboxEvent(topic=topic.value, payload=payload, status=OutboxStatus.PENDING, attempts=0)
+        self.db.add(event)
+        return event
+
+    def claim_next(self, lease_seconds: float) -> OutboxEvent | None:
+        # A claimed event is pushed out of reach for the lease instead of
+        # being held locked, so it can run in its own transaction and a
+        # crashed worker's event becomes available again once it expires.
+        # Events are claimed one at a time so each lease only has to cover
+        # its own handler, not the ones queued before it.
+        now = datetime.now(UTC)
+        stmt = (
+            select(OutboxEvent)
+            .where(OutboxEvent.status == OutboxStatus.PENDING, OutboxEvent.available_at <= now)
+            .order_by(OutboxEvent.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        event = self.db.scalar(stmt)
+        if event:
+            event.available_at = now + timedelta(seconds=lease_seconds)
+        return event
+
+    def mark_done(self, event: OutboxEvent) -> None:
+        event.status = OutboxStatus.DONE
+        event.processed_at = datetime.now(UTC)
+        event.last_error = None
+
+    def mark_failed(self, event: OutboxEvent, error: str, max_attempts: int, retry_base_seconds: float) -> None:
+        event.attempts += 1
+        event.last_error = error[:2000]
+        if event.attempts >= max_attempts:
+            event.status = OutboxStatus.FAILED
+            event.processed_at = datetime.now(UTC)
+            return
+        event.available_at = datetime.now(UTC) + timedelta(seconds=retry_base_seconds * 2 ** (event.attempts - 1))
+
+    def delete_processed_before(self, cutoff: datetime) -> int:
+        stmt = delete(OutboxEvent).where(OutboxEvent.status == OutboxStatus.DONE, OutboxEvent.processed_at < cutoff)
+        return self.db.execute(stmt).rowcount
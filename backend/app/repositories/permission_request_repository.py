@@ -1,8 +1,13 @@
-from sqlalchemy import Select, func, select
+from sqlalchemy import Row, Select, select
 from sqlalchemy.orm import Session
 
-from app.core.enums import PermissionRequestStatus
+from app.core.enums import PermissionRequestStatus, TotalMode
 from app.models.permission_request import PermissionRequest
+from app.repositories.counting import count_rows
+from app.utils.serializers import PERMISSION_REQUEST_FIELDS
+
+# The fields serialize_permission_request returns, loaded as plain rows.
+LIST_COLUMNS = tuple(getattr(PermissionRequest, field) for field in PERMISSION_REQUEST_FIELDS)
 
 
 class PermissionRequestRepository:
@@ -19,21 +24,31 @@ class PermissionRequestRepository:
         stmt = select(PermissionRequest).where(PermissionRequest.id == request_id).with_for_update()
         return self.db.scalar(stmt)
 
+    def get_many_for_update(self, request_ids: list[int]) -> list[PermissionRequest]:
+        # Rows are locked in id order so concurrent batches cannot deadlock.
+        stmt = (
+            select(PermissionRequest)
+            .where(PermissionRequest.id.in_(request_ids))
+            .order_by(PermissionRequest.id)
+            .with_for_update()
+        )
+        return list(self.db.scalars(stmt).all())
+
     def list_paginated(
         self,
         page: int,
         page_size: int,
         status: PermissionRequestStatus | None,
-    ) -> tuple[list[PermissionRequest], int]:
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[list[Row], int | None, TotalMode]:
         stmt: Select[tuple[PermissionRequest]] = select(PermissionRequest)
 
         if status:
             stmt = stmt.where(PermissionRequest.status == status)
 
-        count_stmt = select(func.count()).select_from(stmt.subquery())
-        total = int(self.db.scalar(count_stmt) or 0)
+        total, total_mode = count_rows(self.db, stmt, total_mode)
 
         offset = (page - 1) * page_size
-        items_stmt = stmt.order_by(PermissionRequest.requested_at.desc()).offset(offset).limit(page_size)
-        items = list(self.db.scalars(items_stmt).all())
-        return items, total
+        items_stmt = stmt.with_only_columns(*LIST_COLUMNS).order_by(PermissionRequest.requested_at.desc())
+        items = list(self.db.execute(items_stmt.offset(offset).limit(page_size)).all())
+        return items, total, total_mode
@@ -1,4 +1,4 @@
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 from app.core.enums import UserRole
@@ -25,3 +25,10 @@ class UserRepository:
     def list_admins(self) -> list[User]:
         stmt = select(User).where(User.role == UserRole.ADMIN)
         return list(self.db.scalars(stmt).all())
+
+    def update_password_hash(self, user_id: int, hashed_password: str) -> None:
+        self.db.execute(update(User).where(User.id == user_id).values(hashed_password=hashed_password))
+
+    def list_admin_ids(self) -> list[int]:
+        stmt = select(User.id).where(User.role == UserRole.ADMIN)
+        return list(self.db.scalars(stmt).all())
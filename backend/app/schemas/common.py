@@ -1,8 +1,12 @@
 from pydantic import BaseModel
 
+from app.core.enums import TotalMode
+
 
 class PaginationMeta(BaseModel):
     page: int
     page_size: int
-    total: int
-    total_pages: int
+    total: int | None
+    total_pages: int | None
+    total_mode: TotalMode = TotalMode.EXACT
+    next_cursor: str | None = None
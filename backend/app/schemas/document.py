@@ -12,6 +12,8 @@ class DocumentResponse(BaseModel):
     description: str
     document_type: str
     file_url: str
+    file_size: int | None
+    file_sha256: str | None
     version: int
     status: DocumentStatus
     created_by: int
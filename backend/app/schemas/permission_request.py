@@ -31,3 +31,14 @@ class PermissionRequestListResponse(BaseModel):
 class ReviewPermissionRequest(BaseModel):
     decision: str = Field(pattern="^(APPROVE|REJECT)$")
     note: str | None = Field(default=None, max_length=1000)
+
+
+class BatchReviewItem(BaseModel):
+    request_id: int = Field(ge=1)
+    decision: str = Field(pattern="^(APPROVE|REJECT)$")
+    note: str | None = Field(default=None, max_length=1000)
+
+
+class BatchReviewPermissionRequests(BaseModel):
+    items: list[BatchReviewItem] = Field(min_length=1)
+    chunk_size: int | None = Field(default=None, ge=1)
@@ -1,18 +1,26 @@
 from sqlalchemy.orm import Session
 
+from app.core.database import SessionRunner
 from app.core.exceptions import AppException
-from app.core.security import create_access_token, get_password_hash, verify_password
+from app.core.password_hashing import password_hasher
+from app.core.security import create_access_token, get_password_hash, verify_and_update_password
+from app.models.user import User
 from app.repositories.user_repository import UserRepository
 from app.schemas.auth import LoginRequest, RegisterRequest
 from app.utils.serializers import serialize_user
 
 
+def build_token_response(user: User) -> dict:
+    token = create_access_token(subject=str(user.id), claims={"email": user.email, "role": user.role.value})
+    return {"access_token": token, "token_type": "bearer", "user": serialize_user(user)}
+
+
 class AuthService:
     def __init__(self, db: Session):
         self.db = db
         self.user_repo = UserRepository(db)
 
-    def register(self, payload: RegisterRequest) -> dict:
+    def register(self, payload: RegisterRequest, hashed_password: str | None = None) -> dict:
         existing = self.user_repo.get_by_email(payload.email)
         if existing:
             raise AppException(status_code=409, code="EMAIL_EXISTS", message="Email is already registered")
@@ -20,18 +28,44 @@ class AuthService:
         user = self.user_repo.create(
             email=payload.email,
             full_name=payload.full_name,
-            hashed_password=get_password_hash(payload.password),
+            hashed_password=hashed_password or get_password_hash(payload.password),
         )
         self.db.commit()
         self.db.refresh(user)
-
-        token = create_access_token(subject=str(user.id))
-        return {"access_token": token, "token_type": "bearer", "user": serialize_user(user)}
+        return build_token_response(user)
 
     def login(self, payload: LoginRequest) -> dict:
         user = self.user_repo.get_by_email(payload.email)
-        if not user or not verify_password(payload.password, user.hashed_password):
+        verified, new_hash = verify_and_update_password(payload.password, user.hashed_password) if user else (False, None)
+        if not verified:
+            raise AppException(status_code=401, code="INVALID_CREDENTIALS", message="Invalid email or password")
+        if new_hash:
+            self.rehash_password(user.id, new_hash)
+        return build_token_response(user)
+
+    def rehash_password(self, user_id: int, hashed_password: str) -> None:
+        self.user_repo.update_password_hash(user_id, hashed_password)
+        self.db.commit()
+
+
+class AsyncAuthService:
+    def __init__(self, db: SessionRunner):
+        self.db = db
+
+    async def register(self, payload: RegisterRequest) -> dict:
+        # bcrypt never runs on the event loop, a request thread or inside the
+        # session call; see PasswordHasher.
+        hashed_password = await password_hasher.hash(payload.password)
+        return await self.db.run(lambda session: AuthService(session).register(payload, hashed_password))
+
+    async def login(self, payload: LoginRequest) -> dict:
+        user = await self.db.run(lambda session: UserRepository(session).get_by_email(payload.email))
+        if not user:
             raise AppException(status_code=401, code="INVALID_CREDENTIALS", message="Invalid email or password")
 
-        token = create_access_token(subject=str(user.id))
-        return {"access_token": token, "token_type": "bearer", "user": serialize_user(user)}
+        verified, new_hash = await password_hasher.verify_and_update(payload.password, user.hashed_password)
+        if not verified:
+            raise AppException(status_code=401, code="INVALID_CREDENTIALS", message="Invalid email or password")
+        if new_hash:
+            await self.db.run(lambda session: AuthService(session).rehash_password(user.id, new_hash))
+        return build_token_response(user)
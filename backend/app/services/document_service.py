@@ -1,18 +1,50 @@
-from math import ceil
+import asyncio
+import logging
+from pathlib import PurePath
 
 from fastapi import UploadFile
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.enums import DocumentStatus, PermissionAction, PermissionRequestStatus, UserRole
+from app.core.config import get_settings
+from app.core.database import SessionRunner, run_blocking
+from app.core.document_cache import (
+    cache_document,
+    cache_list,
+    document_key,
+    document_list_key,
+    get_cached_document,
+    get_cached_list,
+    invalidate_documents,
+)
+from app.core.enums import DocumentStatus, OutboxTopic, PermissionAction, PermissionRequestStatus, TotalMode, UserRole
 from app.core.exceptions import AppException
 from app.models.document import Document
 from app.models.user import User
+from app.repositories.blob_repository import BlobRepository
 from app.repositories.document_repository import DocumentRepository
-from app.repositories.notification_repository import NotificationRepository
+from app.repositories.outbox_repository import OutboxRepository
 from app.repositories.permission_request_repository import PermissionRequestRepository
-from app.repositories.user_repository import UserRepository
 from app.schemas.common import PaginationMeta
-from app.utils.file_storage import file_storage
+from app.utils.file_storage import FileTooLargeError, StoredFile, file_storage
+from app.utils.pagination import build_pagination_meta, decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def store_upload(file: UploadFile, missing_file_message: str) -> StoredFile:
+    if not file.filename:
+        raise AppException(status_code=400, code="INVALID_FILE", message=missing_file_message)
+    try:
+        return file_storage.stage_upload(file=file)
+    except FileTooLargeError as exc:
+        raise AppException(
+            status_code=413,
+            code="FILE_TOO_LARGE",
+            message="File exceeds the maximum upload size",
+            details={"max_size": exc.max_size},
+        ) from exc
 
 
 class DocumentService:
@@ -20,8 +52,8 @@ class DocumentService:
         self.db = db
         self.document_repo = DocumentRepository(db)
         self.permission_repo = PermissionRequestRepository(db)
-        self.notification_repo = NotificationRepository(db)
-        self.user_repo = UserRepository(db)
+        self.outbox_repo = OutboxRepository(db)
+        self.blob_repo = BlobRepository(db)
 
     def upload_document(
         self,
@@ -29,29 +61,60 @@ class DocumentService:
         title: str,
         description: str,
         document_type: str,
-        file: UploadFile,
+        stored_file: StoredFile,
     ) -> Document:
-        if not file.filename:
-            raise AppException(status_code=400, code="INVALID_FILE", message="A valid file is required")
-
-        stored_path = file_storage.save_upload(file=file, folder="documents")
-
         try:
+            self.blob_repo.retain(stored_file)
+            run_blocking(file_storage.place_staged, stored_file)
             document = self.document_repo.create(
                 title=title,
                 description=description,
                 document_type=document_type,
-                file_url=stored_path,
+                file_url=stored_file.relative_path,
+                file_size=stored_file.size,
+                file_sha256=stored_file.sha256,
                 version=1,
                 status=DocumentStatus.ACTIVE,
                 created_by=current_user.id,
             )
+            invalidate_documents(self.db, [document.id])
             self.db.commit()
             self.db.refresh(document)
             return document
         except Exception:
             self.db.rollback()
-            file_storage.delete_if_exists(stored_path)
+            self._discard_unreferenced(stored_file)
+            raise
+
+    def upload_documents(self, current_user: User, uploads: list[dict]) -> list[Document]:
+        stored_files = [upload["stored_file"] for upload in uploads]
+        try:
+            self.blob_repo.retain_many(stored_files)
+            for stored_file in stored_files:
+                run_blocking(file_storage.place_staged, stored_file)
+            documents = self.document_repo.create_many(
+                [
+                    {
+                        "title": upload["title"],
+                        "description": upload["description"],
+                        "document_type": upload["document_type"],
+                        "file_url": upload["stored_file"].relative_path,
+                        "file_size": upload["stored_file"].size,
+                        "file_sha256": upload["stored_file"].sha256,
+                        "version": 1,
+                        "status": DocumentStatus.ACTIVE,
+                        "created_by": current_user.id,
+                    }
+                    for upload in uploads
+                ]
+            )
+            invalidate_documents(self.db, [document.id for document in documents])
+            self.db.commit()
+            return documents
+        except Exception:
+            self.db.rollback()
+            for stored_file in stored_files:
+                self._discard_unreferenced(stored_file)
             raise
 
     def list_documents(
@@ -61,26 +124,119 @@ class DocumentService:
         search: str | None,
         status: DocumentStatus | None,
         document_type: str | None,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
     ) -> dict:
-        items, total = self.document_repo.list_paginated(
+        decoded_cursor = None
+        if cursor:
+            try:
+                decoded_cursor = decode_cursor(cursor)
+            except ValueError as exc:
+                raise AppException(status_code=400, code="INVALID_CURSOR", message="Invalid pagination cursor") from exc
+
+        # Searches are too varied to be worth caching; plain listings and
+        # filters are what most clients poll.
+        cache_key = None
+        if not search:
+            cache_key = document_list_key(
+                page=page,
+                page_size=page_size,
+                status=status,
+                document_type=document_type,
+                cursor=cursor,
+                total_mode=total_mode,
+            )
+            cached = get_cached_list(cache_key)
+            if cached is not None:
+                items, meta = cached
+                return {"items": items, "meta": PaginationMeta(**meta)}
+
+        items, total, total_mode, next_key = self.document_repo.list_paginated(
             page=page,
             page_size=page_size,
             search=search,
             status=status,
             document_type=document_type,
+            cursor=decoded_cursor,
+            total_mode=total_mode,
         )
-        meta = PaginationMeta(
+        meta = build_pagination_meta(
             page=page,
             page_size=page_size,
             total=total,
-            total_pages=max(1, ceil(total / page_size)) if total else 1,
+            total_mode=total_mode,
+            next_cursor=encode_cursor(*next_key) if next_key else None,
         )
+        if cache_key:
+            cache_list(cache_key, items, meta.model_dump(mode="json"))
         return {"items": items, "meta": meta}
 
-    def get_document(self, document_id: int, _: User) -> Document:
+    def list_export_documents(
+        self,
+        current_user: User,
+        search: str | None,
+        status: DocumentStatus | None,
+        document_type: str | None,
+        document_ids: list[int] | None,
+    ) -> tuple[list[Document], list[dict]]:
+        limit = settings.export_max_documents
+        is_admin = current_user.role == UserRole.ADMIN
+        if document_ids and (search or status or document_type):
+            raise AppException(
+                status_code=400,
+                code="INVALID_EXPORT_QUERY",
+                message="Export either by ids or by search and filters, not both",
+            )
+        if not document_ids:
+            # Filtered exports only ever cover what the caller may download.
+            documents = self.document_repo.list_for_export(
+                search=search,
+                status=status,
+                document_type=document_type,
+                created_by=None if is_admin else current_user.id,
+                limit=limit + 1,
+            )
+            if len(documents) > limit:
+                raise AppException(
+                    status_code=400,
+                    code="EXPORT_TOO_LARGE",
+                    message=f"At most {limit} documents can be exported at once",
+                    details={"max_documents": limit},
+                )
+            return documents, []
+
+        requested_ids = list(dict.fromkeys(document_ids))
+        if len(requested_ids) > limit:
+            raise AppException(
+                status_code=400,
+                code="EXPORT_TOO_LARGE",
+                message=f"At most {limit} documents can be exported at once",
+                details={"max_documents": limit},
+            )
+        found = {document.id: document for document in self.document_repo.get_many(requested_ids)}
+        documents: list[Document] = []
+        skipped: list[dict] = []
+        for document_id in requested_ids:
+            document = found.get(document_id)
+            if not document:
+                skipped.append({"id": document_id, "reason": "DOCUMENT_NOT_FOUND"})
+            elif not is_admin and document.created_by != current_user.id:
+                skipped.append({"id": document_id, "reason": "FORBIDDEN"})
+            else:
+                documents.append(document)
+        return documents, skipped
+
+    def get_document(self, document_id: int, _: User, cached: bool = True) -> Document:
+        key = document_key(document_id) if cached else None
+        document = get_cached_document(key) if key else None
+        if document is not None:
+            return document
+
         document = self.document_repo.get_by_id(document_id)
         if not document:
             raise AppException(status_code=404, code="DOCUMENT_NOT_FOUND", message="Document not found")
+        if key:
+            cache_document(key, document)
         return document
 
     def request_replace(
@@ -89,32 +245,30 @@ class DocumentService:
         current_user: User,
         expected_version: int,
         note: str | None,
-        file: UploadFile,
+        stored_file: StoredFile,
+        original_filename: str,
     ) -> dict:
-        if not file.filename:
-            raise AppException(status_code=400, code="INVALID_FILE", message="Replacement file is required")
-
-        document = self.document_repo.get_by_id_for_update(document_id)
-        if not document:
-            raise AppException(status_code=404, code="DOCUMENT_NOT_FOUND", message="Document not found")
+        try:
+            document = self.document_repo.get_by_id_for_update(document_id)
+            if not document:
+                raise AppException(status_code=404, code="DOCUMENT_NOT_FOUND", message="Document not found")
 
-        if current_user.role != UserRole.ADMIN and document.created_by != current_user.id:
-            raise AppException(status_code=403, code="FORBIDDEN", message="Not allowed to request replace for this document")
+            if current_user.role != UserRole.ADMIN and document.created_by != current_user.id:
+                raise AppException(status_code=403, code="FORBIDDEN", message="Not allowed to request replace for this document")
 
-        if document.status != DocumentStatus.ACTIVE:
-            raise AppException(status_code=409, code="DOC_LOCKED", message="Document is not active")
+            if document.status != DocumentStatus.ACTIVE:
+                raise AppException(status_code=409, code="DOC_LOCKED", message="Document is not active")
 
-        if document.version != expected_version:
-            raise AppException(
-                status_code=409,
-                code="VERSION_CONFLICT",
-                message="Document version conflict. Refresh and retry",
-                details={"current_version": document.version},
-            )
-
-        pending_file = file_storage.save_upload(file=file, folder="pending")
+            if document.version != expected_version:
+                raise AppException(
+                    status_code=409,
+                    code="VERSION_CONFLICT",
+                    message="Document version conflict. Refresh and retry",
+                    details={"current_version": document.version},
+                )
 
-        try:
+            self.blob_repo.retain(stored_file)
+            run_blocking(file_storage.place_staged, stored_file)
             permission_request = self.permission_repo.create(
                 document_id=document.id,
                 action=PermissionAction.REPLACE,
@@ -122,32 +276,33 @@ class DocumentService:
                 requester_email=current_user.email,
                 status=PermissionRequestStatus.PENDING,
                 note=note,
-                payload={"pending_file_url": pending_file, "original_filename": file.filename},
+                payload={
+                    "pending_file_url": stored_file.relative_path,
+                    "pending_file_size": stored_file.size,
+                    "pending_file_sha256": stored_file.sha256,
+                    "original_filename": original_filename,
+                },
             )
 
             document.status = DocumentStatus.PENDING_REPLACE
+            invalidate_documents(self.db, [document.id])
             document.locked_by_request_id = permission_request.id
 
-            admins = self.user_repo.list_admins()
-            if admins:
-                self.notification_repo.create_many(
-                    payloads=[
-                        {
-                            "user_id": admin.id,
-                            "type": "PERMISSION_REQUEST",
-                            "message": f"Replace request #{permission_request.id} needs review",
-                            "related_entity_id": permission_request.id,
-                        }
-                        for admin in admins
-                    ]
-                )
+            self.outbox_repo.add(
+                OutboxTopic.NOTIFY_ADMINS,
+                {
+                    "type": "PERMISSION_REQUEST",
+                    "message": f"Replace request #{permission_request.id} needs review",
+                    "related_entity_id": permission_request.id,
+                },
+            )
 
             self.db.commit()
             self.db.refresh(permission_request)
             return {"request": permission_request, "document": document}
         except Exception:
             self.db.rollback()
-            file_storage.delete_if_exists(pending_file)
+            self._discard_unreferenced(stored_file)
             raise
 
     def request_delete(
@@ -186,22 +341,206 @@ class DocumentService:
         )
 
         document.status = DocumentStatus.PENDING_DELETE
+        invalidate_documents(self.db, [document.id])
         document.locked_by_request_id = permission_request.id
 
-        admins = self.user_repo.list_admins()
-        if admins:
-            self.notification_repo.create_many(
-                payloads=[
-                    {
-                        "user_id": admin.id,
-                        "type": "PERMISSION_REQUEST",
-                        "message": f"Delete request #{permission_request.id} needs review",
-                        "related_entity_id": permission_request.id,
-                    }
-                    for admin in admins
-                ]
-            )
+        self.outbox_repo.add(
+            OutboxTopic.NOTIFY_ADMINS,
+            {
+                "type": "PERMISSION_REQUEST",
+                "message": f"Delete request #{permission_request.id} needs review",
+                "related_entity_id": permission_request.id,
+            },
+        )
 
         self.db.commit()
         self.db.refresh(permission_request)
         return {"request": permission_request, "document": document}
+
+    def _discard_unreferenced(self, stored_file: StoredFile) -> None:
+        try:
+            run_blocking(file_storage.discard_staged, stored_file)
+            if self.blob_repo.lock_unreferenced(stored_file.relative_path):
+                run_blocking(file_storage.delete_if_exists, stored_file.relative_path)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            logger.exception("Discarding %s failed", stored_file.relative_path)
+
+
+class AsyncDocumentService:
+    def __init__(self, db: SessionRunner):
+        self.db = db
+
+    async def upload_document(
+        self,
+        current_user: User,
+        title: str,
+        description: str,
+        document_type: str,
+        file: UploadFile,
+    ) -> Document:
+        stored_file = await run_in_threadpool(store_upload, file, "A valid file is required")
+        return await self.db.run(
+            lambda session: DocumentService(session).upload_document(
+                current_user=current_user,
+                title=title,
+                description=description,
+                document_type=document_type,
+                stored_file=stored_file,
+            )
+        )
+
+    async def upload_documents(
+        self,
+        current_user: User,
+        description: str,
+        document_type: str,
+        files: list[UploadFile],
+        titles: list[str] | None,
+    ) -> dict:
+        if len(files) > settings.batch_upload_max_files:
+            raise AppException(
+                status_code=400,
+                code="TOO_MANY_FILES",
+                message=f"At most {settings.batch_upload_max_files} files can be uploaded at once",
+            )
+        if titles and len(titles) != len(files):
+            raise AppException(status_code=400, code="INVALID_TITLES", message="Provide one title per file")
+
+        semaphore = asyncio.Semaphore(settings.batch_upload_concurrency)
+
+        async def store(file: UploadFile, title: str) -> StoredFile:
+            if not 1 <= len(title) <= 255:
+                raise AppException(status_code=400, code="INVALID_TITLE", message="Title must be 1-255 characters")
+            async with semaphore:
+                return await run_in_threadpool(store_upload, file, "A valid file is required")
+
+        titles = [title.strip() for title in titles] if titles else [PurePath(file.filename or "").stem for file in files]
+        outcomes = await asyncio.gather(
+            *(store(file, title) for file, title in zip(files, titles, strict=True)),
+            return_exceptions=True,
+        )
+
+        results: list[dict] = []
+        uploads: list[dict] = []
+        for index, (file, title, outcome) in enumerate(zip(files, titles, outcomes, strict=True)):
+            if isinstance(outcome, StoredFile):
+                results.append({"index": index, "filename": file.filename, "success": True})
+                uploads.append(
+                    {
+                        "title": title,
+                        "description": description,
+                        "document_type": document_type,
+                        "stored_file": outcome,
+                    }
+                )
+                continue
+            if not isinstance(outcome, AppException):
+                logger.error("Storing batch upload file %r failed", file.filename, exc_info=outcome)
+                outcome = AppException(status_code=502, code="STORAGE_ERROR", message="File could not be stored")
+            results.append(
+                {
+                    "index": index,
+                    "filename": file.filename,
+                    "success": False,
+                    "error": {"code": outcome.code, "message": outcome.message, "details": outcome.details},
+                }
+            )
+
+        if uploads:
+            documents = iter(
+                await self.db.run(
+                    lambda session: DocumentService(session).upload_documents(current_user=current_user, uploads=uploads)
+                )
+            )
+            for result in results:
+                if result["success"]:
+                    result["document"] = next(documents)
+
+        succeeded = len(uploads)
+        return {
+            "results": results,
+            "summary": {"total": len(results), "succeeded": succeeded, "failed": len(results) - succeeded},
+        }
+
+    async def list_documents(
+        self,
+        page: int,
+        page_size: int,
+        search: str | None,
+        status: DocumentStatus | None,
+        document_type: str | None,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> dict:
+        return await self.db.run(
+            lambda session: DocumentService(session).list_documents(
+                page=page,
+                page_size=page_size,
+                search=search,
+                status=status,
+                document_type=document_type,
+                cursor=cursor,
+                total_mode=total_mode,
+            )
+        )
+
+    async def list_export_documents(
+        self,
+        current_user: User,
+        search: str | None,
+        status: DocumentStatus | None,
+        document_type: str | None,
+        document_ids: list[int] | None,
+    ) -> tuple[list[Document], list[dict]]:
+        return await self.db.run(
+            lambda session: DocumentService(session).list_export_documents(
+                current_user=current_user,
+                search=search,
+                status=status,
+                document_type=document_type,
+                document_ids=document_ids,
+            )
+        )
+
+    async def get_document(self, document_id: int, _: User, cached: bool = True) -> Document:
+        return await self.db.run(
+            lambda session: DocumentService(session).get_document(document_id=document_id, _=_, cached=cached)
+        )
+
+    async def request_replace(
+        self,
+        document_id: int,
+        current_user: User,
+        expected_version: int,
+        note: str | None,
+        file: UploadFile,
+    ) -> dict:
+        stored_file = await run_in_threadpool(store_upload, file, "Replacement file is required")
+        return await self.db.run(
+            lambda session: DocumentService(session).request_replace(
+                document_id=document_id,
+                current_user=current_user,
+                expected_version=expected_version,
+                note=note,
+                stored_file=stored_file,
+                original_filename=file.filename,
+            )
+        )
+
+    async def request_delete(
+        self,
+        document_id: int,
+        current_user: User,
+        expected_version: int,
+        note: str | None,
+    ) -> dict:
+        return await self.db.run(
+            lambda session: DocumentService(session).request_delete(
+                document_id=document_id,
+                current_user=current_user,
+                expected_version=expected_version,
+                note=note,
+            )
+        )
@@ -1,11 +1,11 @@
-from math import ceil
-
 from sqlalchemy.orm import Session
 
+from app.core.database import SessionRunner
+from app.core.enums import TotalMode
 from app.core.exceptions import AppException
 from app.models.user import User
 from app.repositories.notification_repository import NotificationRepository
-from app.schemas.common import PaginationMeta
+from app.utils.pagination import build_pagination_meta
 
 
 class NotificationService:
@@ -13,18 +13,20 @@ class NotificationService:
         self.db = db
         self.notification_repo = NotificationRepository(db)
 
-    def list_notifications(self, current_user: User, page: int, page_size: int) -> dict:
-        items, total = self.notification_repo.list_paginated(
+    def list_notifications(
+        self,
+        current_user: User,
+        page: int,
+        page_size: int,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> dict:
+        items, total, total_mode = self.notification_repo.list_paginated(
             user_id=current_user.id,
             page=page,
             page_size=page_size,
+            total_mode=total_mode,
         )
-        meta = PaginationMeta(
-            page=page,
-            page_size=page_size,
-            total=total,
-            total_pages=max(1, ceil(total / page_size)) if total else 1,
-        )
+        meta = build_pagination_meta(page=page, page_size=page_size, total=total, total_mode=total_mode)
         return {"items": items, "meta": meta}
 
     def mark_read(self, current_user: User, notification_id: int) -> None:
@@ -38,3 +40,41 @@ class NotificationService:
         count = self.notification_repo.mark_all_read(user_id=current_user.id)
         self.db.commit()
         return count
+
+    def count_unread(self, current_user: User) -> int:
+        return self.notification_repo.count_unread(user_id=current_user.id)
+
+
+class AsyncNotificationService:
+    def __init__(self, db: SessionRunner):
+        self.db = db
+
+    async def list_notifications(
+        self,
+        current_user: User,
+        page: int,
+        page_size: int,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> dict:
+        return await self.db.run(
+            lambda session: NotificationService(session).list_notifications(
+                current_user=current_user,
+                page=page,
+                page_size=page_size,
+                total_mode=total_mode,
+            )
+        )
+
+    async def mark_read(self, current_user: User, notification_id: int) -> None:
+        await self.db.run(
+            lambda session: NotificationService(session).mark_read(
+                current_user=current_user,
+                notification_id=notification_id,
+            )
+        )
+
+    async def mark_all_read(self, current_user: User) -> int:
+        return await self.db.run(lambda session: NotificationService(session).mark_all_read(current_user=current_user))
+
+    async def count_unread(self, current_user: User) -> int:
+        return await self.db.run(lambda session: NotificationService(session).count_unread(current_user=current_user))
@@ -1,16 +1,27 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import UTC, datetime
-from math import ceil
 
 from sqlalchemy.orm import Session
 
-from app.core.enums import DocumentStatus, PermissionAction, PermissionRequestStatus
+from app.core.config import get_settings
+from app.core.database import SessionRunner, run_blocking
+from app.core.document_cache import invalidate_documents
+from app.core.enums import DocumentStatus, OutboxTopic, PermissionAction, PermissionRequestStatus, TotalMode
 from app.core.exceptions import AppException
+from app.models.document import Document
+from app.models.permission_request import PermissionRequest
 from app.models.user import User
+from app.repositories.blob_repository import BlobRepository
 from app.repositories.document_repository import DocumentRepository
 from app.repositories.notification_repository import NotificationRepository
+from app.repositories.outbox_repository import OutboxRepository
 from app.repositories.permission_request_repository import PermissionRequestRepository
-from app.schemas.common import PaginationMeta
 from app.utils.file_storage import file_storage
+from app.utils.pagination import build_pagination_meta
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
 
 
 class PermissionService:
@@ -19,37 +30,277 @@ class PermissionService:
         self.permission_repo = PermissionRequestRepository(db)
         self.document_repo = DocumentRepository(db)
         self.notification_repo = NotificationRepository(db)
+        self.blob_repo = BlobRepository(db)
+        self.outbox_repo = OutboxRepository(db)
 
-    def list_requests(self, page: int, page_size: int, status: PermissionRequestStatus | None) -> dict:
-        items, total = self.permission_repo.list_paginated(page=page, page_size=page_size, status=status)
-        meta = PaginationMeta(
+    def list_requests(
+        self,
+        page: int,
+        page_size: int,
+        status: PermissionRequestStatus | None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> dict:
+        items, total, total_mode = self.permission_repo.list_paginated(
             page=page,
             page_size=page_size,
-            total=total,
-            total_pages=max(1, ceil(total / page_size)) if total else 1,
+            status=status,
+            total_mode=total_mode,
         )
+        meta = build_pagination_meta(page=page, page_size=page_size, total=total, total_mode=total_mode)
         return {"items": items, "meta": meta}
 
     def review_request(self, request_id: int, admin_user: User, decision: str, note: str | None) -> dict:
         permission_request = self.permission_repo.get_by_id_for_update(request_id)
+        self._check_pending(permission_request)
+
+        document = None
+        if permission_request.document_id:
+            document = self.document_repo.get_by_id_for_update(permission_request.document_id)
+
+        self._check_review(permission_request, document, decision)
+
+        files_to_rollback_on_error: list[str] = []
+        new_file_url = None
+        pending_file = self._file_to_promote(permission_request, decision)
+        if pending_file:
+            # The pending file's blob reference moves to the document; only
+            # legacy pending files are copied and need their own cleanup.
+            new_file_url = run_blocking(file_storage.promote_pending_file, pending_file)
+            if new_file_url != pending_file:
+                files_to_rollback_on_error.append(new_file_url)
+
+        files_to_delete_after_commit = self._apply_review(
+            permission_request, document, admin_user, decision, note, new_file_url
+        )
+        self.notification_repo.create(**self._result_notification(permission_request))
+
+        # File removal commits with the review as outbox events, so a crash
+        # after the commit cannot leak storage and the request does not wait
+        # on the storage backend.
+        for file_path in files_to_delete_after_commit:
+            self.outbox_repo.add(OutboxTopic.DELETE_FILE, {"path": file_path})
+
+        try:
+            self.db.commit()
+            self.db.refresh(permission_request)
+        except Exception:
+            self.db.rollback()
+            for file_path in files_to_rollback_on_error:
+                run_blocking(file_storage.delete_if_exists, file_path)
+            raise
+
+        return {"request": permission_request}
+
+    def review_requests(self, admin_user: User, items: list[dict], chunk_size: int | None = None) -> dict:
+        if len(items) > settings.permission_batch_review_max_items:
+            raise AppException(
+                status_code=400,
+                code="BATCH_TOO_LARGE",
+                message=f"At most {settings.permission_batch_review_max_items} requests can be reviewed at once",
+            )
+
+        items_by_id: dict[int, dict] = {}
+        for item in items:
+            if item["request_id"] in items_by_id:
+                raise AppException(
+                    status_code=400,
+                    code="DUPLICATE_REQUEST",
+                    message="A request can only appear once per batch",
+                    details={"request_id": item["request_id"]},
+                )
+            items_by_id[item["request_id"]] = item
+
+        request_ids = sorted(items_by_id)
+        chunk_size = chunk_size or settings.permission_batch_review_chunk_size or len(request_ids)
+        results: dict[int, dict] = {}
+        for start in range(0, len(request_ids), chunk_size):
+            chunk = [items_by_id[request_id] for request_id in request_ids[start : start + chunk_size]]
+            results.update(self._review_chunk(admin_user, chunk))
+
+        ordered = [results[item["request_id"]] for item in items]
+        succeeded = sum(1 for result in ordered if result["success"])
+        return {
+            "results": ordered,
+            "summary": {"total": len(ordered), "succeeded": succeeded, "failed": len(ordered) - succeeded},
+        }
+
+    def _review_chunk(self, admin_user: User, items: list[dict]) -> dict[int, dict]:
+        # Requests, then documents, then blobs are locked in key order, the
+        # same order a single review takes them, so overlapping batches and
+        # single reviews queue behind each other instead of deadlocking.
+        permission_requests = {
+            permission_request.id: permission_request
+            for permission_request in self.permission_repo.get_many_for_update([item["request_id"] for item in items])
+        }
+        document_ids = sorted(
+            {request.document_id for request in permission_requests.values() if request.document_id}
+        )
+        documents = {document.id: document for document in self.document_repo.get_many_for_update(document_ids)}
+        self.blob_repo.lock_paths(sorted(self._paths_to_release(permission_requests, documents, items)))
+
+        results: dict[int, dict] = {}
+        promoted = self._promote_pending_files(permission_requests, documents, items, results)
+
+        reviewed = []
+        files_to_delete_after_commit: list[str] = []
+        for item in items:
+            request_id = item["request_id"]
+            if request_id in results:
+                continue
+            permission_request = permission_requests.get(request_id)
+            document = documents.get(permission_request.document_id) if permission_request else None
+            try:
+                self._check_pending(permission_request)
+                self._check_review(permission_request, document, item["decision"])
+            except AppException as exc:
+                results[request_id] = _failed_result(request_id, exc)
+                continue
+
+            files_to_delete_after_commit.extend(
+                self._apply_review(
+                    permission_request,
+                    document,
+                    admin_user,
+                    item["decision"],
+                    item.get("note"),
+                    promoted.get(request_id),
+                )
+            )
+            if document and permission_request.document_id is None:
+                documents.pop(document.id)
+            reviewed.append(permission_request)
+            results[request_id] = {"request_id": request_id, "success": True, "request": permission_request}
+
+        self.notification_repo.create_many([self._result_notification(request) for request in reviewed])
+        for file_path in files_to_delete_after_commit:
+            self.outbox_repo.add(OutboxTopic.DELETE_FILE, {"path": file_path})
+
+        copies = [
+            new_file_url
+            for request_id, new_file_url in promoted.items()
+            if new_file_url != permission_requests[request_id].payload["pending_file_url"]
+        ]
+        try:
+            self.db.commit()
+        except Exception:
+            logger.exception("Batch review of requests %s failed to commit", sorted(results))
+            self.db.rollback()
+            for file_path in copies:
+                run_blocking(file_storage.delete_if_exists, file_path)
+            error = AppException(status_code=500, code="REVIEW_FAILED", message="Review could not be saved")
+            for permission_request in reviewed:
+                results[permission_request.id] = _failed_result(permission_request.id, error)
+            return results
+
+        for request_id, new_file_url in promoted.items():
+            if not results[request_id]["success"] and new_file_url in copies:
+                run_blocking(file_storage.delete_if_exists, new_file_url)
+        return results
+
+    def _promote_pending_files(
+        self,
+        permission_requests: dict[int, PermissionRequest],
+        documents: dict[int, Document],
+        items: list[dict],
+        results: dict[int, dict],
+    ) -> dict[int, str]:
+        promoted: dict[int, str] = {}
+        pending_files: dict[int, str] = {}
+        for item in items:
+            permission_request = permission_requests.get(item["request_id"])
+            if not permission_request or permission_request.status != PermissionRequestStatus.PENDING:
+                continue
+            try:
+                self._check_review(permission_request, documents.get(permission_request.document_id), item["decision"])
+            except AppException:
+                continue
+            pending_file = self._file_to_promote(permission_request, item["decision"])
+            if pending_file and file_storage.is_blob_path(pending_file):
+                promoted[permission_request.id] = pending_file
+            elif pending_file:
+                pending_files[permission_request.id] = pending_file
+
+        # Legacy pending files are copied (server-side on S3), so they are
+        # promoted on a small pool instead of one after another.
+        if not pending_files:
+            return promoted
+        futures = run_blocking(_promote_on_pool, pending_files)
+        for request_id, future in futures.items():
+            try:
+                promoted[request_id] = future.result()
+            except Exception:
+                logger.exception("Promoting the pending file of request %s failed", request_id)
+                error = AppException(
+                    status_code=502,
+                    code="STORAGE_ERROR",
+                    message="Replacement file could not be promoted",
+                )
+                results[request_id] = _failed_result(request_id, error)
+        return promoted
+
+    def _paths_to_release(
+        self,
+        permission_requests: dict[int, PermissionRequest],
+        documents: dict[int, Document],
+        items: list[dict],
+    ) -> set[str]:
+        paths: set[str] = set()
+        for item in items:
+            permission_request = permission_requests.get(item["request_id"])
+            if not permission_request:
+                continue
+            document = documents.get(permission_request.document_id)
+            if item["decision"] == "APPROVE" and document:
+                paths.add(document.file_url)
+            elif permission_request.action == PermissionAction.REPLACE and permission_request.payload:
+                pending_file = permission_request.payload.get("pending_file_url")
+                if pending_file:
+                    paths.add(pending_file)
+        return paths
+
+    def _check_pending(self, permission_request: PermissionRequest | None) -> None:
         if not permission_request:
             raise AppException(status_code=404, code="REQUEST_NOT_FOUND", message="Permission request not found")
 
         if permission_request.status != PermissionRequestStatus.PENDING:
             raise AppException(status_code=409, code="REQUEST_ALREADY_REVIEWED", message="Request already reviewed")
 
-        document = None
-        if permission_request.document_id:
-            document = self.document_repo.get_by_id_for_update(permission_request.document_id)
+    def _check_review(self, permission_request: PermissionRequest, document: Document | None, decision: str) -> None:
+        if decision == "REJECT":
+            return
+        if decision != "APPROVE":
+            raise AppException(status_code=400, code="INVALID_DECISION", message="Invalid review decision")
+        if not document:
+            raise AppException(status_code=404, code="DOCUMENT_NOT_FOUND", message="Document not found")
+        if permission_request.action == PermissionAction.REPLACE:
+            if document.locked_by_request_id != permission_request.id:
+                raise AppException(status_code=409, code="DOC_LOCK_MISMATCH", message="Document lock mismatch")
+            if not (permission_request.payload or {}).get("pending_file_url"):
+                raise AppException(status_code=400, code="INVALID_PAYLOAD", message="Missing replacement file")
+
+    def _file_to_promote(self, permission_request: PermissionRequest, decision: str) -> str | None:
+        if decision != "APPROVE" or permission_request.action != PermissionAction.REPLACE:
+            return None
+        return permission_request.payload["pending_file_url"]
 
+    def _apply_review(
+        self,
+        permission_request: PermissionRequest,
+        document: Document | None,
+        admin_user: User,
+        decision: str,
+        note: str | None,
+        new_file_url: str | None,
+    ) -> list[str]:
         files_to_delete_after_commit: list[str] = []
-        files_to_rollback_on_error: list[str] = []
+        if document:
+            invalidate_documents(self.db, [document.id])
+        permission_request.reviewed_by = admin_user.id
+        permission_request.reviewed_at = datetime.now(UTC)
+        permission_request.note = note
 
         if decision == "REJECT":
             permission_request.status = PermissionRequestStatus.REJECTED
-            permission_request.reviewed_by = admin_user.id
-            permission_request.reviewed_at = datetime.now(UTC)
-            permission_request.note = note
 
             if document and document.locked_by_request_id == permission_request.id:
                 document.status = DocumentStatus.ACTIVE
@@ -57,62 +308,93 @@ class PermissionService:
 
             if permission_request.action == PermissionAction.REPLACE and permission_request.payload:
                 pending_file = permission_request.payload.get("pending_file_url")
-                if pending_file:
+                if pending_file and self.blob_repo.release(pending_file):
                     files_to_delete_after_commit.append(pending_file)
 
-        elif decision == "APPROVE":
+        elif permission_request.action == PermissionAction.REPLACE:
             permission_request.status = PermissionRequestStatus.APPROVED
-            permission_request.reviewed_by = admin_user.id
-            permission_request.reviewed_at = datetime.now(UTC)
-            permission_request.note = note
-
-            if permission_request.action == PermissionAction.REPLACE:
-                if not document:
-                    raise AppException(status_code=404, code="DOCUMENT_NOT_FOUND", message="Document not found")
-                if document.locked_by_request_id != permission_request.id:
-                    raise AppException(status_code=409, code="DOC_LOCK_MISMATCH", message="Document lock mismatch")
-
-                payload = permission_request.payload or {}
-                pending_file = payload.get("pending_file_url")
-                if not pending_file:
-                    raise AppException(status_code=400, code="INVALID_PAYLOAD", message="Missing replacement file")
-
-                new_file_url = file_storage.promote_pending_file(pending_file)
-                files_to_rollback_on_error.append(new_file_url)
-                files_to_delete_after_commit.extend([document.file_url, pending_file])
+            payload = permission_request.payload
+            if new_file_url != payload["pending_file_url"]:
+                files_to_delete_after_commit.append(payload["pending_file_url"])
+            if self.blob_repo.release(document.file_url):
+                files_to_delete_after_commit.append(document.file_url)
 
-                document.file_url = new_file_url
-                document.version += 1
-                document.status = DocumentStatus.ACTIVE
-                document.locked_by_request_id = None
+            document.file_url = new_file_url
+            document.file_size = payload.get("pending_file_size")
+            document.file_sha256 = payload.get("pending_file_sha256")
+            document.version += 1
+            document.status = DocumentStatus.ACTIVE
+            document.locked_by_request_id = None
 
-            elif permission_request.action == PermissionAction.DELETE:
-                if not document:
-                    raise AppException(status_code=404, code="DOCUMENT_NOT_FOUND", message="Document not found")
+        elif permission_request.action == PermissionAction.DELETE:
+            permission_request.status = PermissionRequestStatus.APPROVED
+            if self.blob_repo.release(document.file_url):
                 files_to_delete_after_commit.append(document.file_url)
-                self.db.delete(document)
-                permission_request.document_id = None
+            self.db.delete(document)
+            permission_request.document_id = None
 
-        else:
-            raise AppException(status_code=400, code="INVALID_DECISION", message="Invalid review decision")
+        return files_to_delete_after_commit
 
-        self.notification_repo.create(
-            user_id=permission_request.requested_by,
-            type="PERMISSION_RESULT",
-            message=f"Request #{permission_request.id} has been {permission_request.status.value}",
-            related_entity_id=permission_request.id,
-        )
+    def _result_notification(self, permission_request: PermissionRequest) -> dict:
+        return {
+            "user_id": permission_request.requested_by,
+            "type": "PERMISSION_RESULT",
+            "message": f"Request #{permission_request.id} has been {permission_request.status.value}",
+            "related_entity_id": permission_request.id,
+        }
 
-        try:
-            self.db.commit()
-            self.db.refresh(permission_request)
-        except Exception:
-            self.db.rollback()
-            for file_path in files_to_rollback_on_error:
-                file_storage.delete_if_exists(file_path)
-            raise
 
-        for file_path in files_to_delete_after_commit:
-            file_storage.delete_if_exists(file_path)
+def _promote_on_pool(pending_files: dict[int, str]) -> dict[int, Future]:
+    with ThreadPoolExecutor(max_workers=min(settings.permission_batch_promote_workers, len(pending_files))) as pool:
+        return {
+            request_id: pool.submit(file_storage.promote_pending_file, pending_file)
+            for request_id, pending_file in pending_files.items()
+        }
 
-        return {"request": permission_request}
+
+def _failed_result(request_id: int, exc: AppException) -> dict:
+    return {
+        "request_id": request_id,
+        "success": False,
+        "error": {"code": exc.code, "message": exc.message, "details": exc.details},
+    }
+
+
+class AsyncPermissionService:
+    def __init__(self, db: SessionRunner):
+        self.db = db
+
+    async def list_requests(
+        self,
+        page: int,
+        page_size: int,
+        status: PermissionRequestStatus | None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> dict:
+        return await self.db.run(
+            lambda session: PermissionService(session).list_requests(
+                page=page,
+                page_size=page_size,
+                status=status,
+                total_mode=total_mode,
+            )
+        )
+
+    async def review_request(self, request_id: int, admin_user: User, decision: str, note: str | None) -> dict:
+        return await self.db.run(
+            lambda session: PermissionService(session).review_request(
+                request_id=request_id,
+                admin_user=admin_user,
+                decision=decision,
+                note=note,
+            )
+        )
+
+    async def review_requests(self, admin_user: User, items: list[dict], chunk_size: int | None = None) -> dict:
+        return await self.db.run(
+            lambda session: PermissionService(session).review_requests(
+                admin_user=admin_user,
+                items=items,
+                chunk_size=chunk_size,
+            )
+        )
@@ -0,0 +1,139 @@
+import io
+import json
+import re
+import tarfile
+import time
+import zipfile
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import PurePosixPath
+from typing import Literal
+
+from app.models.document import Document
+from app.utils.file_storage import file_storage
+
+ArchiveFormat = Literal["zip", "tar"]
+ARCHIVE_MEDIA_TYPES = {"zip": "application/zip", "tar": "application/x-tar"}
+MANIFEST_NAME = "manifest.json"
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+@dataclass(frozen=True)
+class ExportEntry:
+    document_id: int
+    name: str
+    file_url: str
+    size: int | None
+    modified_at: datetime
+
+
+def export_entry(document: Document) -> ExportEntry:
+    stem = _UNSAFE_NAME.sub("_", document.title).strip("._")[:100] or "document"
+    modified_at = document.updated_at
+    if modified_at.tzinfo is None:
+        modified_at = modified_at.replace(tzinfo=UTC)
+    return ExportEntry(
+        document_id=document.id,
+        name=f"{document.id}-{stem}{PurePosixPath(document.file_url).suffix}",
+        file_url=document.file_url,
+        size=document.file_size,
+        modified_at=modified_at,
+    )
+
+
+class _ChunkSink(io.RawIOBase):
+    # A write-only, non-seekable target: the archive writers fall back to
+    # streaming layouts (data descriptors for ZIP) and whatever they wrote is
+    # handed to the response between files and chunks.
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def iter_archive(archive_format: ArchiveFormat, entries: list[ExportEntry], skipped: list[dict]) -> Iterator[bytes]:
+    if archive_format == "zip":
+        return _iter_zip(entries, skipped)
+    return _iter_tar(entries, skipped)
+
+
+def _iter_zip(entries: list[ExportEntry], skipped: list[dict]) -> Iterator[bytes]:
+    sink = _ChunkSink()
+    included: list[dict] = []
+    # Stored, not deflated: exported documents are mostly already compressed
+    # and the export should be bound by storage throughput, not CPU.
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for entry in entries:
+            if not file_storage.exists(entry.file_url):
+                skipped.append({"id": entry.document_id, "reason": "FILE_NOT_FOUND"})
+                continue
+            info = zipfile.ZipInfo(entry.name, date_time=_zip_timestamp(entry.modified_at))
+            with archive.open(info, mode="w", force_zip64=True) as target:
+                for chunk in file_storage.iter_file(entry.file_url):
+                    target.write(chunk)
+                    yield sink.drain()
+            included.append({"id": entry.document_id, "name": entry.name})
+            yield sink.drain()
+        archive.writestr(MANIFEST_NAME, _manifest(included, skipped))
+    yield sink.drain()
+
+
+def _iter_tar(entries: list[ExportEntry], skipped: list[dict]) -> Iterator[bytes]:
+    # Headers are written by hand because TarFile.addfile copies a whole
+    # member before returning; the size comes from the document row, or from
+    # storage for legacy rows without one.
+    included: list[dict] = []
+    for entry in entries:
+        if entry.size is None:
+            size = file_storage.size(entry.file_url)
+        else:
+            size = entry.size if file_storage.exists(entry.file_url) else None
+        if size is None:
+            skipped.append({"id": entry.document_id, "reason": "FILE_NOT_FOUND"})
+            continue
+        yield _tar_header(entry.name, size, entry.modified_at)
+        written = 0
+        for chunk in file_storage.iter_file(entry.file_url):
+            chunk = chunk[: size - written]
+            written += len(chunk)
+            if chunk:
+                yield chunk
+        # A short file is zero-filled so the members after it stay aligned.
+        yield bytes(size - written) + _tar_padding(size)
+        included.append({"id": entry.document_id, "name": entry.name})
+
+    manifest = _manifest(included, skipped)
+    yield _tar_header(MANIFEST_NAME, len(manifest), datetime.now(UTC)) + manifest + _tar_padding(len(manifest))
+    yield bytes(2 * tarfile.BLOCKSIZE)
+
+
+def _tar_header(name: str, size: int, modified_at: datetime) -> bytes:
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = int(modified_at.timestamp())
+    info.mode = 0o644
+    return info.tobuf(format=tarfile.PAX_FORMAT)
+
+
+def _tar_padding(size: int) -> bytes:
+    return bytes(-size % tarfile.BLOCKSIZE)
+
+
+def _zip_timestamp(modified_at: datetime) -> tuple[int, int, int, int, int, int]:
+    # ZIP timestamps cannot go before 1980.
+    return time.gmtime(max(modified_at.timestamp(), 315532800))[:6]
+
+
+def _manifest(included: list[dict], skipped: list[dict]) -> bytes:
+    return json.dumps({"documents": included, "skipped": skipped}, indent=2).encode()
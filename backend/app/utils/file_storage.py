@@ -1,39 +1,169 @@
+import hashlib
+import os
+import re
 import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from dataclasses import dataclass, replace
 from pathlib import Path
+from typing import BinaryIO
 from uuid import uuid4
 
 from fastapi import UploadFile
 
 from app.core.config import get_settings
+from app.core.metrics import storage_timer
 
 settings = get_settings()
 
+BLOB_FOLDER = "blobs"
+_SAFE_EXTENSION = re.compile(r"\.[A-Za-z0-9]{1,16}")
 
-class FileStorageService:
+
+@dataclass(frozen=True)
+class StoredFile:
+    relative_path: str
+    size: int
+    sha256: str
+    # Set while the content still waits outside relative_path; see place_staged.
+    staged_path: str | None = None
+
+
+class FileTooLargeError(Exception):
+    def __init__(self, max_size: int) -> None:
+        super().__init__(f"File exceeds {max_size} bytes")
+        self.max_size = max_size
+
+
+class HashingReader:
+    def __init__(self, source: BinaryIO, max_size: int) -> None:
+        self.source = source
+        self.max_size = max_size
+        self.size = 0
+        self.digest = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.source.read(size)
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise FileTooLargeError(self.max_size)
+        self.digest.update(chunk)
+        return chunk
+
+
+class StorageBackend(ABC):
+    def ensure_directories(self) -> None:
+        return None
+
+    def build_blob_path(self, sha256: str, original_name: str) -> str:
+        extension = Path(original_name).suffix.lower()
+        if not _SAFE_EXTENSION.fullmatch(extension):
+            extension = ""
+        return f"{BLOB_FOLDER}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+    def is_blob_path(self, relative_path: str) -> bool:
+        return relative_path.startswith(f"{BLOB_FOLDER}/")
+
+    def stage_upload(self, file: UploadFile, max_size: int | None = None) -> StoredFile:
+        max_size = settings.max_upload_size_bytes if max_size is None else max_size
+        if file.size is not None and file.size > max_size:
+            raise FileTooLargeError(max_size)
+
+        return self.stage_stream(file.file, file.filename or "document.bin", max_size=max_size)
+
+    def save_stream(self, source: BinaryIO, original_name: str, max_size: int | None = None) -> StoredFile:
+        return self.place_staged(self.stage_stream(source, original_name, max_size=max_size))
+
+    @abstractmethod
+    def stage_stream(self, source: BinaryIO, original_name: str, max_size: int | None = None) -> StoredFile: ...
+
+    # Moves staged content to its blob path. Callers that share blobs hold
+    # the blob row (BlobRepository.retain) while placing, so a delete of the
+    # same content has either already unlinked the file, which is then
+    # written again, or waits and sees the new reference.
+    @abstractmethod
+    def place_staged(self, stored_file: StoredFile) -> StoredFile: ...
+
+    @abstractmethod
+    def discard_staged(self, stored_file: StoredFile) -> None: ...
+
+    @abstractmethod
+    def open(self, relative_path: str) -> BinaryIO: ...
+
+    @abstractmethod
+    def exists(self, relative_path: str) -> bool: ...
+
+    # None when the file does not exist.
+    @abstractmethod
+    def size(self, relative_path: str) -> int | None: ...
+
+    @abstractmethod
+    def delete_if_exists(self, relative_path: str | None) -> None: ...
+
+    @abstractmethod
+    def promote_pending_file(self, pending_relative_path: str) -> str: ...
+
+    def local_path(self, relative_path: str) -> Path | None:
+        return None
+
+    def presign_download(self, relative_path: str, filename: str) -> str | None:
+        return None
+
+    def iter_file(self, relative_path: str) -> Iterator[bytes]:
+        with self.open(relative_path) as source:
+            while chunk := source.read(settings.upload_chunk_size_bytes):
+                yield chunk
+
+
+class FileStorageService(StorageBackend):
     def __init__(self) -> None:
         self.root = Path(settings.storage_dir)
         self.documents_dir = self.root / "documents"
         self.pending_dir = self.root / "pending"
+        self.blobs_dir = self.root / BLOB_FOLDER
+        self.blobs_tmp_dir = self.blobs_dir / "tmp"
 
     def ensure_directories(self) -> None:
         self.documents_dir.mkdir(parents=True, exist_ok=True)
         self.pending_dir.mkdir(parents=True, exist_ok=True)
+        self.blobs_tmp_dir.mkdir(parents=True, exist_ok=True)
 
-    def _build_relative_path(self, folder: str, original_name: str) -> str:
-        extension = Path(original_name).suffix
-        safe_name = f"{uuid4().hex}{extension}"
-        return f"{folder}/{safe_name}"
-
-    def save_upload(self, file: UploadFile, folder: str) -> str:
+    def stage_stream(self, source: BinaryIO, original_name: str, max_size: int | None = None) -> StoredFile:
         self.ensure_directories()
-        relative_path = self._build_relative_path(folder, file.filename or "document.bin")
-        absolute_path = self.root / relative_path
-        absolute_path.parent.mkdir(parents=True, exist_ok=True)
+        reader = HashingReader(source, settings.max_upload_size_bytes if max_size is None else max_size)
 
-        with absolute_path.open("wb") as target:
-            shutil.copyfileobj(file.file, target)
+        # The content hash decides the final location, so chunks go to a temp
+        # file under blobs/ first; the move into its shard is then an atomic
+        # rename on the same filesystem.
+        fd, temp_name = tempfile.mkstemp(dir=self.blobs_tmp_dir, prefix="upload-", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as target:
+                while chunk := reader.read(settings.upload_chunk_size_bytes):
+                    target.write(chunk)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
 
-        return relative_path
+        sha256 = reader.digest.hexdigest()
+        return StoredFile(
+            relative_path=self.build_blob_path(sha256, original_name),
+            size=reader.size,
+            sha256=sha256,
+            staged_path=f"{BLOB_FOLDER}/tmp/{Path(temp_name).name}",
+        )
+
+    def place_staged(self, stored_file: StoredFile) -> StoredFile:
+        if stored_file.staged_path:
+            # Same hash, same bytes: replacing an existing copy is harmless and
+            # leaves no window in which the blob path is missing.
+            target = self.absolute_path(stored_file.relative_path)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self.absolute_path(stored_file.staged_path), target)
+        return replace(stored_file, staged_path=None)
+
+    def discard_staged(self, stored_file: StoredFile) -> None:
+        self.delete_if_exists(stored_file.staged_path)
 
     def absolute_path(self, relative_path: str) -> Path:
         normalized = Path(relative_path)
@@ -42,6 +172,24 @@ class FileStorageService:
             raise ValueError("Invalid file path")
         return resolved
 
+    def local_path(self, relative_path: str) -> Path | None:
+        return self.absolute_path(relative_path)
+
+    def open(self, relative_path: str) -> BinaryIO:
+        return self.absolute_path(relative_path).open("rb")
+
+    def exists(self, relative_path: str) -> bool:
+        try:
+            return self.absolute_path(relative_path).is_file()
+        except ValueError:
+            return False
+
+    def size(self, relative_path: str) -> int | None:
+        try:
+            return self.absolute_path(relative_path).stat().st_size
+        except (OSError, ValueError):
+            return None
+
     def delete_if_exists(self, relative_path: str | None) -> None:
         if not relative_path:
             return
@@ -53,6 +201,10 @@ class FileStorageService:
             target.unlink()
 
     def promote_pending_file(self, pending_relative_path: str) -> str:
+        # Blobs are shared by content, so promotion only moves the reference.
+        if self.is_blob_path(pending_relative_path):
+            return pending_relative_path
+
         self.ensure_directories()
         pending_abs = self.absolute_path(pending_relative_path)
         extension = pending_abs.suffix
@@ -63,7 +215,66 @@ class FileStorageService:
         return new_relative
 
 
-file_storage = FileStorageService()
+class TimedStorageMixin:
+    # Times each backend call for the storage metrics. Reads are timed per
+    # chunk, since a download is only as slow as its slowest reads.
+    storage_name = "storage"
+
+    def stage_stream(self, source: BinaryIO, original_name: str, max_size: int | None = None) -> StoredFile:
+        with storage_timer(self.storage_name, "save"):
+            return super().stage_stream(source, original_name, max_size=max_size)
+
+    def place_staged(self, stored_file: StoredFile) -> StoredFile:
+        with storage_timer(self.storage_name, "place"):
+            return super().place_staged(stored_file)
+
+    def open(self, relative_path: str) -> BinaryIO:
+        with storage_timer(self.storage_name, "open"):
+            return super().open(relative_path)
+
+    def exists(self, relative_path: str) -> bool:
+        with storage_timer(self.storage_name, "exists"):
+            return super().exists(relative_path)
+
+    def size(self, relative_path: str) -> int | None:
+        with storage_timer(self.storage_name, "size"):
+            return super().size(relative_path)
+
+    def delete_if_exists(self, relative_path: str | None) -> None:
+        with storage_timer(self.storage_name, "delete"):
+            super().delete_if_exists(relative_path)
+
+    def promote_pending_file(self, pending_relative_path: str) -> str:
+        with storage_timer(self.storage_name, "promote"):
+            return super().promote_pending_file(pending_relative_path)
+
+    def presign_download(self, relative_path: str, filename: str) -> str | None:
+        with storage_timer(self.storage_name, "presign"):
+            return super().presign_download(relative_path, filename)
+
+    def iter_file(self, relative_path: str) -> Iterator[bytes]:
+        chunks = super().iter_file(relative_path)
+        while True:
+            with storage_timer(self.storage_name, "read"):
+                chunk = next(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+
+class InstrumentedFileStorageService(TimedStorageMixin, FileStorageService):
+    storage_name = "local"
+
+
+def build_storage_backend() -> StorageBackend:
+    if settings.storage_backend == "s3":
+        from app.utils.s3_storage import InstrumentedS3StorageBackend
+
+        return InstrumentedS3StorageBackend()
+    return InstrumentedFileStorageService()
+
+
+file_storage = build_storage_backend()
 
 
 def ensure_storage_directories() -> None:
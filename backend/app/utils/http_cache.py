@@ -0,0 +1,94 @@
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from secrets import token_hex
+
+import anyio
+from fastapi.responses import FileResponse
+from starlette.datastructures import Headers
+from starlette.types import Send
+
+from app.models.document import Document
+
+
+def document_etag(document: Document) -> str:
+    if document.file_sha256:
+        return f'"{document.file_sha256}"'
+    return f'"{document.id}-v{document.version}"'
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return format_datetime(value.astimezone(UTC), usegmt=True)
+
+
+def is_not_modified(request_headers: Headers, etag: str, last_modified: datetime) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match uses weak comparison and takes precedence over dates.
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or etag.removeprefix("W/") in candidates
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=UTC)
+        return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+class DocumentFileResponse(FileResponse):
+    # Starlette's multi-range reply keeps the file's own Content-Type and frames
+    # parts with bare LF; RFC 9110 requires multipart/byteranges with CRLF.
+    # This overrides a private method, which is why requirements.txt pins
+    # starlette.
+    async def _handle_multiple_ranges(
+        self,
+        send: Send,
+        ranges: list[tuple[int, int]],
+        file_size: int,
+        send_header_only: bool,
+    ) -> None:
+        boundary = token_hex(13)
+        part_content_type = self.headers["content-type"]
+        part_headers = [
+            (
+                f"--{boundary}\r\n"
+                f"Content-Type: {part_content_type}\r\n"
+                f"Content-Range: bytes {start}-{end - 1}/{file_size}\r\n\r\n"
+            ).encode("latin-1")
+            for start, end in ranges
+        ]
+        closing = f"\r\n--{boundary}--\r\n".encode("latin-1")
+        content_length = (
+            sum(len(header) + end - start for header, (start, end) in zip(part_headers, ranges))
+            + 2 * (len(ranges) - 1)
+            + len(closing)
+        )
+
+        self.headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+        self.headers["content-length"] = str(content_length)
+        await send({"type": "http.response.start", "status": 206, "headers": self.raw_headers})
+        if send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            for index, (header, (start, end)) in enumerate(zip(part_headers, ranges)):
+                prefix = b"\r\n" if index else b""
+                await send({"type": "http.response.body", "body": prefix + header, "more_body": True})
+                await file.seek(start)
+                while start < end:
+                    chunk = await file.read(min(self.chunk_size, end - start))
+                    if not chunk:
+                        break
+                    start += len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": closing, "more_body": False})
@@ -0,0 +1,42 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from math import ceil
+
+from app.core.enums import TotalMode
+from app.schemas.common import PaginationMeta
+
+
+def encode_cursor(created_at: datetime, record_id: int) -> str:
+    raw = json.dumps({"created_at": created_at.isoformat(), "id": record_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(data["created_at"]), int(data["id"])
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def build_pagination_meta(
+    page: int,
+    page_size: int,
+    total: int | None,
+    total_mode: TotalMode,
+    next_cursor: str | None = None,
+) -> PaginationMeta:
+    total_pages = None
+    if total is not None:
+        total_pages = max(1, ceil(total / page_size)) if total else 1
+    return PaginationMeta(
+        page=page,
+        page_size=page_size,
+        total=total,
+        total_pages=total_pages,
+        total_mode=total_mode,
+        next_cursor=next_cursor,
+    )
@@ -0,0 +1,150 @@
+from dataclasses import replace
+from pathlib import PurePosixPath
+from typing import Any, BinaryIO
+from uuid import uuid4
+
+from app.core.config import get_settings
+from app.utils.file_storage import BLOB_FOLDER, HashingReader, StorageBackend, StoredFile, TimedStorageMixin
+
+settings = get_settings()
+
+# S3 rejects multipart parts below 5 MiB except for the last one.
+MIN_MULTIPART_PART_SIZE = 5 * 1024 * 1024
+
+
+def _read_part(reader: HashingReader, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = reader.read(size - len(buffer))
+        if not chunk:
+            break
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+class S3StorageBackend(StorageBackend):
+    def __init__(self, client: Any | None = None, bucket: str | None = None) -> None:
+        if client is None:
+            try:
+                import boto3
+            except ImportError as exc:
+                raise RuntimeError("STORAGE_BACKEND=s3 requires the boto3 package") from exc
+
+            client = boto3.client(
+                "s3",
+                endpoint_url=settings.s3_endpoint_url,
+                region_name=settings.s3_region,
+                aws_access_key_id=settings.s3_access_key_id,
+                aws_secret_access_key=settings.s3_secret_access_key,
+            )
+        self.client = client
+        self.bucket = bucket or settings.s3_bucket
+        self.part_size = max(settings.s3_multipart_part_size_bytes, MIN_MULTIPART_PART_SIZE)
+
+    def stage_stream(self, source: BinaryIO, original_name: str, max_size: int | None = None) -> StoredFile:
+        reader = HashingReader(source, settings.max_upload_size_bytes if max_size is None else max_size)
+
+        # The content-addressed key is only known once every byte has been
+        # hashed, so the upload lands on a temp key and is then copied
+        # server-side; no bytes pass through the API process twice.
+        temp_key = f"{BLOB_FOLDER}/tmp/{uuid4().hex}"
+        self._upload(reader, temp_key)
+        sha256 = reader.digest.hexdigest()
+        return StoredFile(
+            relative_path=self.build_blob_path(sha256, original_name),
+            size=reader.size,
+            sha256=sha256,
+            staged_path=temp_key,
+        )
+
+    def place_staged(self, stored_file: StoredFile) -> StoredFile:
+        if stored_file.staged_path:
+            try:
+                if not self.exists(stored_file.relative_path):
+                    self.client.copy(
+                        {"Bucket": self.bucket, "Key": stored_file.staged_path}, self.bucket, stored_file.relative_path
+                    )
+            finally:
+                self.client.delete_object(Bucket=self.bucket, Key=stored_file.staged_path)
+        return replace(stored_file, staged_path=None)
+
+    def discard_staged(self, stored_file: StoredFile) -> None:
+        self.delete_if_exists(stored_file.staged_path)
+
+    def _upload(self, reader: HashingReader, key: str) -> None:
+        part = _read_part(reader, self.part_size)
+        if len(part) < self.part_size:
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=part)
+            return
+
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=key)["UploadId"]
+        parts: list[dict] = []
+        try:
+            while part:
+                part_number = len(parts) + 1
+                response = self.client.upload_part(
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=part,
+                )
+                parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+                part = _read_part(reader, self.part_size)
+
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+
+    def open(self, relative_path: str) -> BinaryIO:
+        return self.client.get_object(Bucket=self.bucket, Key=relative_path)["Body"]
+
+    def exists(self, relative_path: str) -> bool:
+        return self.size(relative_path) is not None
+
+    def size(self, relative_path: str) -> int | None:
+        from botocore.exceptions import ClientError
+
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=relative_path)
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in {"404", "NoSuchKey", "NotFound"}:
+                return None
+            raise
+        return head["ContentLength"]
+
+    def delete_if_exists(self, relative_path: str | None) -> None:
+        if not relative_path:
+            return
+        self.client.delete_object(Bucket=self.bucket, Key=relative_path)
+
+    def promote_pending_file(self, pending_relative_path: str) -> str:
+        if self.is_blob_path(pending_relative_path):
+            return pending_relative_path
+
+        extension = PurePosixPath(pending_relative_path).suffix
+        new_key = f"documents/{uuid4().hex}{extension}"
+        self.client.copy({"Bucket": self.bucket, "Key": pending_relative_path}, self.bucket, new_key)
+        return new_key
+
+    def presign_download(self, relative_path: str, filename: str) -> str | None:
+        safe_filename = filename.replace('"', "")
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": relative_path,
+                "ResponseContentDisposition": f'attachment; filename="{safe_filename}"',
+            },
+            ExpiresIn=settings.storage_presign_expire_seconds,
+        )
+
+
+class InstrumentedS3StorageBackend(TimedStorageMixin, S3StorageBackend):
+    storage_name = "s3"
@@ -1,3 +1,8 @@
+from collections.abc import Sequence
+from enum import Enum
+
+from sqlalchemy import Row
+
 from app.models.document import Document
 from app.models.notification import Notification
 from app.models.permission_request import PermissionRequest
@@ -14,43 +19,61 @@ def serialize_user(user: User) -> dict:
     }
 
 
+# The single definition of each list payload: repositories select exactly
+# these columns for list pages, and both Row and ORM inputs serialize from it.
+DOCUMENT_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "document_type",
+    "file_url",
+    "file_size",
+    "file_sha256",
+    "version",
+    "status",
+    "created_by",
+    "created_at",
+)
+PERMISSION_REQUEST_FIELDS = (
+    "id",
+    "document_id",
+    "action",
+    "requested_by",
+    "requester_email",
+    "requested_at",
+    "status",
+    "reviewed_by",
+    "reviewed_at",
+    "note",
+    "payload",
+)
+NOTIFICATION_FIELDS = ("id", "user_id", "type", "message", "related_entity_id", "is_read", "created_at")
+
+
 def serialize_document(document: Document) -> dict:
-    return {
-        "id": document.id,
-        "title": document.title,
-        "description": document.description,
-        "document_type": document.document_type,
-        "file_url": document.file_url,
-        "version": document.version,
-        "status": document.status.value,
-        "created_by": document.created_by,
-        "created_at": document.created_at,
-    }
+    return _serialize(document, DOCUMENT_FIELDS)
 
 
 def serialize_permission_request(permission_request: PermissionRequest) -> dict:
-    return {
-        "id": permission_request.id,
-        "document_id": permission_request.document_id,
-        "action": permission_request.action.value,
-        "requested_by": permission_request.requested_by,
-        "requester_email": permission_request.requester_email,
-        "requested_at": permission_request.requested_at,
-        "status": permission_request.status.value,
-        "reviewed_by": permission_request.reviewed_by,
-        "reviewed_at": permission_request.reviewed_at,
-        "note": permission_request.note,
-        "payload": permission_request.payload,
-    }
+    return _serialize(permission_request, PERMISSION_REQUEST_FIELDS)
 
 
 def serialize_notification(notification: Notification) -> dict:
-    return {
-        "id": notification.id,
-        "user_id": notification.user_id,
-        "type": notification.type,
-        "message": notification.message,
-        "related_entity_id": notification.related_entity_id,
-        "is_read": notification.is_read,
-        "created_at": notification.created_at,
-    }
+    return _serialize(notification, NOTIFICATION_FIELDS)
+
+
+def serialize_list(items: Sequence, fields: tuple[str, ...]) -> list[dict]:
+    # List queries select exactly these fields, in order, so rows are zipped
+    # with them instead of paying a Row attribute lookup per field. Enum
+    # members are left for the JSON encoder to render.
+    if items and isinstance(items[0], Row):
+        return [dict(zip(fields, row, strict=True)) for row in items]
+    return [_serialize(item, fields) for item in items]
+
+
+def _serialize(item: object, fields: tuple[str, ...]) -> dict:
+    data = {field: getattr(item, field) for field in fields}
+    for field, value in data.items():
+        if isinstance(value, Enum):
+            data[field] = value.value
+    return data
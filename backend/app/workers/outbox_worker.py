@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.core.enums import OutboxTopic
+from app.repositories.blob_repository import BlobRepository
+from app.repositories.notification_repository import NotificationRepository
+from app.repositories.outbox_repository import OutboxRepository
+from app.repositories.user_repository import UserRepository
+from app.utils.file_storage import file_storage
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+OutboxHandler = Callable[[Session, dict], None]
+PURGE_INTERVAL_SECONDS = 600
+
+
+def delete_file(db: Session, payload: dict) -> None:
+    # The content may have been uploaded again since the event was written;
+    # the blob row stays locked until the event is marked done.
+    path = payload["path"]
+    if BlobRepository(db).lock_unreferenced(path):
+        file_storage.delete_if_exists(path)
+
+
+def notify_admins(db: Session, payload: dict) -> None:
+    admin_ids = UserRepository(db).list_admin_ids()
+    NotificationRepository(db).create_many(
+        payloads=[
+            {
+                "user_id": admin_id,
+                "type": payload["type"],
+                "message": payload["message"],
+                "related_entity_id": payload.get("related_entity_id"),
+            }
+            for admin_id in admin_ids
+        ]
+    )
+
+
+HANDLERS: dict[str, OutboxHandler] = {
+    OutboxTopic.DELETE_FILE.value: delete_file,
+    OutboxTopic.NOTIFY_ADMINS.value: notify_admins,
+}
+
+
+def process_outbox_batch(session_factory: sessionmaker, batch_size: int | None = None) -> int:
+    db = session_factory()
+    try:
+        outbox_repo = OutboxRepository(db)
+        processed = 0
+        while processed < (batch_size or settings.outbox_batch_size):
+            event = outbox_repo.claim_next(lease_seconds=settings.outbox_lease_seconds)
+            db.commit()
+            if event is None:
+                break
+
+            processed += 1
+            try:
+                handler = HANDLERS.get(event.topic)
+                if handler is None:
+                    raise LookupError(f"No outbox handler for topic {event.topic!r}")
+                handler(db, event.payload)
+                outbox_repo.mark_done(event)
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                logger.warning("Outbox event %s (%s) failed: %s", event.id, event.topic, exc)
+                outbox_repo.mark_failed(
+                    event,
+                    error=repr(exc),
+                    max_attempts=settings.outbox_max_attempts,
+                    retry_base_seconds=settings.outbox_retry_base_seconds,
+                )
+                db.commit()
+        return processed
+    finally:
+        db.close()
+
+
+def purge_processed_events(session_factory: sessionmaker) -> int:
+    db = session_factory()
+    try:
+        cutoff = datetime.now(UTC) - timedelta(hours=settings.outbox_retention_hours)
+        deleted = OutboxRepository(db).delete_processed_before(cutoff)
+        db.commit()
+        return deleted
+    finally:
+        db.close()
+
+
+class OutboxWorker:
+    def __init__(self, session_factory: sessionmaker, poll_seconds: float) -> None:
+        self.session_factory = session_factory
+        self.poll_seconds = poll_seconds
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self) -> None:
+        last_purge = 0.0
+        while True:
+            try:
+                processed = await run_in_threadpool(process_outbox_batch, self.session_factory)
+                if not processed and time.monotonic() - last_purge > PURGE_INTERVAL_SECONDS:
+                    await run_in_threadpool(purge_processed_events, self.session_factory)
+                    last_purge = time.monotonic()
+            except Exception:
+                logger.exception("Outbox batch failed")
+                processed = 0
+            if not processed:
+                await asyncio.sleep(self.poll_seconds)
@@ -0,0 +1,261 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from seed_bench import BENCH_PASSWORD, DOCUMENT_TYPES, SEARCH_TERMS, bench_user_email
+
+SCENARIOS = ["list", "search", "upload", "download", "review"]
+
+
+@dataclass
+class BenchContext:
+    user_headers: dict
+    admin_headers: dict
+    document_ids: list[int]
+    pending_request_ids: deque[int]
+    rng: random.Random
+
+
+@dataclass
+class ScenarioResult:
+    latencies: list[float] = field(default_factory=list)
+    status_counts: dict[int, int] = field(default_factory=dict)
+    errors: int = 0
+    elapsed: float = 0.0
+
+
+def percentile_ms(latencies: list[float], percent: int) -> float:
+    if not latencies:
+        return 0.0
+    ordered = sorted(latencies)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return round(ordered[index] * 1000, 2)
+
+
+async def list_documents(client, context: BenchContext):
+    # Most traffic reads the first pages; the tail exercises deep offsets.
+    page = 1 if context.rng.random() < 0.8 else context.rng.randint(2, 50)
+    params = {"page": page, "page_size": 20}
+    if context.rng.random() < 0.3:
+        params["document_type"] = context.rng.choice(DOCUMENT_TYPES)
+    return await client.get("/api/v1/documents", headers=context.user_headers, params=params)
+
+
+async def search_documents(client, context: BenchContext):
+    term = context.rng.choice(SEARCH_TERMS)
+    if context.rng.random() < 0.3:
+        term = term[:3]
+    return await client.get("/api/v1/documents", headers=context.user_headers, params={"search": term, "page_size": 20})
+
+
+async def upload_document(client, context: BenchContext):
+    content = context.rng.randbytes(context.rng.choice([4_096, 65_536, 524_288]))
+    return await client.post(
+        "/api/v1/documents/upload",
+        headers=context.user_headers,
+        data={"title": "Benchmark upload", "description": "Uploaded by bench_api", "document_type": "REPORT"},
+        files={"file": ("bench.pdf", content, "application/pdf")},
+    )
+
+
+async def download_document(client, context: BenchContext):
+    # Only owners and admins may download, and the sampled documents belong
+    # to many users.
+    document_id = context.rng.choice(context.document_ids)
+    return await client.get(f"/api/v1/documents/{document_id}/download", headers=context.admin_headers)
+
+
+async def review_request(client, context: BenchContext):
+    if not context.pending_request_ids:
+        return None
+    request_id = context.pending_request_ids.popleft()
+    # Rejecting keeps the document, so the seed survives repeated runs of
+    # everything but this scenario.
+    return await client.post(
+        f"/api/v1/permission-requests/{request_id}/review",
+        headers=context.admin_headers,
+        json={"decision": "REJECT", "note": "Benchmark"},
+    )
+
+
+SCENARIO_DRIVERS: dict[str, Callable[..., Awaitable]] = {
+    "list": list_documents,
+    "search": search_documents,
+    "upload": upload_document,
+    "download": download_document,
+    "review": review_request,
+}
+
+
+async def login(client, email: str, password: str) -> dict:
+    response = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+
+
+async def prepare(client, args) -> BenchContext:
+    user_headers = await login(client, bench_user_email(0), BENCH_PASSWORD)
+    admin_headers = await login(client, args.admin_email, args.admin_password)
+
+    document_ids: list[int] = []
+    for page in range(1, 6):
+        response = await client.get(
+            "/api/v1/documents",
+            headers=user_headers,
+            params={"page": page, "page_size": 100, "status": "ACTIVE", "total_mode": "none"},
+        )
+        response.raise_for_status()
+        document_ids.extend(item["id"] for item in response.json()["data"]["items"])
+
+    pending_request_ids: deque[int] = deque()
+    if "review" in args.scenarios:
+        for page in range(1, args.requests // 100 + 2):
+            response = await client.get(
+                "/api/v1/permission-requests",
+                headers=admin_headers,
+                params={"page": page, "page_size": 100, "status": "PENDING", "total_mode": "none"},
+            )
+            response.raise_for_status()
+            pending_request_ids.extend(item["id"] for item in response.json()["data"]["items"])
+
+    if not document_ids:
+        sys.exit("No documents found; run scripts/seed_bench.py against this database first")
+    return BenchContext(user_headers, admin_headers, document_ids, pending_request_ids, random.Random(args.seed))
+
+
+async def run_scenario(client, context: BenchContext, driver, requests: int, concurrency: int) -> ScenarioResult:
+    result = ScenarioResult()
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await driver(client, context)
+            except Exception:
+                result.errors += 1
+                continue
+            if response is None:
+                return
+            result.latencies.append(time.perf_counter() - started)
+            result.status_counts[response.status_code] = result.status_counts.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def summarize(result: ScenarioResult) -> dict:
+    succeeded = sum(count for status, count in result.status_counts.items() if status < 400)
+    return {
+        "requests": len(result.latencies) + result.errors,
+        "succeeded": succeeded,
+        "errors": result.errors,
+        "status_counts": result.status_counts,
+        "throughput_rps": round(succeeded / result.elapsed, 1) if result.elapsed else 0.0,
+        "p50_ms": percentile_ms(result.latencies, 50),
+        "p95_ms": percentile_ms(result.latencies, 95),
+        "p99_ms": percentile_ms(result.latencies, 99),
+    }
+
+
+async def run(args) -> dict:
+    import httpx
+
+    if args.base_url:
+        transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.concurrency))
+        base_url = args.base_url
+    else:
+        from app.main import app
+        from app.utils.file_storage import ensure_storage_directories
+
+        ensure_storage_directories()
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://bench"
+
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout) as client:
+        context = await prepare(client, args)
+        for name in args.scenarios:
+            driver = SCENARIO_DRIVERS[name]
+            # Reviews consume the seeded requests, so they are not warmed up.
+            if name != "review":
+                await run_scenario(client, context, driver, args.warmup, args.concurrency)
+            results[name] = summarize(await run_scenario(client, context, driver, args.requests, args.concurrency))
+            print(f"{name:<10} {json.dumps(results[name])}", flush=True)
+
+    if not args.base_url:
+        from app.core.password_hashing import password_hasher
+
+        password_hasher.shutdown()
+    return results
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    found = []
+    for name, current in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        if current["succeeded"] < current["requests"] and previous["succeeded"] == previous["requests"]:
+            found.append(f"{name} failed requests: {current['requests'] - current['succeeded']}")
+        for metric in ("p95_ms", "p99_ms"):
+            if previous[metric] and current[metric] > previous[metric] * (1 + tolerance):
+                found.append(f"{name} {metric}: {previous[metric]} -> {current[metric]}")
+        if previous["throughput_rps"] and current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            found.append(f"{name} throughput_rps: {previous['throughput_rps']} -> {current['throughput_rps']}")
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Drive list/search/upload/download/review load against the API")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--base-url", help="benchmark a running server instead of the app in-process")
+    parser.add_argument("--scenarios", type=lambda value: value.split(","), default=SCENARIOS)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--admin-email", default="admin@example.com")
+    parser.add_argument("--admin-password", default="Admin123!")
+    parser.add_argument("--output", help="write the results as JSON, e.g. to use as a later --baseline")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression against --baseline")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # In-process runs read settings at import time, like the other benches.
+    os.environ["DATABASE_URL"] = args.database_url
+    results = asyncio.run(run(args))
+    report = {
+        "target": args.base_url or args.database_url.split("://", 1)[0],
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "scenarios": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            found = regressions(results, json.load(baseline_file), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+def seed(document_count: int) -> str:
+    from app.core.database import SessionLocal, engine
+    from app.core.security import create_access_token, get_password_hash
+    from app.models.base import Base
+    from app.models.document import Document
+    from app.models.user import User
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(email="bench@example.com", full_name="Bench User", hashed_password=get_password_hash("Bench123!"))
+        db.add(user)
+        db.flush()
+        db.add_all(
+            Document(
+                title=f"Benchmark document {index}",
+                description=f"Seeded row {index} for the request path benchmark",
+                document_type="report",
+                file_url=f"documents/bench-{index}.txt",
+                created_by=user.id,
+            )
+            for index in range(document_count)
+        )
+        db.commit()
+        return create_access_token(subject=str(user.id))
+    finally:
+        db.close()
+
+
+async def run_load(token: str, total_requests: int, concurrency: int) -> dict:
+    import httpx
+
+    from app.main import app
+
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies: list[float] = []
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for index in range(total_requests):
+        queue.put_nowait(index)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def worker() -> None:
+            while not queue.empty():
+                index = queue.get_nowait()
+                path = "/api/v1/documents" if index % 2 else "/api/v1/auth/me"
+                started = time.perf_counter()
+                response = await client.get(path, params={"page_size": 20} if index % 2 else None, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    from app.core.database import async_engine
+
+    if async_engine is not None:
+        await async_engine.dispose()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "requests_per_second": round(total_requests / elapsed, 1),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p95_ms": round(quantiles[94] * 1000, 2),
+    }
+
+
+def run_mode(args: argparse.Namespace) -> None:
+    token = seed(args.documents)
+    result = asyncio.run(run_load(token, args.requests, args.concurrency))
+    print(json.dumps({"mode": "async" if os.environ.get("DATABASE_ASYNC") == "true" else "sync", **result}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the sync and async database request paths")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_mode(args)
+        return
+
+    # Settings are read once at import time, so each mode runs in its own
+    # interpreter with DATABASE_ASYNC set accordingly.
+    for database_async in ("false", "true"):
+        env = {**os.environ, "DATABASE_URL": args.database_url, "DATABASE_ASYNC": database_async}
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "scripts.bench_async_db",
+                "--child",
+                "--requests",
+                str(args.requests),
+                "--concurrency",
+                str(args.concurrency),
+                "--documents",
+                str(args.documents),
+            ],
+            env=env,
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
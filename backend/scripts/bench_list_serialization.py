@@ -0,0 +1,190 @@
+import argparse
+import asyncio
+import os
+import time
+
+
+def seed(rows: int) -> int:
+    from sqlalchemy import insert
+
+    from app.core.database import SessionLocal, engine
+    from app.core.enums import DocumentStatus, PermissionAction, PermissionRequestStatus
+    from app.models.base import Base
+    from app.models.document import Document
+    from app.models.notification import Notification
+    from app.models.permission_request import PermissionRequest
+    from app.models.user import User
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(email="bench@example.com", full_name="Bench User", hashed_password="-")
+        db.add(user)
+        db.flush()
+        db.execute(
+            insert(Document),
+            [
+                {
+                    "title": f"Quarterly report {index}",
+                    "description": "Revenue and headcount figures for the quarter " * 4,
+                    "document_type": "REPORT",
+                    "file_url": f"blobs/{index:064x}.pdf",
+                    "file_size": 1024 * index,
+                    "file_sha256": f"{index:064x}",
+                    "version": 1,
+                    "status": DocumentStatus.ACTIVE,
+                    "created_by": user.id,
+                }
+                for index in range(rows)
+            ],
+        )
+        db.execute(
+            insert(Notification),
+            [
+                {
+                    "user_id": user.id,
+                    "type": "PERMISSION_RESULT",
+                    "message": f"Request #{index} has been APPROVED",
+                    "related_entity_id": index,
+                }
+                for index in range(rows)
+            ],
+        )
+        db.execute(
+            insert(PermissionRequest),
+            [
+                {
+                    "document_id": None,
+                    "action": PermissionAction.REPLACE,
+                    "requested_by": user.id,
+                    "requester_email": user.email,
+                    "status": PermissionRequestStatus.PENDING,
+                    "note": "Please replace with the corrected figures",
+                    "payload": {"pending_file_url": f"blobs/{index:064x}.pdf", "pending_file_size": 2048},
+                }
+                for index in range(rows)
+            ],
+        )
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def endpoints(user_id: int, page_size: int) -> dict:
+    from sqlalchemy import select
+
+    from app.core.enums import TotalMode
+    from app.models.document import Document
+    from app.models.notification import Notification
+    from app.models.permission_request import PermissionRequest
+    from app.repositories.document_repository import DocumentRepository
+    from app.repositories.notification_repository import NotificationRepository
+    from app.repositories.permission_request_repository import PermissionRequestRepository
+    from app.utils.serializers import serialize_document, serialize_notification, serialize_permission_request
+
+    # The old paths loaded full ORM instances; the new ones go through the
+    # repositories, which now project plain rows. Counting is left out of both.
+    return {
+        "GET /documents": (
+            lambda db: db.scalars(
+                select(Document).order_by(Document.created_at.desc(), Document.id.desc()).limit(page_size + 1)
+            ).all()[:page_size],
+            lambda db: DocumentRepository(db).list_paginated(
+                page=1, page_size=page_size, search=None, status=None, document_type=None, total_mode=TotalMode.NONE
+            )[0],
+            serialize_document,
+        ),
+        "GET /notifications": (
+            lambda db: db.scalars(
+                select(Notification)
+                .where(Notification.user_id == user_id)
+                .order_by(Notification.created_at.desc())
+                .limit(page_size)
+            ).all(),
+            lambda db: NotificationRepository(db).list_paginated(
+                user_id=user_id, page=1, page_size=page_size, total_mode=TotalMode.NONE
+            )[0],
+            serialize_notification,
+        ),
+        "GET /permission-requests": (
+            lambda db: db.scalars(
+                select(PermissionRequest).order_by(PermissionRequest.requested_at.desc()).limit(page_size)
+            ).all(),
+            lambda db: PermissionRequestRepository(db).list_paginated(
+                page=1, page_size=page_size, status=None, total_mode=TotalMode.NONE
+            )[0],
+            serialize_permission_request,
+        ),
+    }
+
+
+async def old_body(items: list, serializer, response_field) -> bytes:
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+
+    from app.core.responses import success_response
+
+    # What FastAPI does for a route annotated "-> dict": validate and dump the
+    # content through the response field, then render it with stdlib json.
+    content = success_response(data={"items": [serializer(item) for item in items]}, message="Fetched")
+    content = await serialize_response(field=response_field, response_content=content)
+    return JSONResponse(content).body
+
+
+async def new_body(items: list, serializer) -> bytes:
+    from app.core.responses import fast_success_response
+    from app.utils.serializers import serialize_list
+
+    return fast_success_response(data={"items": serialize_list(items, serializer)}, message="Fetched").body
+
+
+async def measure(load, render, repeat: int) -> tuple[float, float]:
+    from app.core.database import SessionLocal
+
+    query_timings = []
+    total_timings = []
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            items = load(db)
+            loaded = time.perf_counter()
+            await render(items)
+            finished = time.perf_counter()
+        finally:
+            db.close()
+        query_timings.append(loaded - started)
+        total_timings.append(finished - started)
+    return min(query_timings) * 1000, min(total_timings) * 1000
+
+
+async def run(user_id: int, page_size: int, repeat: int, response_field) -> None:
+    print(f"{'endpoint':<24} {'old load':>9} {'old total':>10} {'new load':>9} {'new total':>10} {'speedup':>8}")
+    for name, (old_load, new_load, serializer) in endpoints(user_id, page_size).items():
+        old_load_ms, old_ms = await measure(
+            old_load, lambda items, serializer=serializer: old_body(items, serializer, response_field), repeat
+        )
+        new_load_ms, new_ms = await measure(new_load, lambda items, serializer=serializer: new_body(items, serializer), repeat)
+        print(f"{name:<24} {old_load_ms:>9.2f} {old_ms:>10.2f} {new_load_ms:>9.2f} {new_ms:>10.2f} {old_ms / new_ms:>7.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the old and new list response paths")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from fastapi.utils import create_model_field
+
+    response_field = create_model_field(name="Response_bench", type_=dict, mode="serialization")
+    user_id = seed(args.page_size)
+
+    asyncio.run(run(user_id, args.page_size, args.repeat, response_field))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+
+def seed() -> str:
+    from app.core.database import SessionLocal, engine
+    from app.core.security import create_access_token, get_password_hash
+    from app.models.base import Base
+    from app.models.user import User
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = User(email="bench@example.com", full_name="Bench User", hashed_password=get_password_hash("Bench123!"))
+        db.add(user)
+        db.commit()
+        return create_access_token(subject=str(user.id))
+    finally:
+        db.close()
+
+
+def p95_ms(latencies: list[float]) -> float:
+    if len(latencies) < 2:
+        return round(latencies[0] * 1000, 2) if latencies else 0.0
+    return round(statistics.quantiles(latencies, n=100)[94] * 1000, 2)
+
+
+async def run_load(token: str, logins: int, concurrency: int, background_requests: int) -> dict:
+    import httpx
+
+    from app.core.password_hashing import password_hasher
+    from app.main import app
+
+    login_latencies: list[float] = []
+    read_latencies: list[float] = []
+    status_counts: dict[int, int] = {}
+    pending_logins = iter(range(logins))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def login_worker() -> None:
+            for _ in pending_logins:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/auth/login",
+                    json={"email": "bench@example.com", "password": "Bench123!"},
+                )
+                login_latencies.append(time.perf_counter() - started)
+                status_counts[response.status_code] = status_counts.get(response.status_code, 0) + 1
+
+        # Unrelated reads running alongside the burst show whether hashing
+        # starves the rest of the API.
+        async def read_worker() -> None:
+            for _ in range(background_requests):
+                started = time.perf_counter()
+                response = await client.get("/api/v1/documents", headers={"Authorization": f"Bearer {token}"})
+                response.raise_for_status()
+                read_latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(read_worker(), *(login_worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    password_hasher.shutdown()
+    return {
+        "logins": logins,
+        "concurrency": concurrency,
+        "logins_per_second": round(status_counts.get(200, 0) / elapsed, 1),
+        "status_counts": status_counts,
+        "login_p95_ms": p95_ms(login_latencies),
+        "read_p95_ms": p95_ms(read_latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure login throughput under a burst")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--background-requests", type=int, default=200)
+    args = parser.parse_args()
+
+    # Settings are read at import time, so the URL must be set before the app
+    # modules load. BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS and
+    # PASSWORD_HASH_QUEUE_SIZE are taken from the environment as usual.
+    os.environ["DATABASE_URL"] = args.database_url
+    token = seed()
+    result = asyncio.run(run_load(token, args.logins, args.concurrency, args.background_requests))
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
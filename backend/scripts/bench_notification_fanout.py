@@ -0,0 +1,91 @@
+import argparse
+import os
+import time
+
+
+def seed_users(count: int) -> list[int]:
+    from sqlalchemy import insert, select
+
+    from app.core.database import SessionLocal, engine
+    from app.models.base import Base
+    from app.models.user import User
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.execute(
+            insert(User),
+            [
+                {"email": f"admin{index}@example.com", "full_name": f"Admin {index}", "hashed_password": "-"}
+                for index in range(count)
+            ],
+        )
+        db.commit()
+        return list(db.scalars(select(User.id).order_by(User.id)).all())
+    finally:
+        db.close()
+
+
+def build_payloads(user_ids: list[int]) -> list[dict]:
+    return [
+        {
+            "user_id": user_id,
+            "type": "PERMISSION_REQUEST",
+            "message": "Replace request #1 needs review",
+            "related_entity_id": 1,
+        }
+        for user_id in user_ids
+    ]
+
+
+def per_row_flush(db, payloads: list[dict]) -> None:
+    from app.models.notification import Notification
+
+    for payload in payloads:
+        db.add(Notification(**payload))
+        db.flush()
+
+
+def bulk(db, payloads: list[dict]) -> None:
+    from app.repositories.notification_repository import NotificationRepository
+
+    NotificationRepository(db).create_many(payloads)
+
+
+def measure(fn, payloads: list[dict], repeat: int) -> float:
+    from app.core.database import SessionLocal
+
+    timings = []
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            fn(db, payloads)
+            timings.append(time.perf_counter() - started)
+            db.rollback()
+        finally:
+            db.close()
+    return min(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare per-row and bulk notification fan-out")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--recipients", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    user_ids = seed_users(max(args.recipients))
+
+    print(f"{'recipients':>10} {'per-row ms':>12} {'bulk ms':>10} {'speedup':>8}")
+    for count in args.recipients:
+        payloads = build_payloads(user_ids[:count])
+        per_row = measure(per_row_flush, payloads, args.repeat)
+        bulk_ms = measure(bulk, payloads, args.repeat)
+        print(f"{count:>10} {per_row:>12.2f} {bulk_ms:>10.2f} {per_row / bulk_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
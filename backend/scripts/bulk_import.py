@@ -0,0 +1,375 @@
+import argparse
+import csv
+import json
+import os
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from itertools import islice
+from pathlib import Path
+
+MANIFEST_SUFFIXES = {".csv", ".jsonl"}
+
+
+@dataclass(frozen=True)
+class ImportEntry:
+    index: int
+    path: Path
+    title: str
+    description: str
+    document_type: str
+    owner_email: str
+    created_at: datetime | None = None
+    # Set for manifest rows that cannot be imported; reported, never stored.
+    error: str | None = None
+
+
+@dataclass
+class Checkpoint:
+    source: str
+    next_index: int = 0
+    imported: int = 0
+    failed: int = 0
+
+    @classmethod
+    def load(cls, path: Path, source: str) -> "Checkpoint":
+        if not path.is_file():
+            return cls(source=source)
+        data = json.loads(path.read_text())
+        if data["source"] != source:
+            raise SystemExit(f"{path} belongs to an import of {data['source']}; pass another --checkpoint")
+        return cls(source=source, next_index=data["next_index"], imported=data["imported"], failed=data["failed"])
+
+    def save(self, path: Path) -> None:
+        # Written to a temp file and renamed, so a crash never leaves a
+        # truncated checkpoint behind.
+        temp_path = path.with_name(f"{path.name}.tmp")
+        temp_path.write_text(
+            json.dumps(
+                {
+                    "source": self.source,
+                    "next_index": self.next_index,
+                    "imported": self.imported,
+                    "failed": self.failed,
+                    "updated_at": datetime.now(UTC).isoformat(),
+                }
+            )
+        )
+        os.replace(temp_path, path)
+
+
+def walk_directory(root: Path, owner_email: str, document_type: str) -> Iterator[ImportEntry]:
+    # Sorted at every level: resuming relies on the order being stable.
+    index = 0
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = Path(directory) / filename
+            yield ImportEntry(
+                index=index,
+                path=path,
+                title=path.stem,
+                description=f"Imported from {path.relative_to(root).as_posix()}",
+                document_type=document_type,
+                owner_email=owner_email,
+            )
+            index += 1
+
+
+def read_manifest(manifest: Path, root: Path, owner_email: str, document_type: str) -> Iterator[ImportEntry]:
+    with manifest.open(newline="") as source:
+        records = csv.DictReader(source) if manifest.suffix == ".csv" else (line for line in source if line.strip())
+        for index, record in enumerate(records):
+            try:
+                entry = manifest_entry(index, record, root, owner_email, document_type)
+            except KeyError as exc:
+                entry = invalid_entry(index, root, owner_email, document_type, f"Manifest row is missing {exc.args[0]!r}")
+            except (TypeError, ValueError) as exc:
+                entry = invalid_entry(index, root, owner_email, document_type, f"Invalid manifest row: {exc}")
+            yield entry
+
+
+def manifest_entry(index: int, record: dict | str, root: Path, owner_email: str, document_type: str) -> ImportEntry:
+    if isinstance(record, str):
+        record = json.loads(record)
+    path = root / record["path"]
+    created_at = record.get("created_at")
+    return ImportEntry(
+        index=index,
+        path=path,
+        title=record.get("title") or path.stem,
+        description=record.get("description") or f"Imported from {record['path']}",
+        document_type=record.get("document_type") or document_type,
+        owner_email=record.get("owner_email") or owner_email,
+        created_at=datetime.fromisoformat(created_at) if created_at else None,
+    )
+
+
+def invalid_entry(index: int, root: Path, owner_email: str, document_type: str, error: str) -> ImportEntry:
+    return ImportEntry(
+        index=index,
+        path=root,
+        title="",
+        description="",
+        document_type=document_type,
+        owner_email=owner_email,
+        error=error,
+    )
+
+
+def store_entry(entry: ImportEntry, max_size: int):
+    from app.utils.file_storage import file_storage
+
+    with entry.path.open("rb") as source:
+        stored_file = file_storage.stage_stream(source, entry.path.name, max_size)
+    created_at = entry.created_at or datetime.fromtimestamp(entry.path.stat().st_mtime, UTC)
+    return stored_file, created_at if created_at.tzinfo else created_at.replace(tzinfo=UTC)
+
+
+def resolve_owners(db, emails: set[str], owners: dict[str, int | None]) -> None:
+    from sqlalchemy import select
+
+    from app.models.user import User
+
+    missing = emails - owners.keys()
+    if not missing:
+        return
+    found = dict(db.execute(select(User.email, User.id).where(User.email.in_(missing))).all())
+    owners.update({email: found.get(email) for email in missing})
+
+
+def load_progress(session_factory: Callable, checkpoint: Checkpoint) -> Checkpoint:
+    from app.repositories.import_progress_repository import ImportProgressRepository
+
+    db = session_factory()
+    try:
+        progress = ImportProgressRepository(db).get(checkpoint.source)
+    finally:
+        db.close()
+    # The last batch committed but the run stopped before saving the file.
+    if progress is not None and progress.next_index > checkpoint.next_index:
+        return Checkpoint(
+            source=checkpoint.source,
+            next_index=progress.next_index,
+            imported=progress.imported,
+            failed=progress.failed,
+        )
+    return checkpoint
+
+
+def insert_batch(
+    session_factory: Callable,
+    stored: list[tuple[ImportEntry, object]],
+    owners: dict[str, int | None],
+    checkpoint: Checkpoint,
+    next_index: int,
+) -> int:
+    from app.core.document_cache import invalidate_documents
+    from app.core.enums import DocumentStatus
+    from app.repositories.blob_repository import BlobRepository
+    from app.repositories.document_repository import DocumentRepository
+    from app.repositories.import_progress_repository import ImportProgressRepository
+    from app.utils.file_storage import file_storage
+
+    db = session_factory()
+    try:
+        rows = []
+        stored_files = []
+        for entry, (stored_file, created_at) in stored:
+            stored_files.append(stored_file)
+            rows.append(
+                {
+                    "title": entry.title[:255],
+                    "description": entry.description,
+                    "document_type": entry.document_type[:100],
+                    "file_url": stored_file.relative_path,
+                    "file_size": stored_file.size,
+                    "file_sha256": stored_file.sha256,
+                    "version": 1,
+                    "status": DocumentStatus.ACTIVE,
+                    "created_by": owners[entry.owner_email],
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+            )
+        # Progress commits with the documents, so a run that stops before
+        # saving the checkpoint file resumes after exactly the manifest rows
+        # that made it in.
+        ImportProgressRepository(db).save(
+            checkpoint.source,
+            next_index=next_index,
+            imported=checkpoint.imported + len(rows),
+            failed=checkpoint.failed,
+        )
+        if rows:
+            # Staged files are moved into place under the blob row locks, like
+            # uploads, so a concurrent delete of the same content cannot win.
+            BlobRepository(db).retain_many(stored_files)
+            for stored_file in stored_files:
+                file_storage.place_staged(stored_file)
+            documents = DocumentRepository(db).create_many(rows)
+            invalidate_documents(db, [document.id for document in documents])
+        db.commit()
+        return len(rows)
+    except Exception:
+        # The rollback undid retain_many, so files placed for this batch are
+        # removed again unless another document references the same content,
+        # the same way a failed upload cleans up.
+        db.rollback()
+        discard_batch(db, [stored_file for _, (stored_file, _) in stored])
+        raise
+    finally:
+        db.close()
+
+
+def discard_batch(db, stored_files: list) -> None:
+    from app.repositories.blob_repository import BlobRepository
+    from app.utils.file_storage import file_storage
+
+    blob_repo = BlobRepository(db)
+    try:
+        for stored_file in stored_files:
+            file_storage.discard_staged(stored_file)
+        for relative_path in sorted({stored_file.relative_path for stored_file in stored_files}):
+            if blob_repo.lock_unreferenced(relative_path):
+                file_storage.delete_if_exists(relative_path)
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        print(f"Cleaning up the files of a failed batch failed: {exc}", flush=True)
+
+
+def batched(entries: Iterable[ImportEntry], size: int) -> Iterator[list[ImportEntry]]:
+    iterator = iter(entries)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def run_import(
+    entries: Iterable[ImportEntry],
+    session_factory: Callable,
+    checkpoint_path: Path,
+    errors_path: Path,
+    source: str,
+    workers: int = 8,
+    batch_size: int = 1_000,
+    max_size: int | None = None,
+) -> Checkpoint:
+    from app.core.config import get_settings
+    from app.utils.file_storage import FileTooLargeError
+
+    max_size = get_settings().max_upload_size_bytes if max_size is None else max_size
+    checkpoint = load_progress(session_factory, Checkpoint.load(checkpoint_path, source))
+    owners: dict[str, int | None] = {}
+    started = time.perf_counter()
+    resumed_imported = checkpoint.imported
+
+    with errors_path.open("a") as errors_file, ThreadPoolExecutor(max_workers=workers) as executor:
+
+        def report_error(entry: ImportEntry, error: str) -> None:
+            checkpoint.failed += 1
+            errors_file.write(json.dumps({"index": entry.index, "path": str(entry.path), "error": error}) + "\n")
+
+        def submit(batch: list[ImportEntry]) -> list[tuple[ImportEntry, Future | str]]:
+            # Owners are resolved first, so entries that cannot be inserted
+            # are never stored. Their errors are reported when the batch is
+            # collected, keeping the failed count in step with the checkpoint.
+            db = session_factory()
+            try:
+                resolve_owners(db, {entry.owner_email for entry in batch if not entry.error}, owners)
+            finally:
+                db.close()
+            pending: list[tuple[ImportEntry, Future | str]] = []
+            for entry in batch:
+                if entry.error:
+                    pending.append((entry, entry.error))
+                elif owners[entry.owner_email] is None:
+                    pending.append((entry, f"Unknown owner {entry.owner_email}"))
+                else:
+                    pending.append((entry, executor.submit(store_entry, entry, max_size)))
+            return pending
+
+        def collect(pending: list[tuple[ImportEntry, Future | str]]) -> list[tuple[ImportEntry, object]]:
+            stored = []
+            for entry, future in pending:
+                if isinstance(future, str):
+                    report_error(entry, future)
+                    continue
+                try:
+                    stored.append((entry, future.result()))
+                except FileTooLargeError:
+                    report_error(entry, f"File exceeds {max_size} bytes")
+                except OSError as exc:
+                    report_error(entry, str(exc))
+            return stored
+
+        def finish(batch: list[ImportEntry], pending: list[tuple[ImportEntry, Future | str]]) -> None:
+            stored = collect(pending)
+            next_index = batch[-1].index + 1
+            errors_file.flush()
+            checkpoint.imported += insert_batch(session_factory, stored, owners, checkpoint, next_index)
+            checkpoint.next_index = next_index
+            checkpoint.save(checkpoint_path)
+            rate = (checkpoint.imported - resumed_imported) / (time.perf_counter() - started)
+            print(
+                f"imported {checkpoint.imported}, failed {checkpoint.failed}, next {checkpoint.next_index} "
+                f"({rate:.0f} documents/s)",
+                flush=True,
+            )
+
+        # The next batch is read into storage while the current one is
+        # inserted.
+        previous = None
+        for batch in batched((entry for entry in entries if entry.index >= checkpoint.next_index), batch_size):
+            current = (batch, submit(batch))
+            if previous is not None:
+                finish(*previous)
+            previous = current
+        if previous is not None:
+            finish(*previous)
+    return checkpoint
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import a directory tree or a CSV/JSONL manifest of files as documents")
+    parser.add_argument("source", type=Path, help="directory to walk, or a .csv/.jsonl manifest with a 'path' column")
+    parser.add_argument("--root", type=Path, help="directory manifest paths are relative to (default: the manifest's)")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--owner-email", default="admin@example.com", help="owner for entries without owner_email")
+    parser.add_argument("--document-type", default="IMPORTED", help="type for entries without document_type")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    parser.add_argument("--max-size", type=int, help="largest file to import, in bytes (default: MAX_UPLOAD_SIZE_BYTES)")
+    parser.add_argument("--checkpoint", type=Path, default=Path("bulk_import.checkpoint.json"))
+    parser.add_argument("--errors", type=Path, default=Path("bulk_import.errors.jsonl"))
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    from app.core.database import SessionLocal
+
+    source = args.source.resolve()
+    if source.is_dir():
+        entries = walk_directory(source, args.owner_email, args.document_type)
+    elif source.suffix in MANIFEST_SUFFIXES:
+        entries = read_manifest(source, (args.root or source.parent).resolve(), args.owner_email, args.document_type)
+    else:
+        parser.error("source must be a directory or a .csv/.jsonl manifest")
+
+    checkpoint = run_import(
+        entries,
+        SessionLocal,
+        args.checkpoint,
+        args.errors,
+        str(source),
+        workers=args.workers,
+        batch_size=args.batch_size,
+        max_size=args.max_size,
+    )
+    print(f"Done: {checkpoint.imported} imported, {checkpoint.failed} failed (see {args.errors})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import argparse
+import logging
+import time
+
+from app.core.config import get_settings
+from app.core.database import SessionLocal
+from app.workers.outbox_worker import PURGE_INTERVAL_SECONDS, process_outbox_batch, purge_processed_events
+
+
+def run(poll_seconds: float, once: bool) -> None:
+    # For deployments that set OUTBOX_WORKER_ENABLED=false on the API nodes
+    # and run delivery as its own process.
+    last_purge = 0.0
+    while True:
+        processed = process_outbox_batch(SessionLocal)
+        if once and not processed:
+            return
+        if not processed:
+            if time.monotonic() - last_purge > PURGE_INTERVAL_SECONDS:
+                purge_processed_events(SessionLocal)
+                last_purge = time.monotonic()
+            time.sleep(poll_seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deliver pending outbox events")
+    parser.add_argument("--poll-seconds", type=float, default=get_settings().outbox_poll_seconds)
+    parser.add_argument("--once", action="store_true", help="Exit once the outbox is drained")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    run(poll_seconds=args.poll_seconds, once=args.once)
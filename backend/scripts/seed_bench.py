@@ -0,0 +1,213 @@
+import argparse
+import io
+import os
+import random
+import time
+from datetime import UTC, datetime, timedelta
+
+BENCH_PASSWORD = "Bench123!"
+DOCUMENT_TYPES = ["POLICY", "REPORT", "CONTRACT", "INVOICE", "SCAN", "MEMO"]
+SEARCH_TERMS = [
+    "budget",
+    "contract",
+    "quarterly",
+    "onboarding",
+    "security",
+    "vendor",
+    "incident",
+    "roadmap",
+    "payroll",
+    "compliance",
+    "travel",
+    "warehouse",
+]
+_FILLER = ["annual", "draft", "final", "internal", "regional", "signed", "summary", "updated", "review", "archive"]
+
+
+def bench_user_email(index: int) -> str:
+    return f"bench-user{index}@example.com"
+
+
+def seed_users(db, count: int) -> list[int]:
+    from sqlalchemy import insert, select
+
+    from app.core.security import get_password_hash
+    from app.models.user import User
+
+    # One bcrypt hash shared by every user; hashing each one separately
+    # would dominate the seed time.
+    hashed_password = get_password_hash(BENCH_PASSWORD)
+    db.execute(
+        insert(User),
+        [
+            {"email": bench_user_email(index), "full_name": f"Bench User {index}", "hashed_password": hashed_password}
+            for index in range(count)
+        ],
+    )
+    db.commit()
+    return list(db.scalars(select(User.id).where(User.email.like("bench-user%")).order_by(User.id)).all())
+
+
+def seed_files(count: int, rng: random.Random) -> list:
+    from app.utils.file_storage import file_storage
+
+    # Documents share a small pool of real files so downloads hit storage
+    # without writing a million files.
+    return [
+        file_storage.save_stream(io.BytesIO(rng.randbytes(rng.choice([2_048, 16_384, 262_144, 1_048_576]))), f"bench-{index}.pdf")
+        for index in range(count)
+    ]
+
+
+def document_rows(start: int, count: int, user_ids: list[int], stored_files: list, rng: random.Random) -> list[dict]:
+    from app.core.enums import DocumentStatus
+
+    now = datetime.now(UTC)
+    rows = []
+    for index in range(start, start + count):
+        stored_file = rng.choice(stored_files)
+        term = rng.choice(SEARCH_TERMS)
+        created_at = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        rows.append(
+            {
+                "title": f"{rng.choice(_FILLER).title()} {term} {index}",
+                "description": " ".join(rng.choices(_FILLER + SEARCH_TERMS, k=12)),
+                "document_type": rng.choice(DOCUMENT_TYPES),
+                "file_url": stored_file.relative_path,
+                "file_size": stored_file.size,
+                "file_sha256": stored_file.sha256,
+                "version": 1,
+                "status": DocumentStatus.ACTIVE,
+                "created_by": rng.choice(user_ids),
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+        )
+    return rows
+
+
+def seed_documents(db, count: int, batch_size: int, user_ids: list[int], stored_files: list, rng: random.Random) -> None:
+    from sqlalchemy import insert
+
+    from app.models.document import Document
+    from app.repositories.blob_repository import BlobRepository
+
+    files_by_path = {stored_file.relative_path: stored_file for stored_file in stored_files}
+    started = time.perf_counter()
+    for start in range(0, count, batch_size):
+        rows = document_rows(start, min(batch_size, count - start), user_ids, stored_files, rng)
+        db.execute(insert(Document), rows)
+        # Ref counts match the documents pointing at each file, so approved
+        # deletes in the review scenario never remove a shared file.
+        BlobRepository(db).retain_many([files_by_path[row["file_url"]] for row in rows])
+        db.commit()
+        print(f"documents: {min(start + batch_size, count)}/{count} ({time.perf_counter() - started:.0f}s)", flush=True)
+
+
+def seed_notifications(db, count: int, batch_size: int, user_ids: list[int], rng: random.Random) -> None:
+    from sqlalchemy import insert
+
+    from app.models.notification import Notification
+
+    for start in range(0, count, batch_size):
+        db.execute(
+            insert(Notification),
+            [
+                {
+                    "user_id": rng.choice(user_ids),
+                    "type": "PERMISSION_RESULT",
+                    "message": f"Request #{index} has been {rng.choice(['APPROVED', 'REJECTED'])}",
+                    "related_entity_id": index,
+                    "is_read": rng.random() < 0.7,
+                }
+                for index in range(start, min(start + batch_size, count))
+            ],
+        )
+        db.commit()
+
+
+def seed_pending_requests(db, count: int) -> None:
+    from sqlalchemy import insert, select, update
+
+    from app.core.enums import DocumentStatus, PermissionAction, PermissionRequestStatus
+    from app.models.document import Document
+    from app.models.permission_request import PermissionRequest
+    from app.models.user import User
+
+    documents = db.execute(
+        select(Document.id, Document.created_by, User.email)
+        .join(User, User.id == Document.created_by)
+        .order_by(Document.id.desc())
+        .limit(count)
+    ).all()
+    if not documents:
+        return
+    requests = db.execute(
+        insert(PermissionRequest).returning(PermissionRequest.id, PermissionRequest.document_id, sort_by_parameter_order=True),
+        [
+            {
+                "document_id": document_id,
+                "action": PermissionAction.DELETE,
+                "requested_by": created_by,
+                "requester_email": email,
+                "status": PermissionRequestStatus.PENDING,
+                "note": "Benchmark cleanup",
+            }
+            for document_id, created_by, email in documents
+        ],
+    ).all()
+    db.execute(
+        update(Document),
+        [
+            {"id": document_id, "status": DocumentStatus.PENDING_DELETE, "locked_by_request_id": request_id}
+            for request_id, document_id in requests
+        ],
+    )
+    db.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed a database for scripts/bench_api.py")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///./bench.db"))
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--documents", type=int, default=1_000_000)
+    parser.add_argument("--notifications", type=int, default=100_000)
+    parser.add_argument("--pending-requests", type=int, default=5_000)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="drop every table first; on PostgreSQL prefer a fresh database and 'alembic upgrade head'",
+    )
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from app.core.database import SessionLocal, engine
+    from app.models.base import Base
+    from seed_admin import seed_admin
+
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    seed_admin()
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        user_ids = seed_users(db, args.users)
+        stored_files = seed_files(args.files, rng)
+        seed_documents(db, args.documents, args.batch_size, user_ids, stored_files, rng)
+        seed_notifications(db, args.notifications, args.batch_size, user_ids, rng)
+        seed_pending_requests(db, args.pending_requests)
+    finally:
+        db.close()
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            connection.exec_driver_sql("ANALYZE")
+    print(f"Seeded {args.users} users, {args.documents} documents, {args.notifications} notifications in {time.perf_counter() - started:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
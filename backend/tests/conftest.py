@@ -1,6 +1,6 @@
 import os
 import tempfile
-from collections.abc import Generator
+from collections.abc import Callable, Generator
 
 import pytest
 from fastapi.testclient import TestClient
@@ -10,24 +10,36 @@ from sqlalchemy.orm import Session, sessionmaker
 os.environ["STORAGE_DIR"] = tempfile.mkdtemp(prefix="mini-dms-storage-")
 os.environ["JWT_SECRET_KEY"] = "test-secret-key"
 os.environ["DATABASE_URL"] = "sqlite:///./test.db"
+os.environ["OUTBOX_WORKER_ENABLED"] = "false"
 
 from app.core.database import get_db  # noqa: E402
+from app.core.document_cache import clear_document_cache  # noqa: E402
+from app.core.query_budget import QueryCounter  # noqa: E402
+from app.core.user_cache import clear_user_cache  # noqa: E402
 from app.main import app  # noqa: E402
 from app.models.base import Base  # noqa: E402
+from app.models.blob import Blob  # noqa: E402,F401
 from app.models.document import Document  # noqa: E402,F401
+from app.models.import_progress import ImportProgress  # noqa: E402,F401
 from app.models.notification import Notification  # noqa: E402,F401
+from app.models.outbox_event import OutboxEvent  # noqa: E402,F401
 from app.models.permission_request import PermissionRequest  # noqa: E402,F401
 from app.models.user import User  # noqa: E402,F401
+from app.repositories.counting import clear_count_cache  # noqa: E402
+from app.workers.outbox_worker import process_outbox_batch  # noqa: E402
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 
 @pytest.fixture(autouse=True)
 def setup_database() -> Generator[None, None, None]:
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    clear_count_cache()
+    clear_user_cache()
+    clear_document_cache()
     yield
 
 
@@ -53,3 +65,19 @@ def client() -> Generator[TestClient, None, None]:
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def drain_outbox() -> Callable[[], int]:
+    def drain() -> int:
+        processed = 0
+        while batch := process_outbox_batch(TestingSessionLocal):
+            processed += batch
+        return processed
+
+    return drain
+
+
+@pytest.fixture
+def count_queries() -> Callable[[], QueryCounter]:
+    return QueryCounter
@@ -0,0 +1,94 @@
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from app.core.database import (  # noqa: E402
+    AsyncSessionRunner,
+    build_async_engine,
+    build_async_sessionmaker,
+    get_session_runner,
+    to_async_database_url,
+)
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture
+def async_client(client):
+    async_session_local = build_async_sessionmaker(build_async_engine("sqlite:///./test.db"))
+
+    async def override_get_session_runner():
+        async with async_session_local() as session:
+            yield AsyncSessionRunner(session)
+
+    app.dependency_overrides[get_session_runner] = override_get_session_runner
+    yield client
+
+
+def test_async_database_url_uses_async_drivers():
+    assert to_async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    assert (
+        to_async_database_url("postgresql+psycopg2://app:secret@db:5432/dms")
+        == "postgresql+asyncpg://app:secret@db:5432/dms"
+    )
+
+
+def test_async_session_request_path(async_client):
+    register_response = async_client.post(
+        "/api/v1/auth/register",
+        json={"email": "async@example.com", "full_name": "Async User", "password": "Password123!"},
+    )
+    assert register_response.status_code == 200
+    headers = {"Authorization": f"Bearer {register_response.json()['data']['access_token']}"}
+
+    upload_response = async_client.post(
+        "/api/v1/documents/upload",
+        data={"title": "Async Doc", "description": "Uploaded through the async session", "document_type": "memo"},
+        files={"file": ("async.txt", b"async body", "text/plain")},
+        headers=headers,
+    )
+    assert upload_response.status_code == 200
+    document_id = upload_response.json()["data"]["id"]
+
+    list_response = async_client.get("/api/v1/documents", params={"search": "async"}, headers=headers)
+    assert list_response.status_code == 200
+    assert [item["id"] for item in list_response.json()["data"]["items"]] == [document_id]
+
+    delete_response = async_client.post(
+        f"/api/v1/documents/{document_id}/delete-request",
+        json={"expected_version": 2},
+        headers=headers,
+    )
+    assert delete_response.status_code == 409
+    assert delete_response.json()["error"]["code"] == "VERSION_CONFLICT"
+
+
+def test_async_uploads_place_files_off_the_event_loop(async_client, monkeypatch):
+    import asyncio
+
+    from app.utils.file_storage import file_storage
+
+    on_loop = []
+    place_staged = file_storage.place_staged
+
+    def record(stored_file):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return place_staged(stored_file)
+
+    monkeypatch.setattr(file_storage, "place_staged", record)
+    register_response = async_client.post(
+        "/api/v1/auth/register",
+        json={"email": "offloop@example.com", "full_name": "Off Loop", "password": "Password123!"},
+    )
+    headers = {"Authorization": f"Bearer {register_response.json()['data']['access_token']}"}
+    upload_response = async_client.post(
+        "/api/v1/documents/upload",
+        data={"title": "Off loop", "description": "Placed on a worker thread", "document_type": "memo"},
+        files={"file": ("offloop.txt", b"off loop", "text/plain")},
+        headers=headers,
+    )
+    assert upload_response.status_code == 200
+    assert on_loop == [False]
@@ -1,3 +1,15 @@
+import pytest
+from passlib.context import CryptContext
+from sqlalchemy import text
+
+from app.core.cache import RedisCache
+from app.core.config import get_settings
+from app.core.enums import UserRole
+from app.core.password_hashing import password_hasher
+from app.core.user_cache import invalidate_user
+from app.models.user import User
+
+
 def test_register_and_login(client):
     register_payload = {
         "email": "user1@example.com",
@@ -26,3 +38,105 @@ def test_register_and_login(client):
     assert me_response.status_code == 200
     me_data = me_response.json()["data"]
     assert me_data["email"] == register_payload["email"]
+
+
+def register(client, email: str) -> tuple[int, dict]:
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"email": email, "full_name": "Cached User", "password": "Password123!"},
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    return data["user"]["id"], {"Authorization": f"Bearer {data['access_token']}"}
+
+
+def test_current_user_is_cached_until_invalidated(client, db_session):
+    user_id, headers = register(client, "cached@example.com")
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+    # Bypasses the ORM, so only the cache can still answer for this user.
+    db_session.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+    db_session.commit()
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+    invalidate_user(user_id)
+    response = client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["error"]["code"] == "USER_NOT_FOUND"
+
+
+def test_role_change_invalidates_cached_user(client, db_session):
+    user_id, headers = register(client, "promoted@example.com")
+    assert client.get("/api/v1/permission-requests", headers=headers).status_code == 403
+
+    user = db_session.get(User, user_id)
+    user.role = UserRole.ADMIN
+    db_session.commit()
+    assert client.get("/api/v1/permission-requests", headers=headers).status_code == 200
+
+
+def test_read_only_routes_can_trust_token_claims(client, db_session, monkeypatch):
+    user_id, headers = register(client, "claims@example.com")
+    db_session.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+    db_session.commit()
+    invalidate_user(user_id)
+
+    monkeypatch.setattr(get_settings(), "auth_trust_token_claims", True)
+    assert client.get("/api/v1/documents", headers=headers).status_code == 200
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+
+
+def test_redis_cache_round_trip():
+    fakeredis = pytest.importorskip("fakeredis")
+    cache = RedisCache("redis://unused", ttl_seconds=60, prefix="test:", client=fakeredis.FakeRedis())
+
+    cache.set(7, {"id": 7, "role": "USER"})
+    assert cache.get(7) == {"id": 7, "role": "USER"}
+    cache.delete(7)
+    assert cache.get(7) is None
+
+
+def test_login_rehashes_password_when_cost_changes(client, db_session):
+    legacy_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    user = User(email="legacy@example.com", full_name="Legacy", hashed_password=legacy_context.hash("Password123!"))
+    db_session.add(user)
+    db_session.commit()
+
+    response = client.post("/api/v1/auth/login", json={"email": "legacy@example.com", "password": "Password123!"})
+    assert response.status_code == 200
+
+    db_session.refresh(user)
+    assert user.hashed_password.startswith(f"$2b${get_settings().bcrypt_rounds:02d}$")
+
+
+def test_hashing_is_rejected_when_pool_is_full(client, monkeypatch):
+    monkeypatch.setattr(password_hasher, "in_flight", password_hasher.capacity)
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"email": "burst@example.com", "full_name": "Burst", "password": "Password123!"},
+    )
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+    assert response.json()["error"]["code"] == "TOO_MANY_REQUESTS"
+
+
+def test_broken_hash_pool_is_replaced_and_retried(client, monkeypatch):
+    from concurrent.futures.process import BrokenProcessPool
+
+    class BrokenExecutor:
+        def submit(self, *args):
+            raise BrokenProcessPool("A worker process terminated abruptly")
+
+        def shutdown(self, **kwargs) -> None:
+            pass
+
+    broken = BrokenExecutor()
+    monkeypatch.setattr(password_hasher, "_executor", broken)
+    response = client.post(
+        "/api/v1/auth/register",
+        json={"email": "respawn@example.com", "full_name": "Respawn", "password": "Password123!"},
+    )
+    assert response.status_code == 200
+    assert password_hasher._executor is not broken
+    assert password_hasher.in_flight == 0
+    password_hasher.shutdown()
@@ -0,0 +1,148 @@
+import hashlib
+import json
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.security import get_password_hash
+from app.models.blob import Blob
+from app.models.document import Document
+from app.models.user import User
+from app.repositories.document_repository import DocumentRepository
+from app.utils.file_storage import file_storage
+from scripts.bulk_import import Checkpoint, read_manifest, run_import, walk_directory
+
+
+def test_bulk_import_batches_and_resumes_without_duplicates(db_session, tmp_path):
+    db_session.add(User(email="archivist@example.com", full_name="Archivist", hashed_password=get_password_hash("x")))
+    db_session.commit()
+    share = tmp_path / "share"
+    (share / "contracts").mkdir(parents=True)
+    (share / "handbook.txt").write_bytes(b"alpha")
+    (share / "scan.bin").write_bytes(b"x" * 100)
+    (share / "contracts" / "handbook-copy.txt").write_bytes(b"alpha")
+    (share / "contracts" / "vendor.txt").write_bytes(b"delta")
+    session_factory = sessionmaker(bind=db_session.get_bind(), expire_on_commit=False)
+    checkpoint_path = tmp_path / "import.checkpoint.json"
+    errors_path = tmp_path / "import.errors.jsonl"
+
+    def run() -> Checkpoint:
+        entries = walk_directory(share, "archivist@example.com", "LEGACY")
+        return run_import(
+            entries, session_factory, checkpoint_path, errors_path, str(share), workers=2, batch_size=2, max_size=10
+        )
+
+    checkpoint = run()
+    assert (checkpoint.next_index, checkpoint.imported, checkpoint.failed) == (4, 3, 1)
+    errors = [json.loads(line) for line in errors_path.read_text().splitlines()]
+    assert [error["path"].rsplit("/", 1)[-1] for error in errors] == ["scan.bin"]
+    documents = db_session.scalars(select(Document).order_by(Document.id)).all()
+    assert [document.description for document in documents] == [
+        "Imported from handbook.txt",
+        "Imported from contracts/handbook-copy.txt",
+        "Imported from contracts/vendor.txt",
+    ]
+    assert documents[0].file_url == documents[1].file_url
+    assert db_session.scalar(select(Blob.ref_count).where(Blob.relative_path == documents[0].file_url)) == 2
+
+    # A run that committed its last batch but died before saving the
+    # checkpoint must not import that batch twice.
+    Checkpoint(source=str(share), next_index=2, imported=1, failed=1).save(checkpoint_path)
+    assert run().next_index == 4
+    db_session.expire_all()
+    assert db_session.scalar(select(func.count(Document.id))) == 3
+    assert db_session.scalar(select(Blob.ref_count).where(Blob.relative_path == documents[0].file_url)) == 2
+
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text(json.dumps({"path": "contracts/vendor.txt", "title": "Vendor", "created_at": "2019-05-01T00:00:00"}))
+    [entry] = read_manifest(manifest, share, "archivist@example.com", "LEGACY")
+    assert (entry.title, entry.description, entry.created_at.year) == ("Vendor", "Imported from contracts/vendor.txt", 2019)
+
+
+def test_bulk_import_reports_bad_rows_without_storing_them(db_session, tmp_path):
+    db_session.add(User(email="archivist@example.com", full_name="Archivist", hashed_password=get_password_hash("x")))
+    db_session.commit()
+    (tmp_path / "kept.txt").write_bytes(b"kept")
+    (tmp_path / "orphan.txt").write_bytes(b"no owner for these bytes")
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text(
+        "\n".join(
+            json.dumps(record)
+            for record in [
+                {"path": "kept.txt"},
+                {"path": "orphan.txt", "owner_email": "nobody@example.com"},
+                {"path": "kept.txt", "created_at": "last tuesday"},
+                {"title": "No path"},
+            ]
+        )
+    )
+
+    checkpoint = run_import(
+        read_manifest(manifest, tmp_path, "archivist@example.com", "LEGACY"),
+        sessionmaker(bind=db_session.get_bind(), expire_on_commit=False),
+        tmp_path / "import.checkpoint.json",
+        tmp_path / "import.errors.jsonl",
+        str(manifest),
+        workers=2,
+        batch_size=10,
+    )
+    assert (checkpoint.next_index, checkpoint.imported, checkpoint.failed) == (4, 1, 3)
+    errors = [json.loads(line) for line in (tmp_path / "import.errors.jsonl").read_text().splitlines()]
+    assert [error["index"] for error in errors] == [1, 2, 3]
+    assert errors[0]["error"] == "Unknown owner nobody@example.com"
+    assert errors[2]["error"] == "Manifest row is missing 'path'"
+    orphan = hashlib.sha256(b"no owner for these bytes").hexdigest()
+    assert not file_storage.exists(f"blobs/{orphan[:2]}/{orphan[2:4]}/{orphan}.txt")
+    assert not list(file_storage.blobs_tmp_dir.iterdir())
+
+
+def test_failed_batch_removes_the_files_it_placed(db_session, tmp_path, monkeypatch):
+    db_session.add(User(email="archivist@example.com", full_name="Archivist", hashed_password=get_password_hash("x")))
+    db_session.commit()
+    (tmp_path / "share").mkdir()
+    (tmp_path / "share" / "lost.txt").write_bytes(b"placed, then rolled back")
+
+    def fail(self, rows):
+        raise RuntimeError("insert failed")
+
+    monkeypatch.setattr(DocumentRepository, "create_many", fail)
+    with pytest.raises(RuntimeError):
+        run_import(
+            walk_directory(tmp_path / "share", "archivist@example.com", "LEGACY"),
+            sessionmaker(bind=db_session.get_bind(), expire_on_commit=False),
+            tmp_path / "import.checkpoint.json",
+            tmp_path / "import.errors.jsonl",
+            str(tmp_path / "share"),
+            workers=1,
+        )
+    digest = hashlib.sha256(b"placed, then rolled back").hexdigest()
+    assert not file_storage.exists(f"blobs/{digest[:2]}/{digest[2:4]}/{digest}.txt")
+    assert db_session.scalar(select(func.count(Blob.id))) == 0
+
+
+def test_resume_keeps_rows_that_repeat_committed_ones(db_session, tmp_path):
+    db_session.add(User(email="archivist@example.com", full_name="Archivist", hashed_password=get_password_hash("x")))
+    db_session.commit()
+    (tmp_path / "memo.txt").write_bytes(b"memo")
+    (tmp_path / "other.txt").write_bytes(b"other")
+    manifest = tmp_path / "manifest.jsonl"
+    manifest.write_text("\n".join(json.dumps({"path": path}) for path in ["memo.txt", "memo.txt", "other.txt"]))
+    session_factory = sessionmaker(bind=db_session.get_bind(), expire_on_commit=False)
+
+    def run(limit: int | None = None) -> Checkpoint:
+        entries = list(read_manifest(manifest, tmp_path, "archivist@example.com", "LEGACY"))[:limit]
+        return run_import(
+            entries, session_factory, tmp_path / "import.checkpoint.json", tmp_path / "import.errors.jsonl", str(manifest)
+        )
+
+    # The first row is committed, then the run stops; the second row has the
+    # same owner, title and content but is a document of its own.
+    assert run(limit=1).next_index == 1
+    checkpoint = run()
+    assert (checkpoint.next_index, checkpoint.imported) == (3, 3)
+    assert [document.title for document in db_session.scalars(select(Document).order_by(Document.id))] == [
+        "memo",
+        "memo",
+        "other",
+    ]
@@ -1,3 +1,10 @@
+import hashlib
+import io
+import json
+import tarfile
+import zipfile
+
+
 def register_user(client, email: str, full_name: str = "User", password: str = "Password123!") -> str:
     response = client.post(
         "/api/v1/auth/register",
@@ -50,3 +57,335 @@ def test_document_list_pagination_and_search(client):
     assert filter_response.status_code == 200
     filter_items = filter_response.json()["data"]["items"]
     assert len(filter_items) == 2
+
+
+def test_document_list_cursor_pagination(client):
+    token = register_user(client, "cursor@example.com", full_name="Cursor")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for idx in range(1, 6):
+        response = client.post(
+            "/api/v1/documents/upload",
+            headers=headers,
+            data={"title": f"Doc {idx}", "description": "Cursor test", "document_type": "MEMO"},
+            files={"file": (f"doc_{idx}.txt", b"content", "text/plain")},
+        )
+        assert response.status_code == 200
+
+    first_page = client.get("/api/v1/documents?page_size=2", headers=headers).json()["data"]
+    seen = [item["id"] for item in first_page["items"]]
+    cursor = first_page["meta"]["next_cursor"]
+    assert cursor
+
+    while cursor:
+        response = client.get(f"/api/v1/documents?page_size=2&cursor={cursor}", headers=headers)
+        assert response.status_code == 200
+        data = response.json()["data"]
+        seen.extend(item["id"] for item in data["items"])
+        cursor = data["meta"]["next_cursor"]
+
+    assert seen == [5, 4, 3, 2, 1]
+
+    invalid_response = client.get("/api/v1/documents?cursor=not-a-cursor", headers=headers)
+    assert invalid_response.status_code == 400
+    assert invalid_response.json()["error"]["code"] == "INVALID_CURSOR"
+
+
+def test_document_list_total_modes(client):
+    token = register_user(client, "totals@example.com", full_name="Totals")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for idx in range(1, 4):
+        response = client.post(
+            "/api/v1/documents/upload",
+            headers=headers,
+            data={"title": f"Doc {idx}", "description": "Totals test", "document_type": "MEMO"},
+            files={"file": (f"doc_{idx}.txt", b"content", "text/plain")},
+        )
+        assert response.status_code == 200
+
+    none_meta = client.get("/api/v1/documents?page_size=2&total_mode=none", headers=headers).json()["data"]["meta"]
+    assert none_meta["total"] is None
+    assert none_meta["total_pages"] is None
+    assert none_meta["total_mode"] == "none"
+    assert none_meta["next_cursor"]
+
+    estimate_meta = client.get("/api/v1/documents?total_mode=estimate", headers=headers).json()["data"]["meta"]
+    assert estimate_meta["total"] == 3
+    assert estimate_meta["total_mode"] == "cached"
+
+    exact_meta = client.get("/api/v1/documents", headers=headers).json()["data"]["meta"]
+    assert exact_meta["total"] == 3
+    assert exact_meta["total_mode"] == "exact"
+
+
+def test_document_search_ranks_title_matches_and_prefixes(client):
+    token = register_user(client, "search@example.com", full_name="Searcher")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for title, description in [
+        ("Budget plan", "Yearly allocation"),
+        ("Meeting notes", "Discussed the budget and hiring"),
+        ("Travel policy", "Reimbursement rules"),
+    ]:
+        response = client.post(
+            "/api/v1/documents/upload",
+            headers=headers,
+            data={"title": title, "description": description, "document_type": "MEMO"},
+            files={"file": ("file.txt", b"content", "text/plain")},
+        )
+        assert response.status_code == 200
+
+    ranked = client.get("/api/v1/documents?search=budget", headers=headers).json()["data"]
+    assert [item["title"] for item in ranked["items"]] == ["Budget plan", "Meeting notes"]
+    assert ranked["meta"]["total"] == 2
+
+    prefix = client.get("/api/v1/documents?search=reimb", headers=headers).json()["data"]
+    assert [item["title"] for item in prefix["items"]] == ["Travel policy"]
+
+    prefixes = client.get("/api/v1/documents?search=budg%20plan", headers=headers).json()["data"]
+    assert [item["title"] for item in prefixes["items"]] == ["Budget plan"]
+
+    punctuation = client.get("/api/v1/documents?search=--", headers=headers).json()["data"]
+    assert punctuation["items"] == []
+
+
+def test_upload_records_checksum_and_enforces_size_limit(client, monkeypatch):
+    from app.core.config import get_settings
+
+    token = register_user(client, "hash@example.com", full_name="Hasher")
+    headers = {"Authorization": f"Bearer {token}"}
+    content = b"checksum me" * 1000
+
+    response = client.post(
+        "/api/v1/documents/upload",
+        headers=headers,
+        data={"title": "Hashed", "description": "Checksum", "document_type": "MEMO"},
+        files={"file": ("hashed.txt", content, "text/plain")},
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["file_size"] == len(content)
+    assert data["file_sha256"] == hashlib.sha256(content).hexdigest()
+
+    monkeypatch.setattr(get_settings(), "max_upload_size_bytes", 100)
+    too_large = client.post(
+        "/api/v1/documents/upload",
+        headers=headers,
+        data={"title": "Too large", "description": "Over the limit", "document_type": "MEMO"},
+        files={"file": ("large.txt", content, "text/plain")},
+    )
+    assert too_large.status_code == 413
+    assert too_large.json()["error"]["code"] == "FILE_TOO_LARGE"
+
+
+def test_download_supports_conditional_and_range_requests(client):
+    token = register_user(client, "download@example.com", full_name="Downloader")
+    headers = {"Authorization": f"Bearer {token}"}
+    content = b"0123456789abcdef"
+
+    upload = client.post(
+        "/api/v1/documents/upload",
+        headers=headers,
+        data={"title": "Ranged", "description": "Range test", "document_type": "MEMO"},
+        files={"file": ("ranged.txt", content, "text/plain")},
+    )
+    document_id = upload.json()["data"]["id"]
+    url = f"/api/v1/documents/{document_id}/download"
+
+    full = client.get(url, headers=headers)
+    assert full.status_code == 200
+    assert full.content == content
+    etag = full.headers["etag"]
+    assert etag == f'"{hashlib.sha256(content).hexdigest()}"'
+
+    not_modified = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+
+    since = client.get(url, headers={**headers, "If-Modified-Since": full.headers["last-modified"]})
+    assert since.status_code == 304
+
+    partial = client.get(url, headers={**headers, "Range": "bytes=4-7"})
+    assert partial.status_code == 206
+    assert partial.content == b"4567"
+
+    multi = client.get(url, headers={**headers, "Range": "bytes=0-1,10-11"})
+    assert multi.status_code == 206
+    assert multi.headers["content-type"].startswith("multipart/byteranges; boundary=")
+    boundary = multi.headers["content-type"].split("boundary=")[1]
+    assert int(multi.headers["content-length"]) == len(multi.content)
+    assert b"Content-Range: bytes 0-1/16\r\n\r\n01\r\n" in multi.content
+    assert b"Content-Range: bytes 10-11/16\r\n\r\nab\r\n" in multi.content
+    assert multi.content.endswith(f"--{boundary}--\r\n".encode())
+
+    stale_if_range = client.get(url, headers={**headers, "Range": "bytes=4-7", "If-Range": '"stale"'})
+    assert stale_if_range.status_code == 200
+    assert stale_if_range.content == content
+
+
+def test_batch_upload_reports_each_file(client, db_session, monkeypatch):
+    from app.core.config import get_settings
+    from app.models.blob import Blob
+
+    token = register_user(client, "batch-upload@example.com", full_name="Batch Uploader")
+    monkeypatch.setattr(get_settings(), "max_upload_size_bytes", 100)
+
+    response = client.post(
+        "/api/v1/documents/upload-batch",
+        headers={"Authorization": f"Bearer {token}"},
+        data={"description": "Scanned archive", "document_type": "SCAN"},
+        files=[
+            ("files", ("scan-001.pdf", b"page one", "application/pdf")),
+            ("files", ("scan-002.pdf", b"x" * 101, "application/pdf")),
+            ("files", ("scan-003.pdf", b"page one", "application/pdf")),
+        ],
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["summary"] == {"total": 3, "succeeded": 2, "failed": 1}
+
+    first, too_large, duplicate = data["results"]
+    assert first["document"]["title"] == "scan-001"
+    assert too_large == {
+        "index": 1,
+        "filename": "scan-002.pdf",
+        "success": False,
+        "error": {"code": "FILE_TOO_LARGE", "message": "File exceeds the maximum upload size", "details": {"max_size": 100}},
+    }
+    assert duplicate["document"]["file_url"] == first["document"]["file_url"]
+    assert first["document"]["id"] < duplicate["document"]["id"]
+
+    blob = db_session.query(Blob).filter(Blob.relative_path == first["document"]["file_url"]).one()
+    assert blob.ref_count == 2
+
+    mismatched = client.post(
+        "/api/v1/documents/upload-batch",
+        headers={"Authorization": f"Bearer {token}"},
+        data={"description": "Scanned archive", "document_type": "SCAN", "titles": ["Only one"]},
+        files=[
+            ("files", ("a.pdf", b"a", "application/pdf")),
+            ("files", ("b.pdf", b"b", "application/pdf")),
+        ],
+    )
+    assert mismatched.status_code == 400
+    assert mismatched.json()["error"]["code"] == "INVALID_TITLES"
+
+
+def test_export_streams_zip_and_tar_archives(client, db_session):
+    owner_headers = {"Authorization": f"Bearer {register_user(client, 'exporter@example.com', full_name='Exporter')}"}
+    other_headers = {"Authorization": f"Bearer {register_user(client, 'other@example.com', full_name='Other')}"}
+
+    contents = {"Annual report": b"report" * 50_000, "Meeting notes": b"notes"}
+    own_ids = []
+    for title, content in contents.items():
+        response = client.post(
+            "/api/v1/documents/upload",
+            headers=owner_headers,
+            data={"title": title, "description": "Export me", "document_type": "REPORT"},
+            files={"file": (f"{title}.txt", content, "text/plain")},
+        )
+        own_ids.append(response.json()["data"]["id"])
+    foreign_id = client.post(
+        "/api/v1/documents/upload",
+        headers=other_headers,
+        data={"title": "Private", "description": "Not yours", "document_type": "REPORT"},
+        files={"file": ("private.txt", b"private", "text/plain")},
+    ).json()["data"]["id"]
+
+    response = client.get("/api/v1/documents/export", headers=owner_headers, params={"document_type": "report"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        names = archive.namelist()
+        assert names == [f"{own_ids[0]}-Annual_report.txt", f"{own_ids[1]}-Meeting_notes.txt", "manifest.json"]
+        assert archive.read(names[0]) == contents["Annual report"]
+        assert json.loads(archive.read("manifest.json"))["skipped"] == []
+
+    response = client.get(
+        "/api/v1/documents/export",
+        headers=owner_headers,
+        params={"format": "tar", "ids": [own_ids[1], foreign_id, 9999]},
+    )
+    assert response.status_code == 200
+    with tarfile.open(fileobj=io.BytesIO(response.content)) as archive:
+        assert archive.getnames() == [f"{own_ids[1]}-Meeting_notes.txt", "manifest.json"]
+        assert archive.extractfile(archive.getmembers()[0]).read() == contents["Meeting notes"]
+        manifest = json.loads(archive.extractfile("manifest.json").read())
+    assert manifest["skipped"] == [
+        {"id": foreign_id, "reason": "FORBIDDEN"},
+        {"id": 9999, "reason": "DOCUMENT_NOT_FOUND"},
+    ]
+
+    # Legacy rows without a recorded size take it from storage.
+    from app.models.document import Document
+
+    db_session.get(Document, own_ids[0]).file_size = None
+    db_session.commit()
+    response = client.get("/api/v1/documents/export", headers=owner_headers, params={"format": "tar", "ids": own_ids[0]})
+    with tarfile.open(fileobj=io.BytesIO(response.content)) as archive:
+        assert archive.extractfile(archive.getmembers()[0]).read() == contents["Annual report"]
+
+    mixed = client.get("/api/v1/documents/export", headers=owner_headers, params={"ids": own_ids[0], "status": "ACTIVE"})
+    assert mixed.status_code == 400
+    assert mixed.json()["error"]["code"] == "INVALID_EXPORT_QUERY"
+
+
+def test_list_rows_serialize_like_single_documents(client):
+    headers = {"Authorization": f"Bearer {register_user(client, 'rows@example.com', full_name='Rows')}"}
+    document_id = client.post(
+        "/api/v1/documents/upload",
+        headers=headers,
+        data={"title": "Row path", "description": "Serialized from a row", "document_type": "MEMO"},
+        files={"file": ("row.txt", b"row", "text/plain")},
+    ).json()["data"]["id"]
+
+    listed = client.get("/api/v1/documents", headers=headers)
+    assert listed.headers["content-type"] == "application/json"
+    single = client.get(f"/api/v1/documents/{document_id}", headers=headers).json()["data"]
+    assert listed.json()["data"]["items"] == [single]
+
+
+def test_list_and_detail_render_aware_timestamps_alike(client, monkeypatch):
+    from datetime import UTC
+
+    from app.api.v1.routes import documents as routes
+
+    # SQLite drops the offset, so UTC is reattached the way PostgreSQL
+    # returns it before each endpoint encodes the document.
+    def aware(data: dict) -> dict:
+        return {**data, "created_at": data["created_at"].replace(tzinfo=UTC)}
+
+    serialize_list, serialize_document = routes.serialize_list, routes.serialize_document
+    monkeypatch.setattr(routes, "serialize_list", lambda items, fields: [aware(i) for i in serialize_list(items, fields)])
+    monkeypatch.setattr(routes, "serialize_document", lambda document: aware(serialize_document(document)))
+    headers = {"Authorization": f"Bearer {register_user(client, 'aware@example.com', full_name='Aware')}"}
+    document_id = client.post(
+        "/api/v1/documents/upload",
+        headers=headers,
+        data={"title": "Aware", "description": "UTC", "document_type": "MEMO"},
+        files={"file": ("aware.txt", b"aware", "text/plain")},
+    ).json()["data"]["id"]
+
+    [listed] = client.get("/api/v1/documents", headers=headers).json()["data"]["items"]
+    single = client.get(f"/api/v1/documents/{document_id}", headers=headers).json()["data"]
+    assert listed["created_at"] == single["created_at"]
+    assert single["created_at"].endswith("Z")
+
+
+def test_row_estimate_explain_binds_for_each_postgres_driver():
+    from sqlalchemy import select
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+    from app.core.enums import DocumentStatus
+    from app.models.document import Document
+    from app.repositories.counting import ExplainJSON
+
+    stmt = select(Document).where(Document.status == DocumentStatus.ACTIVE, Document.document_type == "MEMO")
+    psycopg2 = ExplainJSON(stmt).compile(dialect=postgresql.dialect())
+    assert str(psycopg2).startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "%(status_1)s" in str(psycopg2)
+    asyncpg = ExplainJSON(stmt).compile(dialect=asyncpg_dialect())
+    assert "$1" in str(asyncpg) and "$2" in str(asyncpg)
+    assert asyncpg.construct_params() == {"status_1": DocumentStatus.ACTIVE, "document_type_1": "MEMO"}
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+
+import pytest
+from sqlalchemy import false, func, select, text
+
+from app.core.access_log import RedactTokenFilter
+from app.core.database import SyncSessionRunner
+from app.core.dependencies import get_stream_user
+from app.core.exceptions import AppException
+from app.core.notification_events import notification_broker
+from app.core.security import create_access_token, get_password_hash
+from app.models.notification import Notification
+from app.models.user import User
+from app.repositories.notification_repository import NotificationRepository
+
+
+def create_users(db_session, count: int) -> list[int]:
+    users = [
+        User(email=f"user{index}@example.com", full_name=f"User {index}", hashed_password=get_password_hash("x"))
+        for index in range(count)
+    ]
+    db_session.add_all(users)
+    db_session.commit()
+    return [user.id for user in users]
+
+
+def test_create_many_inserts_in_bulk_and_returns_ids(db_session):
+    user_ids = create_users(db_session, 3)
+    repo = NotificationRepository(db_session)
+
+    ids = repo.create_many(
+        payloads=[
+            {"user_id": user_id, "type": "PERMISSION_REQUEST", "message": f"Fan-out {user_id}", "related_entity_id": 9}
+            for user_id in user_ids
+        ]
+    )
+    db_session.commit()
+
+    assert len(ids) == 3
+    rows = {row.id: row for row in db_session.query(Notification).all()}
+    assert [rows[notification_id].user_id for notification_id in ids] == user_ids
+    assert all(not row.is_read and row.created_at is not None for row in rows.values())
+    assert repo.create_many(payloads=[]) == []
+
+
+def test_mark_all_read_and_unread_count(client, db_session):
+    user_id, other_user_id = create_users(db_session, 2)
+    repo = NotificationRepository(db_session)
+    repo.create_many(
+        payloads=[{"user_id": user_id, "type": "INFO", "message": f"Unread {index}"} for index in range(5)]
+        + [{"user_id": other_user_id, "type": "INFO", "message": "Someone else's"}]
+    )
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(subject=str(user_id))}"}
+
+    unread = client.get("/api/v1/notifications/unread-count", headers=headers)
+    assert unread.status_code == 200
+    assert unread.json()["data"] == {"unread": 5}
+
+    marked = client.patch("/api/v1/notifications/read-all", headers=headers)
+    assert marked.json()["data"] == {"updated": 5}
+    assert client.get("/api/v1/notifications/unread-count", headers=headers).json()["data"] == {"unread": 0}
+    assert repo.count_unread(user_id=other_user_id) == 1
+
+
+def test_unread_count_uses_partial_index(db_session):
+    stmt = select(func.count()).where(Notification.user_id == 1, Notification.is_read == false())
+    compiled = stmt.compile(bind=db_session.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    assert "ix_notifications_user_id_unread" in " ".join(str(row) for row in plan)
+
+
+def test_notifications_are_pushed_to_subscribers_after_commit(db_session):
+    (user_id,) = create_users(db_session, 1)
+    repo = NotificationRepository(db_session)
+
+    async def receive() -> tuple[dict, int]:
+        async with notification_broker.subscribe(user_id) as queue:
+            repo.create_many(payloads=[{"user_id": user_id, "type": "INFO", "message": "Rolled back"}])
+            db_session.rollback()
+            repo.create(user_id=user_id, type="PERMISSION_RESULT", message="Request #1 has been APPROVED")
+            db_session.commit()
+
+            received = await asyncio.wait_for(queue.get(), timeout=1)
+            await asyncio.sleep(0)
+            return received, queue.qsize()
+
+    received, remaining = asyncio.run(receive())
+    assert received["message"] == "Request #1 has been APPROVED"
+    assert received["user_id"] == user_id
+    assert remaining == 0
+
+
+def test_notification_stream_requires_token(client):
+    response = client.get("/api/v1/notifications/stream")
+    assert response.status_code == 401
+
+
+def test_stream_query_parameter_only_takes_stream_tokens(client, db_session):
+    user = User(email="stream@example.com", full_name="Stream", hashed_password=get_password_hash("Password123!"))
+    db_session.add(user)
+    db_session.commit()
+    access_token = create_access_token(subject=str(user.id))
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = client.post("/api/v1/notifications/stream-token", headers=headers)
+    assert response.status_code == 200
+    stream_token = response.json()["data"]["token"]
+
+    # The stream token opens the stream and nothing else; the access token
+    # is refused in the query string.
+    assert client.get("/api/v1/notifications", headers={"Authorization": f"Bearer {stream_token}"}).status_code == 401
+    assert client.get(f"/api/v1/notifications/stream?access_token={access_token}").status_code == 401
+    db = SyncSessionRunner(db_session)
+    assert asyncio.run(get_stream_user(header_token=None, access_token=stream_token, db=db)).id == user.id
+    with pytest.raises(AppException):
+        asyncio.run(get_stream_user(header_token=None, access_token=access_token, db=db))
+
+    path = f"/api/v1/notifications/stream?access_token={stream_token}&x=1"
+    record = logging.LogRecord(
+        "uvicorn.access", logging.INFO, "", 0, '%s - "%s %s HTTP/%s" %d', ("127.0.0.1", "GET", path, "1.1", 200), None
+    )
+    RedactTokenFilter().filter(record)
+    assert stream_token not in record.getMessage()
+    assert "access_token=[redacted]&x=1" in record.getMessage()
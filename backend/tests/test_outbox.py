@@ -0,0 +1,91 @@
+from datetime import UTC, datetime, timedelta
+
+from app.core.enums import OutboxStatus, OutboxTopic, UserRole
+from app.core.security import create_access_token, get_password_hash
+from app.models.notification import Notification
+from app.models.outbox_event import OutboxEvent
+from app.models.user import User
+from app.repositories.outbox_repository import OutboxRepository
+from app.workers import outbox_worker
+
+
+def create_user(db_session, email: str, role: UserRole = UserRole.USER) -> User:
+    user = User(email=email, full_name="Outbox User", hashed_password=get_password_hash("Password123!"), role=role)
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def test_admin_fan_out_runs_after_the_request(client, db_session, drain_outbox):
+    admin = create_user(db_session, "admin@example.com", UserRole.ADMIN)
+    owner = create_user(db_session, "owner@example.com")
+    headers = {"Authorization": f"Bearer {create_access_token(subject=str(owner.id))}"}
+
+    upload = client.post(
+        "/api/v1/documents/upload",
+        headers=headers,
+        data={"title": "Policy", "description": "Internal policy", "document_type": "POLICY"},
+        files={"file": ("policy.txt", b"v1", "text/plain")},
+    )
+    response = client.post(
+        f"/api/v1/documents/{upload.json()['data']['id']}/delete-request",
+        headers=headers,
+        json={"expected_version": 1},
+    )
+    assert response.status_code == 200
+    assert db_session.query(Notification).count() == 0
+
+    assert drain_outbox() == 1
+    notification = db_session.query(Notification).one()
+    assert notification.user_id == admin.id
+    assert notification.related_entity_id == response.json()["data"]["request"]["id"]
+    assert db_session.query(OutboxEvent).one().status == OutboxStatus.DONE
+
+
+def test_failed_events_are_retried_with_backoff(db_session, drain_outbox, monkeypatch):
+    calls = []
+
+    def flaky(_db, payload):
+        calls.append(payload)
+        raise OSError("storage unavailable")
+
+    monkeypatch.setitem(outbox_worker.HANDLERS, OutboxTopic.DELETE_FILE.value, flaky)
+    monkeypatch.setattr(outbox_worker.settings, "outbox_max_attempts", 2)
+    OutboxRepository(db_session).add(OutboxTopic.DELETE_FILE, {"path": "blobs/aa/bb/missing.txt"})
+    db_session.commit()
+
+    drain_outbox()
+    event = db_session.query(OutboxEvent).one()
+    db_session.refresh(event)
+    assert event.status == OutboxStatus.PENDING
+    assert event.attempts == 1
+    assert "storage unavailable" in event.last_error
+    assert event.available_at.replace(tzinfo=UTC) > datetime.now(UTC)
+
+    event.available_at = datetime.now(UTC) - timedelta(seconds=1)
+    db_session.commit()
+    drain_outbox()
+    db_session.refresh(event)
+    assert event.status == OutboxStatus.FAILED
+    assert len(calls) == 2
+
+
+def test_events_are_leased_one_at_a_time(db_session, monkeypatch):
+    from tests.conftest import TestingSessionLocal
+
+    claimable = []
+
+    def record(db, payload):
+        now = datetime.now(UTC)
+        others = db.query(OutboxEvent).filter(OutboxEvent.status == OutboxStatus.PENDING).order_by(OutboxEvent.id).all()
+        claimable.append([event.available_at.replace(tzinfo=UTC) <= now for event in others])
+
+    monkeypatch.setitem(outbox_worker.HANDLERS, OutboxTopic.DELETE_FILE.value, record)
+    for index in range(3):
+        OutboxRepository(db_session).add(OutboxTopic.DELETE_FILE, {"path": f"blobs/aa/bb/{index}.txt"})
+    db_session.commit()
+
+    assert outbox_worker.process_outbox_batch(TestingSessionLocal, batch_size=10) == 3
+    # Only the running event is leased; a slow handler cannot let the
+    # leases of events still waiting in its batch expire.
+    assert claimable == [[False, True, True], [False, True], [False]]
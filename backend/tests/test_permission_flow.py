@@ -1,6 +1,12 @@
+import io
+
 from app.core.enums import UserRole
 from app.core.security import get_password_hash
+from app.models.blob import Blob
 from app.models.user import User
+from app.repositories.blob_repository import BlobRepository
+from app.services.document_service import DocumentService
+from app.utils.file_storage import file_storage
 
 
 def register_user(client, email: str, full_name: str = "User", password: str = "Password123!") -> str:
@@ -128,3 +134,147 @@ def test_replace_and_delete_review_flow(client, db_session):
         headers={"Authorization": f"Bearer {user_token}"},
     )
     assert missing_doc_response.status_code == 404
+
+
+def test_identical_uploads_share_one_blob(client, db_session, drain_outbox):
+    create_admin_user(db_session)
+    admin_token = login_admin(client)
+    user_token = register_user(client, "dedupe@example.com", full_name="Dedupe")
+
+    first_id = upload_document(client, user_token)
+    second_id = upload_document(client, user_token)
+    first = client.get(f"/api/v1/documents/{first_id}", headers={"Authorization": f"Bearer {user_token}"}).json()["data"]
+    second = client.get(f"/api/v1/documents/{second_id}", headers={"Authorization": f"Bearer {user_token}"}).json()["data"]
+    assert first["file_url"] == second["file_url"]
+    assert first["file_url"].startswith("blobs/")
+
+    blob = db_session.query(Blob).filter(Blob.relative_path == first["file_url"]).one()
+    assert blob.ref_count == 2
+    blob_path = file_storage.absolute_path(first["file_url"])
+
+    replace_response = client.post(
+        f"/api/v1/documents/{first_id}/replace-request",
+        headers={"Authorization": f"Bearer {user_token}"},
+        data={"expected_version": "1"},
+        files={"file": ("policy_v2.txt", b"v2", "text/plain")},
+    )
+    assert replace_response.status_code == 200
+    pending_file = replace_response.json()["data"]["request"]["payload"]["pending_file_url"]
+
+    approve_replace = client.post(
+        f"/api/v1/permission-requests/{replace_response.json()['data']['request']['id']}/review",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        json={"decision": "APPROVE"},
+    )
+    assert approve_replace.status_code == 200
+    replaced = client.get(f"/api/v1/documents/{first_id}", headers={"Authorization": f"Bearer {user_token}"}).json()["data"]
+    assert replaced["file_url"] == pending_file
+    drain_outbox()
+    assert blob_path.is_file()
+
+    delete_response = client.post(
+        f"/api/v1/documents/{second_id}/delete-request",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json={"expected_version": 1},
+    )
+    approve_delete = client.post(
+        f"/api/v1/permission-requests/{delete_response.json()['data']['request']['id']}/review",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        json={"decision": "APPROVE"},
+    )
+    assert approve_delete.status_code == 200
+    assert blob_path.exists()
+    drain_outbox()
+    assert not blob_path.exists()
+    db_session.expire_all()
+    assert db_session.query(Blob).filter(Blob.relative_path == first["file_url"]).count() == 0
+
+
+def test_upload_survives_a_concurrent_delete_of_the_same_content(db_session):
+    owner = User(email="race@example.com", full_name="Race", hashed_password=get_password_hash("x"))
+    db_session.add(owner)
+    db_session.commit()
+    service = DocumentService(db_session)
+
+    # The previous copy is deleted after the upload was staged but before it
+    # took its reference; placing under the reference writes it back.
+    staged = file_storage.stage_stream(io.BytesIO(b"shared bytes"), "a.txt")
+    previous = file_storage.save_stream(io.BytesIO(b"shared bytes"), "b.txt")
+    assert BlobRepository(db_session).lock_unreferenced(previous.relative_path)
+    file_storage.delete_if_exists(previous.relative_path)
+    db_session.commit()
+    document = service.upload_document(owner, "Shared", "", "MEMO", staged)
+    assert file_storage.exists(document.file_url)
+
+    # A failed upload of the same content must not unlink a referenced file.
+    failed = file_storage.stage_stream(io.BytesIO(b"shared bytes"), "c.txt")
+    service._discard_unreferenced(failed)
+    assert file_storage.exists(document.file_url)
+    assert not file_storage.exists(failed.staged_path)
+    assert not BlobRepository(db_session).lock_unreferenced(document.file_url)
+    db_session.rollback()
+
+
+def test_batch_review_returns_per_item_results(client, db_session, drain_outbox):
+    create_admin_user(db_session)
+    admin_token = login_admin(client)
+    user_token = register_user(client, "batch@example.com", full_name="Batch User")
+    user_headers = {"Authorization": f"Bearer {user_token}"}
+    admin_headers = {"Authorization": f"Bearer {admin_token}"}
+
+    replace_doc_id = upload_document(client, user_token)
+    delete_doc_id = upload_document(client, user_token)
+    replace_request_id = client.post(
+        f"/api/v1/documents/{replace_doc_id}/replace-request",
+        headers=user_headers,
+        data={"expected_version": "1"},
+        files={"file": ("policy_v2.txt", b"v2", "text/plain")},
+    ).json()["data"]["request"]["id"]
+    delete_request_id = client.post(
+        f"/api/v1/documents/{delete_doc_id}/delete-request",
+        headers=user_headers,
+        json={"expected_version": 1},
+    ).json()["data"]["request"]["id"]
+
+    response = client.post(
+        "/api/v1/permission-requests/review-batch",
+        headers=admin_headers,
+        json={
+            "chunk_size": 2,
+            "items": [
+                {"request_id": delete_request_id, "decision": "REJECT", "note": "Keep it"},
+                {"request_id": 9999, "decision": "APPROVE"},
+                {"request_id": replace_request_id, "decision": "APPROVE"},
+            ],
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["summary"] == {"total": 3, "succeeded": 2, "failed": 1}
+    assert [result["request_id"] for result in data["results"]] == [delete_request_id, 9999, replace_request_id]
+    assert data["results"][0]["request"]["status"] == "REJECTED"
+    assert data["results"][1]["error"]["code"] == "REQUEST_NOT_FOUND"
+    assert data["results"][2]["request"]["status"] == "APPROVED"
+
+    replaced = client.get(f"/api/v1/documents/{replace_doc_id}", headers=user_headers).json()["data"]
+    kept = client.get(f"/api/v1/documents/{delete_doc_id}", headers=user_headers).json()["data"]
+    assert (replaced["version"], replaced["status"]) == (2, "ACTIVE")
+    assert (kept["version"], kept["status"]) == (1, "ACTIVE")
+
+    notifications = client.get("/api/v1/notifications", headers=user_headers).json()["data"]["items"]
+    assert sum(1 for item in notifications if item["type"] == "PERMISSION_RESULT") == 2
+
+    again = client.post(
+        "/api/v1/permission-requests/review-batch",
+        headers=admin_headers,
+        json={"items": [{"request_id": replace_request_id, "decision": "REJECT"}]},
+    )
+    assert again.json()["data"]["results"][0]["error"]["code"] == "REQUEST_ALREADY_REVIEWED"
+
+    duplicate = client.post(
+        "/api/v1/permission-requests/review-batch",
+        headers=admin_headers,
+        json={"items": [{"request_id": 1, "decision": "REJECT"}, {"request_id": 1, "decision": "APPROVE"}]},
+    )
+    assert duplicate.status_code == 400
+    assert duplicate.json()["error"]["code"] == "DUPLICATE_REQUEST"
@@ -0,0 +1,214 @@
+import logging
+
+import pytest
+from fastapi.routing import APIRoute
+
+from app.core.document_cache import clear_document_cache
+from app.core.enums import UserRole
+from app.core.query_budget import QueryBudgetMiddleware
+from app.core.security import create_access_token, get_password_hash
+from app.core.user_cache import clear_user_cache
+from app.main import app
+from app.models.user import User
+from app.repositories.counting import clear_count_cache
+
+# Cold-cache worst case per route. Raise a budget only together with the
+# change that needs it, never to paper over a lazy load in a loop.
+QUERY_BUDGETS = {
+    ("GET", "/health"): 0,
+    ("GET", "/metrics"): 0,
+    ("POST", "/api/v1/auth/register"): 3,
+    ("POST", "/api/v1/auth/login"): 1,
+    ("GET", "/api/v1/auth/me"): 1,
+    ("POST", "/api/v1/documents/upload"): 4,
+    ("POST", "/api/v1/documents/upload-batch"): 5,
+    ("GET", "/api/v1/documents"): 3,
+    ("GET", "/api/v1/documents/export"): 2,
+    ("GET", "/api/v1/documents/{document_id}"): 2,
+    ("GET", "/api/v1/documents/{document_id}/download"): 2,
+    ("POST", "/api/v1/documents/{document_id}/replace-request"): 7,
+    ("POST", "/api/v1/documents/{document_id}/delete-request"): 6,
+    ("GET", "/api/v1/permission-requests"): 3,
+    ("POST", "/api/v1/permission-requests/review-batch"): 9,
+    ("POST", "/api/v1/permission-requests/{request_id}/review"): 10,
+    ("GET", "/api/v1/notifications"): 3,
+    ("GET", "/api/v1/notifications/unread-count"): 2,
+    ("POST", "/api/v1/notifications/stream-token"): 1,
+    ("GET", "/api/v1/notifications/stream"): 0,
+    ("PATCH", "/api/v1/notifications/{notification_id}/read"): 3,
+    ("PATCH", "/api/v1/notifications/read-all"): 2,
+    ("GET", "/api/v1/system/pool"): 1,
+    ("GET", "/api/v1/system/cache"): 1,
+}
+
+
+def create_user(db_session, email: str, role: UserRole = UserRole.USER) -> dict:
+    user = User(email=email, full_name=email.split("@")[0], hashed_password=get_password_hash("Password123!"), role=role)
+    db_session.add(user)
+    db_session.commit()
+    return {"Authorization": f"Bearer {create_access_token(str(user.id))}"}
+
+
+def upload(client, headers: dict, title: str = "Policy") -> int:
+    response = client.post(
+        "/api/v1/documents/upload",
+        headers=headers,
+        data={"title": title, "description": "Internal policy", "document_type": "POLICY"},
+        files={"file": (f"{title}.txt", title.encode(), "text/plain")},
+    )
+    assert response.status_code == 200
+    return response.json()["data"]["id"]
+
+
+def request_review(client, headers: dict, document_id: int) -> int:
+    response = client.post(f"/api/v1/documents/{document_id}/delete-request", headers=headers, json={"expected_version": 1})
+    assert response.status_code == 200
+    return response.json()["data"]["request"]["id"]
+
+
+def test_every_route_stays_within_its_query_budget(client, db_session, count_queries):
+    admin = create_user(db_session, "admin@example.com", UserRole.ADMIN)
+    user = create_user(db_session, "owner@example.com")
+    observed = {}
+
+    def measure(method: str, route: str, path: str | None = None, expected_status: int = 200, **kwargs):
+        clear_user_cache()
+        clear_document_cache()
+        clear_count_cache()
+        with count_queries() as counter:
+            response = client.request(method, path or route, **kwargs)
+        assert response.status_code == expected_status, (route, response.text)
+        observed[(method, route)] = counter
+        return response
+
+    measure("GET", "/health")
+    measure("GET", "/metrics")
+    measure(
+        "POST",
+        "/api/v1/auth/register",
+        json={"email": "new@example.com", "full_name": "New User", "password": "Password123!"},
+    )
+    measure("POST", "/api/v1/auth/login", json={"email": "owner@example.com", "password": "Password123!"})
+    measure("GET", "/api/v1/auth/me", headers=user)
+
+    document_id = measure(
+        "POST",
+        "/api/v1/documents/upload",
+        headers=user,
+        data={"title": "Policy", "description": "Internal policy", "document_type": "POLICY"},
+        files={"file": ("policy.txt", b"v1", "text/plain")},
+    ).json()["data"]["id"]
+    measure(
+        "POST",
+        "/api/v1/documents/upload-batch",
+        headers=user,
+        data={"description": "Scans", "document_type": "SCAN"},
+        files=[("files", (f"scan-{index}.pdf", f"page {index}".encode(), "application/pdf")) for index in range(3)],
+    )
+    measure("GET", "/api/v1/documents", headers=user)
+    measure("GET", "/api/v1/documents/export", headers=user)
+    measure("GET", "/api/v1/documents/{document_id}", f"/api/v1/documents/{document_id}", headers=user)
+    measure("GET", "/api/v1/documents/{document_id}/download", f"/api/v1/documents/{document_id}/download", headers=user)
+    replace_request_id = measure(
+        "POST",
+        "/api/v1/documents/{document_id}/replace-request",
+        f"/api/v1/documents/{document_id}/replace-request",
+        headers=user,
+        data={"expected_version": "1"},
+        files={"file": ("policy-v2.txt", b"v2", "text/plain")},
+    ).json()["data"]["request"]["id"]
+    other_document_id = upload(client, user, "Handbook")
+    delete_request_id = measure(
+        "POST",
+        "/api/v1/documents/{document_id}/delete-request",
+        f"/api/v1/documents/{other_document_id}/delete-request",
+        headers=user,
+        json={"expected_version": 1},
+    ).json()["data"]["request"]["id"]
+
+    measure("GET", "/api/v1/permission-requests", headers=admin)
+    measure(
+        "POST",
+        "/api/v1/permission-requests/{request_id}/review",
+        f"/api/v1/permission-requests/{replace_request_id}/review",
+        headers=admin,
+        json={"decision": "APPROVE"},
+    )
+    batch_ids = [request_review(client, user, upload(client, user, f"Old {index}")) for index in range(3)]
+    measure(
+        "POST",
+        "/api/v1/permission-requests/review-batch",
+        headers=admin,
+        json={"items": [{"request_id": request_id, "decision": "REJECT"} for request_id in [delete_request_id, *batch_ids]]},
+    )
+
+    notifications = measure("GET", "/api/v1/notifications", headers=user).json()["data"]["items"]
+    measure("GET", "/api/v1/notifications/unread-count", headers=user)
+    measure("POST", "/api/v1/notifications/stream-token", headers=user)
+    measure("GET", "/api/v1/notifications/stream", expected_status=401)
+    measure(
+        "PATCH",
+        "/api/v1/notifications/{notification_id}/read",
+        f"/api/v1/notifications/{notifications[0]['id']}/read",
+        headers=user,
+    )
+    measure("PATCH", "/api/v1/notifications/read-all", headers=user)
+    measure("GET", "/api/v1/system/pool", headers=admin)
+    measure("GET", "/api/v1/system/cache", headers=admin)
+
+    over_budget = {
+        key: {"queries": counter.count, "budget": QUERY_BUDGETS[key], "repeated": counter.repeated()}
+        for key, counter in observed.items()
+        if counter.count > QUERY_BUDGETS[key]
+    }
+    assert over_budget == {}
+    assert observed.keys() == QUERY_BUDGETS.keys()
+
+
+def test_every_route_has_a_query_budget():
+    routes = {(method, route.path) for route in app.routes if isinstance(route, APIRoute) for method in route.methods}
+    assert routes == QUERY_BUDGETS.keys()
+
+
+@pytest.mark.parametrize(
+    ("path", "admin"),
+    [("/api/v1/documents", False), ("/api/v1/notifications", False), ("/api/v1/permission-requests", True)],
+)
+def test_list_queries_do_not_grow_with_page_size(client, db_session, count_queries, path, admin):
+    admin_headers = create_user(db_session, "admin@example.com", UserRole.ADMIN)
+    user_headers = create_user(db_session, "owner@example.com")
+    headers = admin_headers if admin else user_headers
+
+    def list_queries() -> int:
+        clear_user_cache()
+        clear_document_cache()
+        clear_count_cache()
+        with count_queries() as counter:
+            response = client.get(path, headers=headers)
+        assert response.status_code == 200
+        return counter.count
+
+    request_review(client, user_headers, upload(client, user_headers, "Policy 0"))
+    single = list_queries()
+    for index in range(1, 10):
+        request_review(client, user_headers, upload(client, user_headers, f"Policy {index}"))
+    assert list_queries() == single
+
+
+def test_middleware_logs_or_rejects_requests_over_budget(client, db_session, caplog):
+    headers = create_user(db_session, "owner@example.com")
+    original_stack = app.middleware_stack
+    try:
+        app.middleware_stack = QueryBudgetMiddleware(original_stack, budget=0, action="log")
+        with caplog.at_level(logging.WARNING, logger="app.core.query_budget"):
+            assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+        assert "GET /api/v1/auth/me ran" in caplog.text
+
+        app.middleware_stack = QueryBudgetMiddleware(original_stack, budget=0, action="raise")
+        clear_user_cache()
+        response = client.get("/api/v1/auth/me", headers=headers)
+        assert response.status_code == 500
+        assert response.json()["error"]["code"] == "QUERY_BUDGET_EXCEEDED"
+        assert client.get("/health").status_code == 200
+    finally:
+        app.middleware_stack = original_stack
@@ -0,0 +1,132 @@
+import os
+from collections.abc import Callable, Generator
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.core.enums import DocumentStatus, PermissionRequestStatus, TotalMode
+from app.models.base import Base
+from app.repositories.document_repository import DocumentRepository
+from app.repositories.notification_repository import NotificationRepository
+from app.repositories.permission_request_repository import PermissionRequestRepository
+
+# Each hot repository query and the index that has to serve both its filter
+# and its ORDER BY.
+HOT_QUERIES: list[tuple[str, Callable[[Session], object], str]] = [
+    (
+        "documents by status",
+        lambda db: DocumentRepository(db).list_paginated(
+            page=1, page_size=20, search=None, status=DocumentStatus.ACTIVE, document_type=None, total_mode=TotalMode.NONE
+        ),
+        "ix_documents_status_created_at_id",
+    ),
+    (
+        "documents by type",
+        lambda db: DocumentRepository(db).list_paginated(
+            page=1, page_size=20, search=None, status=None, document_type="policy", total_mode=TotalMode.NONE
+        ),
+        "ix_documents_lower_document_type_created_at_id",
+    ),
+    (
+        "documents keyset page",
+        lambda db: DocumentRepository(db).list_paginated(
+            page=1, page_size=20, search=None, status=None, document_type=None, total_mode=TotalMode.NONE
+        ),
+        "ix_documents_created_at_id",
+    ),
+    (
+        "notifications for user",
+        lambda db: NotificationRepository(db).list_paginated(user_id=1, page=1, page_size=20, total_mode=TotalMode.NONE),
+        "ix_notifications_user_id_created_at",
+    ),
+    (
+        "unread notifications",
+        lambda db: NotificationRepository(db).count_unread(user_id=1),
+        "ix_notifications_user_id_unread",
+    ),
+    (
+        "pending permission requests",
+        lambda db: PermissionRequestRepository(db).list_paginated(
+            page=1, page_size=20, status=PermissionRequestStatus.PENDING, total_mode=TotalMode.NONE
+        ),
+        "ix_permission_requests_status_requested_at",
+    ),
+    (
+        "all permission requests",
+        lambda db: PermissionRequestRepository(db).list_paginated(
+            page=1, page_size=20, status=None, total_mode=TotalMode.NONE
+        ),
+        "ix_permission_requests_requested_at",
+    ),
+]
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def plan_session(request, db_session) -> Generator[Session, None, None]:
+    if request.param == "sqlite":
+        yield db_session
+        return
+
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("set TEST_POSTGRES_URL to check PostgreSQL query plans")
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    connection = engine.connect()
+    # Test tables are tiny, so the planner would scan them either way;
+    # disabling sequential scans asks whether an index can serve the query.
+    connection.exec_driver_sql("SET enable_seqscan = off")
+    session = Session(bind=connection)
+    try:
+        yield session
+    finally:
+        session.close()
+        connection.close()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def explain(session: Session, run: Callable[[Session], object]) -> list[str]:
+    # Plans come from the SQL the repository actually sends, with its
+    # parameters, not from a hand-written copy of the query.
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append((statement, parameters))
+
+    connection = session.connection()
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        run(session)
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+
+    prefix = "EXPLAIN QUERY PLAN " if connection.dialect.name == "sqlite" else "EXPLAIN "
+    return [
+        "\n".join(str(row[-1]) for row in connection.exec_driver_sql(prefix + statement, parameters).all())
+        for statement, parameters in statements
+    ]
+
+
+@pytest.mark.parametrize(("query", "run", "index"), HOT_QUERIES, ids=[query for query, _, _ in HOT_QUERIES])
+def test_hot_queries_use_their_index(plan_session, query, run, index):
+    [plan] = explain(plan_session, run)
+    assert index in plan, plan
+    if plan_session.get_bind().dialect.name == "sqlite":
+        assert "TEMP B-TREE" not in plan, plan
+    else:
+        assert "Seq Scan" not in plan, plan
+
+
+def test_sqlite_search_is_served_by_the_fts_index(db_session):
+    [count_plan, items_plan] = explain(
+        db_session,
+        lambda db: DocumentRepository(db).list_paginated(
+            page=1, page_size=20, search="budget plan", status=None, document_type=None
+        ),
+    )
+    for plan in (count_plan, items_plan):
+        assert "VIRTUAL TABLE INDEX" in plan, plan
+        assert "SCAN documents\n" not in f"{plan}\n", plan
@@ -0,0 +1,57 @@
+import hashlib
+import io
+
+import pytest
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+from app.utils.file_storage import FileTooLargeError  # noqa: E402
+from app.utils.s3_storage import MIN_MULTIPART_PART_SIZE, S3StorageBackend  # noqa: E402
+
+
+@pytest.fixture
+def s3_backend():
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="test-bucket")
+        yield S3StorageBackend(client=client, bucket="test-bucket")
+
+
+def list_keys(backend: S3StorageBackend) -> list[str]:
+    response = backend.client.list_objects_v2(Bucket=backend.bucket)
+    return sorted(item["Key"] for item in response.get("Contents", []))
+
+
+def test_s3_backend_deduplicates_and_cleans_temp_keys(s3_backend):
+    first = s3_backend.save_stream(io.BytesIO(b"same bytes"), "a.pdf")
+    second = s3_backend.save_stream(io.BytesIO(b"same bytes"), "b.pdf")
+
+    assert first == second
+    assert first.sha256 == hashlib.sha256(b"same bytes").hexdigest()
+    assert list_keys(s3_backend) == [first.relative_path]
+    assert s3_backend.promote_pending_file(first.relative_path) == first.relative_path
+    assert b"".join(s3_backend.iter_file(first.relative_path)) == b"same bytes"
+
+    url = s3_backend.presign_download(first.relative_path, "report.pdf")
+    assert "X-Amz-Signature" in url or "Signature" in url
+
+    s3_backend.delete_if_exists(first.relative_path)
+    assert not s3_backend.exists(first.relative_path)
+
+
+def test_s3_backend_uses_multipart_for_large_files(s3_backend):
+    content = b"x" * (MIN_MULTIPART_PART_SIZE * 2 + 123)
+
+    stored = s3_backend.save_stream(io.BytesIO(content), "large.bin")
+
+    assert stored.size == len(content)
+    head = s3_backend.client.head_object(Bucket=s3_backend.bucket, Key=stored.relative_path)
+    assert head["ContentLength"] == len(content)
+    assert list_keys(s3_backend) == [stored.relative_path]
+
+    with pytest.raises(FileTooLargeError):
+        s3_backend.save_stream(io.BytesIO(content), "large.bin", max_size=MIN_MULTIPART_PART_SIZE + 1)
+    assert list_keys(s3_backend) == [stored.relative_path]
+    uploads = s3_backend.client.list_multipart_uploads(Bucket=s3_backend.bucket)
+    assert not uploads.get("Uploads")